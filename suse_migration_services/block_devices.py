@@ -0,0 +1,140 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import json
+import os
+from collections import namedtuple
+
+# project
+from suse_migration_services.command import Command
+
+block_device_type = namedtuple('block_device_type', ['name', 'type', 'uuid', 'wwn', 'mountpoints'])
+
+
+class BlockDevices:
+    """
+    **In-memory index of the block devices of the system**
+
+    All block devices and their UUIDs are read with one lsblk
+    call instead of probing each device with blkid. lsblk takes
+    the UUID from the udev database, blkid is only used as a
+    fallback if a UUID can't be found that way
+    """
+
+    def __init__(self):
+        self.devices = []
+        self.uuid_index = {}
+        self.probed = False
+        lsblk_call = Command.run(
+            [
+                'lsblk',
+                '--json',
+                '--list',
+                '-p',
+                '-o',
+                'NAME,TYPE,UUID,WWN,MOUNTPOINTS',
+            ],
+            cache=True,
+        )
+        known_devices = set()
+        for entry in json.loads(lsblk_call.output).get('blockdevices', []):
+            # with --list devices with several parents,
+            # e.g multipath maps, are listed more than once
+            if entry['name'] in known_devices:
+                continue
+            known_devices.add(entry['name'])
+            block_device = block_device_type(
+                name=entry['name'],
+                type=entry.get('type'),
+                uuid=entry.get('uuid'),
+                wwn=entry.get('wwn'),
+                mountpoints=[
+                    mountpoint for mountpoint in entry.get('mountpoints') or [] if mountpoint
+                ],
+            )
+            self.devices.append(block_device)
+        self._update_index()
+
+    def get_devices(self, block_types=None):
+        """
+        Provide block devices in lsblk order
+
+        :param list block_types: only devices of these types, e.g part
+
+        :return: list of block_device_type
+
+        :rtype: list
+        """
+        return [
+            block_device
+            for block_device in self.devices
+            if not block_types or block_device.type in block_types
+        ]
+
+    def get_devices_by_uuid(self, uuid, block_types=None):
+        """
+        Lookup block devices with the given filesystem UUID
+
+        If no device matches, devices of the given types without
+        a UUID from udev are probed with blkid once and the lookup
+        is repeated
+
+        :param str uuid: filesystem UUID
+        :param list block_types: only devices of these types, e.g part
+
+        :return: list of block_device_type in lsblk order
+
+        :rtype: list
+        """
+        block_devices = self._lookup_uuid(uuid, block_types)
+        if not block_devices and not self.probed:
+            self._probe_missing_uuids(block_types)
+            block_devices = self._lookup_uuid(uuid, block_types)
+        return block_devices
+
+    def _lookup_uuid(self, uuid, block_types):
+        return [
+            block_device
+            for block_device in self.uuid_index.get(uuid, [])
+            if not block_types or block_device.type in block_types
+        ]
+
+    def _probe_missing_uuids(self, block_types):
+        self.probed = True
+        missing_devices = [
+            block_device for block_device in self.get_devices(block_types) if not block_device.uuid
+        ]
+        if not missing_devices:
+            return
+        blkid_results = Command.run_many(
+            [
+                ['blkid', block_device.name, '-s', 'UUID', '-o', 'value']
+                for block_device in missing_devices
+            ],
+            raise_on_error=False,
+        )
+        for block_device, blkid_result in zip(missing_devices, blkid_results):
+            uuid = blkid_result.output.strip(os.linesep) if blkid_result.output else ''
+            if uuid:
+                self.devices[self.devices.index(block_device)] = block_device._replace(uuid=uuid)
+        self._update_index()
+
+    def _update_index(self):
+        self.uuid_index = {}
+        for block_device in self.devices:
+            if block_device.uuid:
+                self.uuid_index.setdefault(block_device.uuid, []).append(block_device)
@@ -0,0 +1,254 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import logging
+import os
+import signal
+import subprocess
+import threading
+from multiprocessing import Pipe
+
+# project
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.exceptions import DistMigrationCommandException
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+
+class ChrootExecutor:
+    """
+    **Persistent helper process chrooted into a system root**
+
+    The helper is forked once and chroots into root_path. After
+    that it runs the commands requested over a pipe inside of the
+    chroot and sends the results back. While the executor is
+    active, Command.run and Command.run_stream hand over any
+    command of the form ['chroot', root_path, ...] to the helper
+    instead of calling the chroot program for each of them.
+
+    The helper runs one command at a time. Commands requested
+    while the helper is busy, e.g from Command.run_many, are
+    called the classic way through the chroot program
+
+    Example:
+
+    .. code:: python
+
+        with ChrootExecutor('/system-root'):
+            Command.run(['chroot', '/system-root', 'rpm', '-q', 'wicked'])
+
+    :param str root_path: root directory to chroot into
+    """
+
+    _active: dict = {}
+
+    def __init__(self, root_path):
+        self.root_path = os.path.normpath(root_path)
+        self.pid = None
+        self.connection = None
+        self.lock = threading.Lock()
+        self.returncode = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def get(command):
+        """
+        Provide the active and idle executor for the given command
+
+        If an executor is returned it is reserved for the caller
+        until the next call of communicate() or read_lines() has
+        finished
+
+        :param list command: command and arguments
+
+        :return: ChrootExecutor instance or None
+
+        :rtype: ChrootExecutor
+        """
+        if len(command) < 3 or command[0] != 'chroot':
+            return None
+        executor = ChrootExecutor._active.get(os.path.normpath(command[1]))
+        if executor and executor.lock.acquire(blocking=False):
+            if executor.pid:
+                return executor
+            executor.lock.release()
+        return None
+
+    def start(self):
+        """
+        Fork the helper and chroot it into root_path
+
+        If the helper can't be started commands are called the
+        classic way and the reason is logged as a warning
+        """
+        parent_connection, child_connection = Pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            parent_connection.close()
+            exit_code = 0
+            try:
+                ChrootExecutor._serve(self.root_path, child_connection)
+            except BaseException:
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        child_connection.close()
+        self.pid = pid
+        self.connection = parent_connection
+        try:
+            status, message = self.connection.recv()
+        except (EOFError, OSError) as issue:
+            status, message = 'error', format(issue) or type(issue).__name__
+        if status != 'ready':
+            log.warning(
+                'Chroot executor for {0} not available: {1}'.format(self.root_path, message)
+            )
+            self._terminate()
+            return
+        ChrootExecutor._active[self.root_path] = self
+
+    def close(self):
+        """
+        Stop the helper
+        """
+        if self.pid:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self._terminate()
+
+    def communicate(self, command, environment):
+        """
+        Run command in the chroot and wait for it to finish
+
+        :param list command: command and arguments
+        :param dict environment: environment of the command
+
+        :return: output and error data and the exit code
+
+        :rtype: tuple
+        """
+        try:
+            self._send(('communicate', command, dict(environment), False))
+            return self._recv()
+        finally:
+            self.lock.release()
+
+    def read_lines(self, command, environment, merge_stderr):
+        """
+        Run command in the chroot and provide its output lines
+        as they arrive. The exit code is available in returncode
+        once all lines are read
+
+        :param list command: command and arguments
+        :param dict environment: environment of the command
+        :param bool merge_stderr: pass stderr lines through stdout
+
+        :return: generator of (stream_name, line) tuples
+
+        :rtype: generator
+        """
+        self.returncode = None
+        try:
+            self._send(('stream', command, dict(environment), merge_stderr))
+            while True:
+                stream_name, data = self._recv()
+                if stream_name == 'exit':
+                    self.returncode = data
+                    return
+                yield stream_name, data
+        finally:
+            if self.returncode is None and self.pid:
+                # the caller stopped reading, the pending results
+                # can't be told apart from the next command anymore
+                self._terminate()
+            self.lock.release()
+
+    def _send(self, request):
+        try:
+            self.connection.send(request)
+        except OSError as issue:
+            self._terminate()
+            raise DistMigrationCommandException(
+                'chroot executor {0}: {1}'.format(self.root_path, issue)
+            )
+
+    def _recv(self):
+        try:
+            return self.connection.recv()
+        except (EOFError, OSError) as issue:
+            self._terminate()
+            raise DistMigrationCommandException(
+                'chroot executor {0}: {1}'.format(self.root_path, type(issue).__name__)
+            )
+
+    def _terminate(self):
+        if ChrootExecutor._active.get(self.root_path) is self:
+            del ChrootExecutor._active[self.root_path]
+        os.kill(self.pid, signal.SIGKILL)
+        os.waitpid(self.pid, 0)
+        self.connection.close()
+        self.pid = None
+
+    @staticmethod
+    def _serve(root_path, connection):
+        from suse_migration_services.command import Command
+
+        try:
+            os.chroot(root_path)
+            os.chdir(os.sep)
+        except OSError as issue:
+            connection.send(('error', format(issue)))
+            return
+        connection.send(('ready', None))
+        while True:
+            request = connection.recv()
+            if request is None:
+                return
+            mode, command, environment, merge_stderr = request
+            try:
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+                    env=environment,
+                )
+            except OSError as issue:
+                # same message and exit code as from the chroot program
+                error = "chroot: failed to run command '{0}': {1}".format(
+                    command[0], issue.strerror
+                )
+                if mode == 'communicate':
+                    connection.send((b'', error.encode(), 127))
+                else:
+                    connection.send(('stdout' if merge_stderr else 'stderr', error))
+                    connection.send(('exit', 127))
+                continue
+            if mode == 'communicate':
+                output, error = process.communicate()
+                connection.send((output, error, process.returncode))
+            else:
+                for stream_name, line in Command._read_lines(process):
+                    connection.send((stream_name, line))
+                connection.send(('exit', process.wait()))
@@ -15,12 +15,23 @@
 # You should have received a copy of the GNU General Public License
 # along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
 #
+import asyncio
+import codecs
 import logging
 import os
+import selectors
+import signal
 import subprocess
-from collections import namedtuple
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple, deque
 
 # project
+from suse_migration_services.command_cache import CommandCache
+from suse_migration_services.command_deadline import CommandDeadline, CommandWatchdog
+from suse_migration_services.command_trace import CommandTrace
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.exceptions import (
     DistMigrationCommandException,
@@ -30,6 +41,48 @@ from suse_migration_services.exceptions import (
 log = logging.getLogger(Defaults.get_migration_log_name())
 
 
+class CommandOutputBuffer:
+    """
+    **Bounded storage for the output lines of a command**
+
+    Keeps the first head_lines and the last tail_lines of a
+    stream of lines. Lines in between are counted but dropped
+    such that memory consumption does not grow with the amount
+    of output a command produces
+
+    :param int head_lines: number of lines kept from the start
+    :param int tail_lines: number of lines kept from the end
+    """
+
+    def __init__(self, head_lines=100, tail_lines=400):
+        self.head_lines = head_lines
+        self.head = []
+        self.tail = deque(maxlen=tail_lines)
+        self.dropped_lines = 0
+
+    def append(self, line):
+        if len(self.head) < self.head_lines:
+            self.head.append(line)
+            return
+        if len(self.tail) == self.tail.maxlen:
+            self.dropped_lines += 1
+        self.tail.append(line)
+
+    def get_text(self):
+        """
+        Provide the buffered lines as one string
+
+        :return: kept lines joined by newline
+
+        :rtype: str
+        """
+        lines = list(self.head)
+        if self.dropped_lines:
+            lines.append('[... {0} lines omitted ...]'.format(self.dropped_lines))
+        lines.extend(self.tail)
+        return os.linesep.join(lines)
+
+
 class Command:
     """
     **Implements command invocation**
@@ -40,13 +93,16 @@ class Command:
     """
 
     @staticmethod
-    def run(command, custom_env=None, raise_on_error=True):
+    def run(command, custom_env=None, raise_on_error=True, cache=False, timeout=None):
         """
         Execute a program and block the caller. The return value
         is a hash containing the stdout, stderr and return code
         information. Unless raise_on_error is set to false an
         exception is thrown if the command exits with an error
-        code not equal to zero
+        code not equal to zero. A program that runs longer than
+        its CommandDeadline is terminated together with its
+        process group and an exception is thrown no matter how
+        raise_on_error is set
 
         Example:
 
@@ -57,6 +113,13 @@ class Command:
         :param list command: command and arguments
         :param list custom_env: custom os.environ
         :param bool raise_on_error: control error behaviour
+        :param bool cache:
+            lookup and store the result in the CommandCache. Only
+            to be used for read-only probe commands whose result
+            does not depend on custom_env
+        :param float timeout:
+            max runtime in seconds, overrides the configured
+            timeout of the program but not the unit deadline
 
         :return:
             Contains call results in command type
@@ -67,40 +130,558 @@ class Command:
 
         :rtype: namedtuple
         """
-        from .path import Path
-
         command_type = namedtuple('command', ['output', 'error', 'returncode'])
-        environment = os.environ
-        if custom_env:
-            environment = custom_env
-        if not Path.which(command[0], custom_env=environment, access_mode=os.X_OK):
-            message = 'Command "%s" not found in the environment' % command[0]
-            if not raise_on_error:
+        if cache:
+            cached_result = CommandCache.get(command)
+            if cached_result:
+                log.info('Cached: {0}'.format(command))
+                return command_type(*cached_result)
+        environment = custom_env or os.environ
+        start_time, start = time.time(), time.monotonic()
+        rusage = io_counters = None
+        timeout = CommandDeadline.get_timeout(command, timeout)
+        # the chroot executor can't stop a command, limited
+        # commands are called through the chroot program
+        executor = Command._get_chroot_executor(command) if timeout is None else None
+        if executor:
+            log.info('Calling: {0}'.format(command))
+            output, error, returncode = executor.communicate(command[2:], environment)
+        else:
+            executable = Command._lookup_executable(command, environment, raise_on_error)
+            if not executable:
                 return command_type(output=None, error=None, returncode=-1)
-            else:
-                log.error(message)
-                raise DistMigrationCommandNotFoundException(message)
+            process = Command._popen(
+                command, executable, environment, stderr=subprocess.PIPE, timeout=timeout
+            )
+            watchdog = Command._watch(command, process, timeout)
+            output, error = Command._communicate(process)
+            returncode, rusage, io_counters = Command._wait(process, watchdog)
+            Command._check_expired(command, watchdog, start)
+        CommandTrace.record(
+            command, start_time, time.monotonic() - start, returncode, rusage, io_counters
+        )
+        if CommandCache.is_mutating(command):
+            CommandCache.invalidate()
+        if returncode != 0 and not error:
+            error = bytes(b'(no output on stderr)')
+        if returncode != 0 and not output:
+            output = bytes(b'(no output on stdout)')
+        if returncode != 0 and raise_on_error:
+            log.error(
+                'EXEC: Failed with stderr: {0}, stdout: {1}'.format(error.decode(), output.decode())
+            )
+            raise DistMigrationCommandException(
+                '{0}: stderr: {1}, stdout: {2}'.format(command[0], error.decode(), output.decode())
+            )
+        if cache:
+            CommandCache.store(command, output.decode(), error.decode(), returncode)
+        return command_type(output=output.decode(), error=error.decode(), returncode=returncode)
+
+    @staticmethod
+    def run_many(commands, custom_env=None, raise_on_error=True, max_workers=4, timeout=None):
+        """
+        Execute independent programs concurrently and block the
+        caller until all of them have finished. At most max_workers
+        programs are running at the same time. Each program is
+        called with the semantics of Command.run_async and the
+        results are returned in the order of the given commands.
+        Unless raise_on_error is set to false an exception is
+        thrown after all programs have finished if any of them has
+        exited with an error code not equal to zero. Errors that
+        are not related to the exit code, e.g a command that could
+        not be called or has timed out, are raised in any case.
+        All errors are collected into one exception
+
+        Example:
+
+        .. code:: python
+
+            ip_a, ip_r = Command.run_many([['ip', 'a'], ['ip', 'r']])
+
+        :param list commands: list of command and arguments lists
+        :param list custom_env: custom os.environ
+        :param bool raise_on_error: control error behaviour
+        :param int max_workers: number of programs to run in parallel
+        :param float timeout: max runtime of each program in seconds
+
+        :return:
+            List of call results in command type as returned
+            by Command.run
+
+        :rtype: list
+        """
+        if not commands:
+            return []
+        if Command._can_run_async():
+            results = Command._run_coroutine(
+                Command._run_many_async(commands, custom_env, raise_on_error, max_workers, timeout)
+            )
+        else:
+            results = Command._run_many_threaded(
+                commands, custom_env, raise_on_error, max_workers, timeout
+            )
+        errors = []
+        for command, result in zip(commands, results):
+            if isinstance(result, Exception):
+                errors.append('{0}: {1}'.format(command, result))
+        if errors:
+            raise DistMigrationCommandException(
+                '{0} of {1} commands failed: {2}'.format(
+                    len(errors), len(commands), '; '.join(errors)
+                )
+            )
+        return results
+
+    @staticmethod
+    async def run_async(
+        command, custom_env=None, raise_on_error=True, timeout=None, line_callback=None
+    ):
+        """
+        Coroutine to execute a program without blocking the event
+        loop. The return value and the error behaviour match
+        Command.run. A program that runs longer than the given
+        timeout or its CommandDeadline is terminated together with
+        its process group and an exception is thrown no matter
+        how raise_on_error is set. Each line the program writes
+        to stdout is decoded and passed to the line_callback as
+        soon as it arrives. Commands of the form
+        ['chroot', root_path, ...] are always called through the
+        chroot program, the ChrootExecutor is not used
+
+        Example:
+
+        .. code:: python
+
+            ip_a, ip_r = await asyncio.gather(
+                Command.run_async(['ip', 'a']), Command.run_async(['ip', 'r'])
+            )
+
+        :param list command: command and arguments
+        :param list custom_env: custom os.environ
+        :param bool raise_on_error: control error behaviour
+        :param float timeout:
+            max runtime in seconds, overrides the configured
+            timeout of the program but not the unit deadline
+        :param function line_callback: called with each stdout line
+
+        :return:
+            Contains call results in command type
+
+            .. code:: python
+
+                command(output='string', error='string', returncode=int)
+
+        :rtype: namedtuple
+        """
+        command_type = namedtuple('command', ['output', 'error', 'returncode'])
+        environment = custom_env or os.environ
+        start_time, start = time.time(), time.monotonic()
+        executable = Command._lookup_executable(command, environment, raise_on_error)
+        if not executable:
+            return command_type(output=None, error=None, returncode=-1)
+        timeout = CommandDeadline.get_timeout(command, timeout)
         try:
             log.info('Calling: {0}'.format(command))
-            process = subprocess.Popen(
-                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=environment
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                executable=executable,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=environment,
+                start_new_session=timeout is not None,
             )
         except Exception as issue:
             raise DistMigrationCommandException(
                 '{0}: {1}: {2}'.format(command[0], type(issue).__name__, issue)
             )
-        output, error = process.communicate()
-        if process.returncode != 0 and not error:
+        try:
+            output, error, returncode = await asyncio.wait_for(
+                Command._communicate_async(process, line_callback), timeout
+            )
+        except asyncio.TimeoutError:
+            log.error(
+                'Command {0} stalled, terminating it after {1:.1f} seconds'.format(
+                    command, time.monotonic() - start
+                )
+            )
+            await Command._terminate_async(process)
+            raise DistMigrationCommandException(
+                '{0}: timed out after {1:.1f} seconds'.format(command[0], timeout)
+            )
+        CommandTrace.record(command, start_time, time.monotonic() - start, returncode)
+        if CommandCache.is_mutating(command):
+            CommandCache.invalidate()
+        if returncode != 0 and not error:
             error = bytes(b'(no output on stderr)')
-        if process.returncode != 0 and not output:
+        if returncode != 0 and not output:
             output = bytes(b'(no output on stdout)')
-        if process.returncode != 0 and raise_on_error:
+        if returncode != 0 and raise_on_error:
             log.error(
                 'EXEC: Failed with stderr: {0}, stdout: {1}'.format(error.decode(), output.decode())
             )
             raise DistMigrationCommandException(
                 '{0}: stderr: {1}, stdout: {2}'.format(command[0], error.decode(), output.decode())
             )
-        return command_type(
-            output=output.decode(), error=error.decode(), returncode=process.returncode
+        return command_type(output=output.decode(), error=error.decode(), returncode=returncode)
+
+    @staticmethod
+    def run_stream(
+        command,
+        line_callback=None,
+        custom_env=None,
+        raise_on_error=True,
+        merge_stderr=False,
+        timeout=None,
+    ):
+        """
+        Execute a program and block the caller. Each line the
+        program writes to stdout is decoded and passed to the
+        line_callback as soon as it arrives. Unlike Command.run
+        the complete output is not held in memory, only the first
+        and the last lines of stdout and stderr are kept and
+        returned. Unless raise_on_error is set to false an
+        exception is thrown if the command exits with an error
+        code not equal to zero. The CommandDeadline is applied
+        the same way as in Command.run
+
+        Example:
+
+        .. code:: python
+
+            result = Command.run_stream(['zypper', 'dup'], line_callback=print)
+
+        :param list command: command and arguments
+        :param function line_callback: called with each stdout line
+        :param list custom_env: custom os.environ
+        :param bool raise_on_error: control error behaviour
+        :param bool merge_stderr: pass stderr lines through stdout
+        :param float timeout:
+            max runtime in seconds, overrides the configured
+            timeout of the program but not the unit deadline
+
+        :return:
+            Contains call results in command type, output and
+            error are limited to the lines kept in the
+            CommandOutputBuffer
+
+            .. code:: python
+
+                command(output='string', error='string', returncode=int)
+
+        :rtype: namedtuple
+        """
+        command_type = namedtuple('command', ['output', 'error', 'returncode'])
+        environment = custom_env or os.environ
+        start_time, start = time.time(), time.monotonic()
+        rusage = io_counters = None
+        process = watchdog = None
+        timeout = CommandDeadline.get_timeout(command, timeout)
+        executor = Command._get_chroot_executor(command) if timeout is None else None
+        if executor:
+            log.info('Calling: {0}'.format(command))
+            lines = executor.read_lines(command[2:], environment, merge_stderr)
+        else:
+            executable = Command._lookup_executable(command, environment, raise_on_error)
+            if not executable:
+                return command_type(output=None, error=None, returncode=-1)
+            process = Command._popen(
+                command,
+                executable,
+                environment,
+                stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+                timeout=timeout,
+            )
+            watchdog = Command._watch(command, process, timeout)
+            lines = Command._read_lines(process)
+        output = CommandOutputBuffer()
+        error = CommandOutputBuffer()
+        try:
+            for stream_name, line in lines:
+                if stream_name == 'stdout':
+                    output.append(line)
+                    if line_callback:
+                        line_callback(line)
+                else:
+                    error.append(line)
+        except BaseException:
+            # don't leave the child behind if the caller
+            # side processing of a line has failed
+            if process:
+                if watchdog:
+                    watchdog.stop()
+                process.kill()
+                process.wait()
+            else:
+                lines.close()
+            raise
+        if process:
+            returncode, rusage, io_counters = Command._wait(process, watchdog)
+            Command._check_expired(command, watchdog, start)
+        else:
+            returncode = executor.returncode
+        CommandTrace.record(
+            command, start_time, time.monotonic() - start, returncode, rusage, io_counters
+        )
+        if CommandCache.is_mutating(command):
+            CommandCache.invalidate()
+        output_text = output.get_text()
+        error_text = error.get_text()
+        if returncode != 0 and not error_text:
+            error_text = '(no output on stderr)'
+        if returncode != 0 and not output_text:
+            output_text = '(no output on stdout)'
+        if returncode != 0 and raise_on_error:
+            log.error('EXEC: Failed with stderr: {0}, stdout: {1}'.format(error_text, output_text))
+            raise DistMigrationCommandException(
+                '{0}: stderr: {1}, stdout: {2}'.format(command[0], error_text, output_text)
+            )
+        return command_type(output=output_text, error=error_text, returncode=returncode)
+
+    @staticmethod
+    def _get_chroot_executor(command):
+        from .chroot_executor import ChrootExecutor
+
+        return ChrootExecutor.get(command)
+
+    @staticmethod
+    def _lookup_executable(command, environment, raise_on_error):
+        from .path import Path
+
+        executable = Path.which(command[0], custom_env=environment, access_mode=os.X_OK)
+        if not executable:
+            message = 'Command "%s" not found in the environment' % command[0]
+            if not raise_on_error:
+                return None
+            log.error(message)
+            raise DistMigrationCommandNotFoundException(message)
+        return executable
+
+    @staticmethod
+    def _popen(command, executable, environment, stderr, timeout=None):
+        # executable is the already resolved program path which
+        # saves the PATH lookup on exec. Limited commands get
+        # their own process group such that the watchdog can
+        # stop the command including all its children
+        try:
+            log.info('Calling: {0}'.format(command))
+            return subprocess.Popen(
+                command,
+                executable=executable,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                env=environment,
+                start_new_session=timeout is not None,
+            )
+        except Exception as issue:
+            raise DistMigrationCommandException(
+                '{0}: {1}: {2}'.format(command[0], type(issue).__name__, issue)
+            )
+
+    @staticmethod
+    def _communicate(process):
+        """
+        Read stdout and stderr of the given process until both are closed
+
+        :param subprocess.Popen process: process with piped output
+
+        :return: stdout and stderr data
+
+        :rtype: tuple
+        """
+        data = {'stdout': [], 'stderr': []}
+        for stream_name, chunk in Command._read_chunks(process):
+            data[stream_name].append(chunk)
+        return b''.join(data['stdout']), b''.join(data['stderr'])
+
+    @staticmethod
+    def _wait(process, watchdog=None):
+        """
+        Reap the finished process and collect its resource usage
+
+        The process is waited for without reaping it first, such
+        that its I/O accounting can still be read from /proc.
+        os.wait4 then reaps it and provides the CPU time and max
+        RSS of the process
+
+        :param subprocess.Popen process: process with closed output
+        :param CommandWatchdog watchdog: watchdog to stop before reaping
+
+        :return: exit code, resource usage and I/O counters
+
+        :rtype: tuple
+        """
+        for stream in (process.stdout, process.stderr):
+            if stream:
+                stream.close()
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        io_counters = CommandTrace.read_io_counters(process.pid)
+        if watchdog:
+            watchdog.stop()
+        _, status, rusage = os.wait4(process.pid, 0)
+        # os.waitstatus_to_exitcode is not available on python 3.6
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+        return process.returncode, rusage, io_counters
+
+    @staticmethod
+    def _watch(command, process, timeout):
+        if timeout is None:
+            return None
+        watchdog = CommandWatchdog(command, process.pid, timeout)
+        watchdog.start()
+        return watchdog
+
+    @staticmethod
+    def _check_expired(command, watchdog, start):
+        if watchdog and watchdog.expired:
+            raise DistMigrationCommandException(
+                '{0}: timed out after {1:.1f} seconds'.format(command[0], time.monotonic() - start)
+            )
+
+    @staticmethod
+    async def _terminate_async(process):
+        CommandWatchdog.kill_group(process.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), CommandDeadline.get_grace_time())
+        except asyncio.TimeoutError:
+            CommandWatchdog.kill_group(process.pid, signal.SIGKILL)
+            await process.wait()
+
+    @staticmethod
+    def _can_run_async():
+        # before python 3.8 asyncio can only watch child processes
+        # from the event loop of the main thread
+        return sys.version_info >= (3, 8) or threading.current_thread() is threading.main_thread()
+
+    @staticmethod
+    def _run_coroutine(coroutine):
+        # asyncio.run is not available on python 3.6. Setting the
+        # loop attaches the child watcher to it in the main thread
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    @staticmethod
+    def _run_many_threaded(commands, custom_env, raise_on_error, max_workers, timeout):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    Command.run,
+                    command,
+                    custom_env=custom_env,
+                    raise_on_error=raise_on_error,
+                    timeout=timeout,
+                )
+                for command in commands
+            ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as issue:
+                results.append(issue)
+        return results
+
+    @staticmethod
+    async def _run_many_async(commands, custom_env, raise_on_error, max_workers, timeout):
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(command):
+            async with semaphore:
+                return await Command.run_async(
+                    command, custom_env=custom_env, raise_on_error=raise_on_error, timeout=timeout
+                )
+
+        return await asyncio.gather(*[run(command) for command in commands], return_exceptions=True)
+
+    @staticmethod
+    async def _communicate_async(process, line_callback):
+        output, error = await asyncio.gather(
+            Command._read_stream_async(process.stdout, line_callback),
+            Command._read_stream_async(process.stderr),
         )
+        return output, error, await process.wait()
+
+    @staticmethod
+    async def _read_stream_async(stream, line_callback=None):
+        # data is consumed in chunks, stream.readline() fails
+        # on lines longer than the stream buffer limit
+        data = []
+        decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        remainder = ''
+        while True:
+            chunk = await stream.read(65536)
+            data.append(chunk)
+            if line_callback:
+                lines = (remainder + decoder.decode(chunk, final=not chunk)).split('\n')
+                remainder = lines.pop()
+                for line in lines:
+                    line_callback(line)
+                if not chunk and remainder:
+                    line_callback(remainder)
+            if not chunk:
+                return b''.join(data)
+
+    @staticmethod
+    def _read_chunks(process):
+        """
+        Read stdout and stderr of the given process in parallel
+
+        :param subprocess.Popen process: process with piped output
+
+        :return:
+            generator of (stream_name, data) tuples, an empty
+            data chunk marks the end of a stream
+
+        :rtype: generator
+        """
+        selector = selectors.DefaultSelector()
+        for stream_name, stream in (('stdout', process.stdout), ('stderr', process.stderr)):
+            if stream:
+                selector.register(stream, selectors.EVENT_READ, stream_name)
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    data = os.read(key.fd, 65536)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                    yield key.data, data
+        finally:
+            selector.close()
+
+    @staticmethod
+    def _read_lines(process):
+        """
+        Read stdout and stderr of the given process in parallel
+
+        Data is consumed in chunks as it arrives and decoded
+        incrementally such that multibyte characters split
+        across chunk boundaries are handled correctly
+
+        :param subprocess.Popen process: process with piped output
+
+        :return: generator of (stream_name, line) tuples
+
+        :rtype: generator
+        """
+        decoders = {}
+        remainders = {}
+        for stream_name, data in Command._read_chunks(process):
+            decoder = decoders.setdefault(
+                stream_name, codecs.getincrementaldecoder('utf-8')('replace')
+            )
+            text = remainders.pop(stream_name, '') + decoder.decode(data, final=not data)
+            if not data:
+                if text:
+                    yield stream_name, text
+                continue
+            lines = text.split('\n')
+            remainders[stream_name] = lines.pop()
+            for line in lines:
+                yield stream_name, line
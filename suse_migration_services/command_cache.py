@@ -0,0 +1,206 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+# project
+from suse_migration_services.defaults import Defaults
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+
+class CommandCache:
+    """
+    **Implements a result cache for read-only probe commands**
+
+    Results are stored below a directory in /run such that they
+    are shared between the systemd units of one live system boot.
+    Each entry is keyed by the command arguments and the current
+    invalidation epoch. Any command which is not known to be
+    read-only bumps the epoch and by that invalidates all cached
+    results. An allow-list is used such that a command changing
+    the state of the system, e.g SUSEConnect or snapper, can not
+    be missed
+    """
+
+    epoch_file_name = 'epoch'
+
+    read_only_commands = (
+        'aa-status',
+        'blkid',
+        'cat',
+        'findmnt',
+        'id',
+        'ls',
+        'lsblk',
+        'nm-online',
+        'stat',
+        'uname',
+        'vgs',
+        'xfs_info',
+    )
+    mutating_rpm_options = (
+        '-e',
+        '--erase',
+        '-i',
+        '--install',
+        '-U',
+        '--upgrade',
+        '-F',
+        '--freshen',
+    )
+
+    @staticmethod
+    def get(command):
+        """
+        Lookup cached result for the given command in the current epoch
+
+        :param list command: command and arguments
+
+        :return: (output, error, returncode) or None
+
+        :rtype: tuple
+        """
+        try:
+            with open(CommandCache._get_entry_file(command)) as entry:
+                data = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        if data.get('command') != command:
+            return None
+        return (data['output'], data['error'], data['returncode'])
+
+    @staticmethod
+    def store(command, output, error, returncode):
+        """
+        Store result of the given command in the current epoch
+
+        :param list command: command and arguments
+        :param str output: stdout data
+        :param str error: stderr data
+        :param int returncode: exit code
+        """
+        try:
+            os.makedirs(Defaults.get_command_cache_dir(), exist_ok=True)
+            CommandCache._write_atomic(
+                CommandCache._get_entry_file(command),
+                json.dumps(
+                    {
+                        'command': command,
+                        'output': output,
+                        'error': error,
+                        'returncode': returncode,
+                    }
+                ),
+            )
+        except OSError as issue:
+            log.warning('Failed to cache result of {0}: {1}'.format(command, issue))
+
+    @staticmethod
+    def invalidate():
+        """
+        Bump the epoch and delete all cached results
+
+        Nothing happens if no result was cached so far. Temporary
+        files of other writers are kept and entries removed by a
+        concurrent invalidation are ignored
+        """
+        cache_dir = Defaults.get_command_cache_dir()
+        if not os.path.isdir(cache_dir):
+            return
+        try:
+            epoch = CommandCache._get_epoch()
+            CommandCache._write_atomic(
+                os.sep.join([cache_dir, CommandCache.epoch_file_name]), format(epoch + 1)
+            )
+            for entry in os.scandir(cache_dir):
+                if entry.name == CommandCache.epoch_file_name or entry.name.startswith('.'):
+                    continue
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+        except OSError as issue:
+            log.warning('Failed to invalidate command cache: {0}'.format(issue))
+
+    @staticmethod
+    def is_mutating(command):
+        """
+        Check if the given command may change the system state
+
+        Commands called through chroot are checked for the
+        command that runs inside of the chroot. rpm is read-only
+        unless it is called with an erase or install option, any
+        other command not in read_only_commands is mutating
+
+        :param list command: command and arguments
+
+        :rtype: bool
+        """
+        if command and os.path.basename(command[0]) == 'chroot':
+            command = command[1:]
+            while command and command[0].startswith('-'):
+                command = command[1:]
+            command = command[1:]
+        if not command:
+            # a plain chroot runs an interactive shell
+            return True
+        program = os.path.basename(command[0])
+        if program in CommandCache.read_only_commands:
+            return False
+        if program == 'rpm':
+            for argument in command[1:]:
+                if argument in CommandCache.mutating_rpm_options:
+                    return True
+                if argument.startswith('-') and not argument.startswith('--'):
+                    # combined short options e.g -Uvh but not -qi
+                    options = set(argument[1:])
+                    if options & set('eiUF') and not options & set('qV'):
+                        return True
+            return False
+        return True
+
+    @staticmethod
+    def _get_epoch():
+        try:
+            with open(
+                os.sep.join([Defaults.get_command_cache_dir(), CommandCache.epoch_file_name])
+            ) as epoch:
+                return int(epoch.read().strip())
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _get_entry_file(command):
+        key = hashlib.sha256(json.dumps([CommandCache._get_epoch(), command]).encode()).hexdigest()
+        return os.sep.join([Defaults.get_command_cache_dir(), key])
+
+    @staticmethod
+    def _write_atomic(filename, data):
+        # readers in other units must never see a partially written file
+        handle, temp_name = tempfile.mkstemp(dir=os.path.dirname(filename), prefix='.')
+        try:
+            with os.fdopen(handle, 'w') as temp:
+                temp.write(data)
+            os.replace(temp_name, filename)
+        except OSError:
+            os.unlink(temp_name)
+            raise
@@ -0,0 +1,197 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import logging
+import os
+import signal
+import threading
+import time
+
+# project
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.exceptions import DistMigrationException
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+
+class CommandDeadline:
+    """
+    **Runtime limits of called commands**
+
+    A command is limited by the timeout configured for its
+    program, or the default command timeout if there is none,
+    and by the deadline of the unit calling it. Each unit runs
+    in its own process, the unit deadline therefore counts from
+    the start of the process. Limits are read from the timeouts
+    section of the migration config when first needed and again
+    after the config got updated, they fall back to
+    Defaults.get_command_timeouts(). A value of 0 means no limit
+    """
+
+    unit_start = time.monotonic()
+    _timeouts: dict = {}
+
+    @staticmethod
+    def get_timeout(command, timeout=None):
+        """
+        Provide the number of seconds the given command may run
+
+        :param list command: command and arguments
+        :param float timeout: explicit timeout of the caller, takes
+            precedence over the configured timeout of the program
+
+        :return: seconds or None if the command is not limited
+
+        :rtype: float
+        """
+        timeouts = CommandDeadline._get_timeouts()
+        if timeout is None:
+            if len(command) > 2 and os.path.basename(command[0]) == 'chroot':
+                command = command[2:]
+            program = os.path.basename(command[0]) if command else ''
+            timeout = timeouts['programs'].get(program, timeouts['command']) or None
+        if timeouts['unit']:
+            remaining = max(CommandDeadline.unit_start + timeouts['unit'] - time.monotonic(), 0.0)
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        return timeout
+
+    @staticmethod
+    def get_grace_time():
+        """
+        Provide the number of seconds a process group has to exit
+        after SIGTERM before it is killed with SIGKILL
+
+        :rtype: float
+        """
+        return CommandDeadline._get_timeouts()['grace']
+
+    @staticmethod
+    def get_device_timeout():
+        """
+        Provide the number of seconds to wait for block devices
+        which did not show up yet, limited by the unit deadline
+
+        :rtype: float
+        """
+        timeouts = CommandDeadline._get_timeouts()
+        timeout = timeouts['devices']
+        if timeouts['unit']:
+            remaining = max(CommandDeadline.unit_start + timeouts['unit'] - time.monotonic(), 0.0)
+            timeout = min(timeout, remaining)
+        return timeout
+
+    @staticmethod
+    def reload():
+        """
+        Forget the limits read so far, they are read again from
+        the migration config the next time they are needed
+        """
+        CommandDeadline._timeouts.clear()
+
+    @staticmethod
+    def _get_timeouts():
+        if not CommandDeadline._timeouts:
+            from .migration_config import MigrationConfig
+
+            timeouts = Defaults.get_command_timeouts()
+            try:
+                configured = MigrationConfig().get_timeouts()
+            except (DistMigrationException, OSError) as issue:
+                log.warning('Using default command timeouts: {0}'.format(issue))
+                configured = {}
+            timeouts['programs'].update(configured.pop('programs', {}))
+            timeouts.update(configured)
+            CommandDeadline._timeouts.update(timeouts)
+        return CommandDeadline._timeouts
+
+
+class CommandWatchdog:
+    """
+    **Terminates the process group of a stalled command**
+
+    The command must be started in its own process group, e.g
+    with start_new_session=True. Once the timeout has expired
+    SIGTERM is sent to the group, followed by SIGKILL if the
+    group has not exited within the grace time. The watchdog
+    must be stopped before the process gets reaped such that
+    its process group id can't be reused in the meantime
+
+    :param list command: command and arguments
+    :param int pid: process id of the group leader
+    :param float timeout: seconds until the command is considered stalled
+    """
+
+    def __init__(self, command, pid, timeout):
+        self.command = command
+        self.pid = pid
+        self.timeout = timeout
+        self.expired = False
+        self.start_time = time.monotonic()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.timer = threading.Timer(timeout, self._expire)
+        self.timer.daemon = True
+
+    def start(self):
+        """
+        Start watching the command
+        """
+        self.timer.start()
+
+    def stop(self):
+        """
+        Stop watching the command
+
+        :return: True if the command was terminated by the watchdog
+
+        :rtype: bool
+        """
+        with self.lock:
+            self.stopped.set()
+            self.timer.cancel()
+        return self.expired
+
+    def _expire(self):
+        with self.lock:
+            if self.stopped.is_set():
+                return
+            self.expired = True
+            log.error(
+                'Command {0} stalled, terminating it after {1:.1f} seconds'.format(
+                    self.command, time.monotonic() - self.start_time
+                )
+            )
+            CommandWatchdog.kill_group(self.pid, signal.SIGTERM)
+        if not self.stopped.wait(CommandDeadline.get_grace_time()):
+            with self.lock:
+                if not self.stopped.is_set():
+                    log.error('Command {0} ignored SIGTERM, killing it'.format(self.command))
+                    CommandWatchdog.kill_group(self.pid, signal.SIGKILL)
+
+    @staticmethod
+    def kill_group(pgid, signal_number):
+        """
+        Send signal to all processes of the given process group
+
+        :param int pgid: process group id
+        :param int signal_number: signal to send
+        """
+        try:
+            os.killpg(pgid, signal_number)
+        except OSError:
+            pass
@@ -0,0 +1,180 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import json
+import logging
+import os
+import sys
+import threading
+
+# project
+from suse_migration_services.defaults import Defaults
+
+
+class CommandTrace:
+    """
+    **Resource usage trace of called commands**
+
+    Each command called via Command.run or Command.run_stream is
+    recorded as one JSON line including the calling unit, the
+    command arguments, the wall time, the user and system CPU
+    time, the max RSS and the bytes read from and written to
+    storage. The trace file is placed next to the file the
+    migration log is written to, e.g distro_migration.log is
+    accompanied by distro_migration.trace.jsonl. No trace is
+    written as long as the migration log is not setup
+    """
+
+    lock = threading.Lock()
+
+    @staticmethod
+    def record(command, start_time, wall_time, returncode, rusage=None, io_counters=None):
+        """
+        Append resource usage of a finished command to the trace
+
+        Tracing must never cause a command to fail, errors writing
+        the trace are therefore ignored
+
+        :param list command: command and arguments
+        :param float start_time: time.time() when the command started
+        :param float wall_time: runtime in seconds
+        :param int returncode: exit code
+        :param resource.struct_rusage rusage: as returned by os.wait4
+        :param dict io_counters: as returned by read_io_counters
+        """
+        trace_file = CommandTrace.get_trace_file()
+        if not trace_file:
+            return
+        io_counters = io_counters or {}
+        record = {
+            'unit': os.path.basename(sys.argv[0]),
+            'command': command,
+            'start': round(start_time, 3),
+            'wall': round(wall_time, 3),
+            'user': round(rusage.ru_utime, 3) if rusage else None,
+            'sys': round(rusage.ru_stime, 3) if rusage else None,
+            'max_rss_kb': rusage.ru_maxrss if rusage else None,
+            'read_bytes': io_counters.get('read_bytes'),
+            'write_bytes': io_counters.get('write_bytes'),
+            'returncode': returncode,
+        }
+        try:
+            with CommandTrace.lock:
+                with open(trace_file, 'a') as trace:
+                    trace.write(json.dumps(record) + os.linesep)
+        except OSError:
+            pass
+
+    @staticmethod
+    def read_io_counters(pid):
+        """
+        Read I/O accounting of the given process from /proc
+
+        :param int pid: process id
+
+        :return: counter name and value pairs, empty if not readable
+
+        :rtype: dict
+        """
+        io_counters = {}
+        try:
+            with open('/proc/{0}/io'.format(pid)) as io:
+                for line in io:
+                    name, _, value = line.partition(':')
+                    io_counters[name.strip()] = int(value)
+        except (OSError, ValueError):
+            pass
+        return io_counters
+
+    @staticmethod
+    def get_trace_file():
+        """
+        Provide trace file name next to the migration log file
+
+        :return: file path or None if no log file is setup
+
+        :rtype: str
+        """
+        logger = logging.getLogger(Defaults.get_migration_log_name())
+        for handler in logger.handlers:
+            if isinstance(handler, logging.FileHandler):
+                return os.path.splitext(handler.baseFilename)[0] + '.trace.jsonl'
+        return None
+
+    @staticmethod
+    def summarize(trace_file=None, top=5):
+        """
+        Rank the slowest and the heaviest commands per unit
+
+        :param str trace_file: trace to read, defaults to get_trace_file()
+        :param int top: number of commands listed per unit and category
+
+        :return: summary text, empty if there is no trace
+
+        :rtype: str
+        """
+        trace_file = trace_file or CommandTrace.get_trace_file()
+        units = {}
+        try:
+            with open(trace_file) as trace:
+                for line in trace:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    units.setdefault(record.get('unit') or 'unknown', []).append(record)
+        except (OSError, TypeError):
+            return ''
+        summary = []
+        for unit, records in sorted(units.items()):
+            summary.append(
+                '{0}: {1} commands in {2:.1f}s'.format(
+                    unit, len(records), sum(record['wall'] for record in records)
+                )
+            )
+            summary.append('  slowest:')
+            for record in sorted(records, key=lambda record: record['wall'], reverse=True)[:top]:
+                summary.append(
+                    '    {0:.1f}s (user {1}, sys {2}) {3}'.format(
+                        record['wall'],
+                        _format_value(record.get('user'), 's'),
+                        _format_value(record.get('sys'), 's'),
+                        ' '.join(record['command']),
+                    )
+                )
+            summary.append('  heaviest:')
+            for record in sorted(
+                records,
+                key=lambda record: (
+                    record.get('max_rss_kb') or 0,
+                    (record.get('read_bytes') or 0) + (record.get('write_bytes') or 0),
+                ),
+                reverse=True,
+            )[:top]:
+                summary.append(
+                    '    {0} KiB max RSS, {1} bytes read, {2} bytes written {3}'.format(
+                        _format_value(record.get('max_rss_kb')),
+                        _format_value(record.get('read_bytes')),
+                        _format_value(record.get('write_bytes')),
+                        ' '.join(record['command']),
+                    )
+                )
+        return os.linesep.join(summary)
+
+
+def _format_value(value, suffix=''):
+    return 'n/a' if value is None else format(value) + suffix
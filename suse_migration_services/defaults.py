@@ -55,6 +55,42 @@ class Defaults:
     def get_migration_log_name():
         return 'suse-migration'
 
+    @staticmethod
+    def get_command_cache_dir():
+        return '/run/suse-migration/command-cache'
+
+    @staticmethod
+    def get_pre_checks_cache_file():
+        return '/var/cache/suse-migration/pre-checks.json'
+
+    @staticmethod
+    def get_command_timeouts():
+        # seconds, 0 means no limit. Programs known to hang
+        # on a broken network or cluster setup are limited.
+        # devices is the time to wait for late block devices
+        return {
+            'command': 0,
+            'unit': 0,
+            'grace': 10,
+            'devices': 30,
+            'programs': {
+                'nm-online': 300,
+                'SUSEConnect': 600,
+                'crm': 900,
+                'wicked2nm': 600,
+            },
+        }
+
+    @staticmethod
+    def get_mount_option_overlay():
+        # mount options per filesystem type appended to the options
+        # of the system to migrate if performance.mount_options is set
+        return {
+            'ext4': 'noatime,lazytime,commit=60',
+            'xfs': 'noatime,lazytime',
+            'btrfs': 'noatime,lazytime,commit=60',
+        }
+
     @staticmethod
     def get_migration_exit_code_file():
         return '/var/log/distro_migration.exitcode'
@@ -74,8 +110,8 @@ class Defaults:
         return os.sep.join([Defaults.get_system_root_path(), 'etc/sle-migration-service.yml'])
 
     @staticmethod
-    def get_system_mount_info_file():
-        return '/etc/system-root.fstab'
+    def get_system_mount_ledger_file():
+        return '/etc/system-root.mounts.jsonl'
 
     @staticmethod
     def get_grub_config_file():
@@ -0,0 +1,113 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import os
+
+
+class DeviceAliases:
+    """
+    **In-memory index of the udev /dev/disk/by-* device aliases**
+
+    The alias directories are scanned once and the index maps
+    each alias to its device node and each device node to its
+    aliases. The index is shared by all users in the process and
+    is rebuilt on the next lookup after refresh() was called,
+    e.g once new devices got activated
+    """
+
+    disk_dir = '/dev/disk'
+    alias_types = ('by-uuid', 'by-label', 'by-partuuid', 'by-id', 'by-path')
+
+    _index: dict = {}
+
+    @staticmethod
+    def refresh():
+        """
+        Drop the index, it is rebuilt on the next lookup
+        """
+        DeviceAliases._index.clear()
+
+    @staticmethod
+    def get_node(alias):
+        """
+        Lookup the device node an alias points to
+
+        :param string alias: alias path, e.g /dev/disk/by-uuid/ID
+
+        :return: device node path or None
+
+        :rtype: str
+        """
+        return DeviceAliases._get_index()['nodes'].get(alias)
+
+    @staticmethod
+    def get_aliases(node, alias_type=None):
+        """
+        Lookup the aliases of a device node
+
+        :param string node: device node path, symlinks like
+            /dev/mapper/NAME are resolved to the node first
+        :param string alias_type: only aliases of this type, e.g by-id
+
+        :return: sorted list of alias paths
+
+        :rtype: list
+        """
+        aliases = DeviceAliases._get_index()['aliases'].get(os.path.realpath(node), [])
+        if alias_type:
+            alias_dir = os.sep.join([DeviceAliases.disk_dir, alias_type, ''])
+            aliases = [alias for alias in aliases if alias.startswith(alias_dir)]
+        return aliases
+
+    @staticmethod
+    def exists(device):
+        """
+        Check if the given device node or alias exists
+
+        Devices unknown to the index are checked on the filesystem
+        since udev may have created them after the index was built
+
+        :param string device: device node or alias path
+
+        :rtype: bool
+        """
+        index = DeviceAliases._get_index()
+        return device in index['nodes'] or device in index['aliases'] or os.path.exists(device)
+
+    @staticmethod
+    def _get_index():
+        if not DeviceAliases._index:
+            nodes = {}
+            aliases: dict = {}
+            for alias_type in DeviceAliases.alias_types:
+                alias_dir = os.sep.join([DeviceAliases.disk_dir, alias_type])
+                try:
+                    entries = list(os.scandir(alias_dir))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    node = os.path.normpath(os.path.join(alias_dir, target))
+                    nodes[entry.path] = node
+                    aliases.setdefault(node, []).append(entry.path)
+            for node_aliases in aliases.values():
+                node_aliases.sort()
+            DeviceAliases._index.update(nodes=nodes, aliases=aliases)
+        return DeviceAliases._index
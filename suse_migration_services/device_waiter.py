@@ -0,0 +1,132 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import ctypes
+import logging
+import os
+import select
+import time
+
+# project
+from suse_migration_services.defaults import Defaults
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+
+class DeviceWaiter:
+    """
+    **Wait for late appearing device nodes and aliases**
+
+    The directories of the missing devices, e.g /dev/disk/by-uuid,
+    are watched via inotify(7) and the devices are checked again
+    only once an entry was created in one of them. A directory
+    which does not exist yet is represented by its closest existing
+    parent directory. Without inotify the devices are checked once
+    per poll_interval
+    """
+
+    poll_interval = 1
+
+    _syscalls: dict = {}
+
+    @staticmethod
+    def wait(devices, timeout):
+        """
+        Wait for the given devices to appear
+
+        Example:
+
+        .. code:: python
+
+            for device in DeviceWaiter.wait(['/dev/disk/by-uuid/ID'], 30):
+                mount(device)
+
+        :param list devices: device paths
+        :param float timeout: overall number of seconds to wait
+
+        :return: generator of the device paths in the order they
+            appear, devices which already exist are provided first
+
+        :rtype: generator
+        """
+        missing = list(dict.fromkeys(devices))
+        deadline = time.monotonic() + timeout
+        inotify_fd = DeviceWaiter._inotify_init()
+        try:
+            while missing:
+                if inotify_fd is not None:
+                    for directory in set(DeviceWaiter._get_watch_dir(device) for device in missing):
+                        DeviceWaiter._syscalls['inotify_add_watch'](
+                            inotify_fd, os.fsencode(directory), IN_CREATE | IN_MOVED_TO
+                        )
+                # devices are checked after the watches are setup
+                # such that no creation can get lost in between
+                appeared = [device for device in missing if os.path.exists(device)]
+                for device in appeared:
+                    missing.remove(device)
+                    yield device
+                remaining = deadline - time.monotonic()
+                if appeared or not missing:
+                    continue
+                if remaining <= 0:
+                    return
+                if inotify_fd is None:
+                    time.sleep(min(DeviceWaiter.poll_interval, remaining))
+                else:
+                    poller = select.poll()
+                    poller.register(inotify_fd, select.POLLIN)
+                    if poller.poll(remaining * 1000):
+                        # the events are only a trigger to check again
+                        os.read(inotify_fd, 65536)
+        finally:
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+
+    @staticmethod
+    def _get_watch_dir(device):
+        directory = os.path.dirname(os.path.abspath(device))
+        while not os.path.isdir(directory):
+            directory = os.path.dirname(directory)
+        return directory
+
+    @staticmethod
+    def _inotify_init():
+        if 'inotify_init1' not in DeviceWaiter._syscalls:
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                inotify_init1 = libc.inotify_init1
+                inotify_add_watch = libc.inotify_add_watch
+            except (OSError, AttributeError) as issue:
+                log.warning('Polling for devices, inotify not available: {0}'.format(issue))
+                DeviceWaiter._syscalls['inotify_init1'] = None
+            else:
+                inotify_init1.argtypes = [ctypes.c_int]
+                inotify_init1.restype = ctypes.c_int
+                inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                inotify_add_watch.restype = ctypes.c_int
+                DeviceWaiter._syscalls.update(
+                    inotify_init1=inotify_init1, inotify_add_watch=inotify_add_watch
+                )
+        if not DeviceWaiter._syscalls['inotify_init1']:
+            return None
+        inotify_fd = DeviceWaiter._syscalls['inotify_init1'](IN_NONBLOCK | IN_CLOEXEC)
+        return inotify_fd if inotify_fd >= 0 else None
@@ -66,7 +66,7 @@ class DropComponents:
 
     def package_installed(self, name):
         package_call = Command.run(
-            ['chroot', self.root_path, 'rpm', '-q', name], raise_on_error=False
+            ['chroot', self.root_path, 'rpm', '-q', name], raise_on_error=False, cache=True
         )
         if package_call.returncode == 0:
             return True
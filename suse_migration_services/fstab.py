@@ -17,24 +17,48 @@
 #
 import logging
 import os
-from collections import namedtuple, OrderedDict
+from collections import namedtuple
 
 # project
 from suse_migration_services.defaults import Defaults
+from suse_migration_services.device_aliases import DeviceAliases
 
 log = logging.getLogger(Defaults.get_migration_log_name())
 
+fstab_entry_type = namedtuple(
+    'fstab_entry_type', ['fstype', 'mountpoint', 'device', 'options', 'eligible_for_mount']
+)
+
+
+class FstabNode:
+    """
+    **Directory node of the Fstab path trie**
+    """
+
+    __slots__ = ('children', 'entry')
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+
 
 class Fstab:
     """
     **Managing fstab values**
+
+    Entries are stored in a trie of their mountpoint path
+    components, one entry per mountpoint. The canonical order
+    lists each entry after the entry mounted at its closest
+    parent directory, it is computed in one walk over the trie
+    and kept until the entries change
     """
 
     def __init__(self):
-        self.fstab = []
-        self.fstab_entry_type = namedtuple(
-            'fstab_entry_type', ['fstype', 'mountpoint', 'device', 'options', 'eligible_for_mount']
-        )
+        self.fstab_entry_type = fstab_entry_type
+        self.root = FstabNode()
+        self.canonical_mount_list = None
+        self.mount_levels = None
+        self.missing_entries = []
 
     def read(self, filename):
         """
@@ -45,7 +69,9 @@ class Fstab:
 
         :param string filename: path to a fstab file
         """
-        self.fstab = []
+        self.root = FstabNode()
+        self.missing_entries = []
+        self._invalidate()
         if os.path.exists(filename):
             with open(filename) as fstab:
                 for line in fstab.readlines():
@@ -71,31 +97,41 @@ class Fstab:
                             # not eligible for a mount operation when read
                             # from this fstab instance
                             eligible_for_mount = False
-                        if device.startswith('UUID'):
-                            device_path = ''.join(['/dev/disk/by-uuid/', device.split('=')[1]])
-                        elif device.startswith('LABEL'):
-                            device_path = ''.join(['/dev/disk/by-label/', device.split('=')[1]])
-                        elif device.startswith('PARTUUID'):
-                            device_path = ''.join(['/dev/disk/by-partuuid/', device.split('=')[1]])
-                        else:
-                            device_path = device
-
-                        if os.path.exists(device_path):
-                            self.fstab.append(
-                                self.fstab_entry_type(
-                                    fstype=fstype,
-                                    mountpoint=mountpoint,
-                                    device=device_path,
-                                    options=options,
-                                    eligible_for_mount=eligible_for_mount,
-                                )
-                            )
+                        device_path = self.get_device_path(device)
+                        entry = self.fstab_entry_type(
+                            fstype=fstype,
+                            mountpoint=mountpoint,
+                            device=device_path,
+                            options=options,
+                            eligible_for_mount=eligible_for_mount,
+                        )
+                        if DeviceAliases.exists(device_path):
+                            self._insert(entry)
                         else:
                             log.warning('Device path {0} not found and skipped'.format(device_path))
-                            continue
+                            self.missing_entries.append(entry)
+
+    @staticmethod
+    def get_device_path(device):
+        """
+        Provide the device path for a fstab device specification
+
+        :param string device: device path or UUID=, LABEL=, PARTUUID= tag
+
+        :return: device path, tags are mapped to their udev alias
+
+        :rtype: str
+        """
+        if device.startswith('UUID'):
+            return ''.join(['/dev/disk/by-uuid/', device.split('=')[1]])
+        elif device.startswith('LABEL'):
+            return ''.join(['/dev/disk/by-label/', device.split('=')[1]])
+        elif device.startswith('PARTUUID'):
+            return ''.join(['/dev/disk/by-partuuid/', device.split('=')[1]])
+        return device
 
     def add_entry(self, device, mountpoint, fstype=None, options=None, eligible_for_mount=True):
-        self.fstab.append(
+        self._insert(
             self.fstab_entry_type(
                 fstype=fstype or 'none',
                 mountpoint=mountpoint,
@@ -120,51 +156,146 @@ class Fstab:
                 )
 
     def get_devices(self):
-        return self._get_canonical_mount_list()
+        """
+        Provide entries in canonical mount order
 
-    def _get_canonical_mount_list(self):
+        :return: list of fstab_entry_type elements
+
+        :rtype: list
         """
-        Implements hierarchical sorting of mount paths
+        return list(self._get_canonical_mount_list())
 
-        :return: list of canonical fstab_entry_type elements
+    def get_missing_entries(self):
+        """
+        Provide the entries skipped by read() because their
+        device did not exist, e.g a late iSCSI or multipath device
+
+        :return: list of fstab_entry_type elements in file order
 
         :rtype: list
         """
-        mount_paths = {}
-        sorted_fstab = []
-        for entry in self.fstab:
-            mount_paths[entry.mountpoint] = entry
-        for mountpath in Fstab._sort_by_hierarchy(sorted(mount_paths.keys())):
-            sorted_fstab.append(mount_paths[mountpath])
-        return sorted_fstab
+        return list(self.missing_entries)
 
-    @staticmethod
-    def _sort_by_hierarchy(path_list):
+    def get_umount_order(self):
         """
-        Sort given list of path names by their hierachy in the tree
+        Provide entries in umount order, the reverse canonical order
 
-        Example:
+        :return: list of fstab_entry_type elements
 
-        .. code:: python
+        :rtype: list
+        """
+        return self._get_canonical_mount_list()[::-1]
 
-            result = sort_by_hierarchy(['/var/lib', '/var'])
+    def get_mount_levels(self):
+        """
+        Group entries by their level in the mount dependency tree
+
+        An entry depends on the entry mounted at its closest parent
+        directory. Entries of the same level don't depend on each
+        other and can be mounted at the same time once all entries
+        of the levels before are mounted
+
+        :return: list of levels, each a list of fstab_entry_type
+            elements in canonical order
+
+        :rtype: list
+        """
+        self._get_canonical_mount_list()
+        return [list(mount_level) for mount_level in self.mount_levels]
+
+    def get_parent(self, mountpoint):
+        """
+        Lookup the entry mounted at the closest parent directory
+
+        :param string mountpoint: mountpoint path, need not be an entry
+
+        :return: fstab_entry_type or None
+
+        :rtype: namedtuple
+        """
+        parent = None
+        node = self.root
+        for name in Fstab._split(mountpoint):
+            if node.entry:
+                parent = node.entry
+            node = node.children.get(name)
+            if not node:
+                break
+        return parent
+
+    def get_children(self, mountpoint):
+        """
+        Lookup the entries whose closest parent entry is mounted
+        at the given mountpoint
 
-        :param list path_list: list of path names
+        :param string mountpoint: mountpoint path, need not be an entry
 
-        :return: hierachy sorted path_list
+        :return: list of fstab_entry_type elements in canonical order
 
         :rtype: list
         """
-        paths_at_depth = {}
-        for path in path_list:
-            path_elements = path.split('/')
-            path_depth = len(path_elements)
-            if path_depth not in paths_at_depth:
-                paths_at_depth[path_depth] = []
-            paths_at_depth[path_depth].append(path)
-        ordered_paths_at_depth = OrderedDict(sorted(paths_at_depth.items()))
-        ordered_paths = []
-        for path_depth in ordered_paths_at_depth:
-            for path in ordered_paths_at_depth[path_depth]:
-                ordered_paths.append(path)
-        return ordered_paths
+        node = self._lookup(mountpoint)
+        children = []
+        queue = [node] if node else []
+        for node in queue:
+            for name in sorted(node.children):
+                child = node.children[name]
+                if child.entry:
+                    children.append(child.entry)
+                else:
+                    queue.append(child)
+        return children
+
+    def _get_canonical_mount_list(self):
+        """
+        Walk the trie breadth first, parent directories are visited
+        before their sub directories
+
+        :return: list of canonical fstab_entry_type elements
+
+        :rtype: list
+        """
+        if self.canonical_mount_list is None:
+            canonical_mount_list = []
+            mount_levels = []
+            # node and mount level of the closest parent entry
+            queue = [(self.root, -1)]
+            for node, level in queue:
+                if node.entry:
+                    level += 1
+                    if level == len(mount_levels):
+                        mount_levels.append([])
+                    mount_levels[level].append(node.entry)
+                    canonical_mount_list.append(node.entry)
+                for name in sorted(node.children):
+                    queue.append((node.children[name], level))
+            self.canonical_mount_list = canonical_mount_list
+            self.mount_levels = mount_levels
+        return self.canonical_mount_list
+
+    def _insert(self, entry):
+        node = self.root
+        for name in Fstab._split(entry.mountpoint):
+            if name not in node.children:
+                node.children[name] = FstabNode()
+            node = node.children[name]
+        node.entry = entry
+        self._invalidate()
+
+    def _lookup(self, mountpoint):
+        node = self.root
+        for name in Fstab._split(mountpoint):
+            node = node.children.get(name)
+            if not node:
+                return None
+        return node
+
+    def _invalidate(self):
+        self.canonical_mount_list = None
+        self.mount_levels = None
+
+    @staticmethod
+    def _split(mountpoint):
+        return [
+            name for name in os.path.normpath(mountpoint).split(os.sep) if name not in ('', '.')
+        ]
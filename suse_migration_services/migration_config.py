@@ -22,6 +22,7 @@ from textwrap import dedent
 from cerberus import Validator
 
 # project
+from suse_migration_services.command_deadline import CommandDeadline
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.suse_product import SUSEBaseProduct
 from suse_migration_services.schema import schema
@@ -80,7 +81,7 @@ class MigrationConfig:
          * lists are extended, duplicates are removed
          * all other values are overwritten.
         """
-        MAX_RECURSIONS = 2
+        MAX_RECURSIONS = 3
         if max_recursion_guard > MAX_RECURSIONS:
             message = 'Merge config failed with max recursions {0}>{1}'.format(
                 max_recursion_guard, MAX_RECURSIONS
@@ -163,6 +164,9 @@ class MigrationConfig:
                 MigrationConfig._merge_config_dicts(self.config_data, new_config)
 
                 self._write_config_file()
+                # commands called before, e.g to mount the system,
+                # have used the limits of the image config
+                CommandDeadline.reload()
 
                 message = dedent(
                     '''
@@ -194,9 +198,31 @@ class MigrationConfig:
     def is_verbosity_requested(self):
         return self.config_data.get('verbose_migration', False)
 
+    def is_progress_report_requested(self):
+        return self.config_data.get('report_progress', False)
+
     def is_zypp_solver_test_case_requested(self):
         return self.config_data.get('debug_solver', False)
 
+    def get_timeouts(self):
+        """
+        Return dictionary of configured command timeouts.
+        """
+        return dict(self.config_data.get('timeouts', {}))
+
+    def get_mount_option_overlay(self):
+        """
+        Return dictionary of mount options per filesystem type
+        appended while the system is mounted for the migration.
+        Empty unless performance.mount_options is requested
+        """
+        performance = self.config_data.get('performance', {})
+        if not performance.get('mount_options'):
+            return {}
+        mount_option_overlay = Defaults.get_mount_option_overlay()
+        mount_option_overlay.update(performance.get('mount_option_overlay', {}))
+        return mount_option_overlay
+
     def _write_config_file(self):
         with open(self.migration_config_file, 'w') as config:
             yaml.dump(self.config_data, config, default_flow_style=False)
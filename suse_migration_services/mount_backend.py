@@ -0,0 +1,399 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import ctypes
+import errno
+import logging
+import os
+
+# project
+from suse_migration_services.command import Command
+from suse_migration_services.command_cache import CommandCache
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.exceptions import DistMigrationCommandException
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_SYNCHRONOUS = 0x10
+MS_REMOUNT = 0x20
+MS_MANDLOCK = 0x40
+MS_DIRSYNC = 0x80
+MS_NOATIME = 0x400
+MS_NODIRATIME = 0x800
+MS_BIND = 0x1000
+MS_SILENT = 0x8000
+MS_RELATIME = 0x200000
+MS_IVERSION = 0x800000
+MS_STRICTATIME = 0x1000000
+MS_LAZYTIME = 0x2000000
+
+MNT_DETACH = 0x2
+
+
+class MountBackend:
+    """
+    **Mount and umount via the mount(2) and umount2(2) system calls**
+
+    Bind mounts, remounts, mounts of kernel filesystems and mounts
+    of block devices with plain VFS and filesystem options are done
+    natively through libc instead of calling the mount and umount
+    programs. Everything which needs the userspace logic of
+    mount(8), e.g UUID= or LABEL= sources, filesystem type detection,
+    loop devices or mount.<type> helpers, is still passed to the
+    mount program. Errors are raised as DistMigrationCommandException
+    the same way Command.run raises them for the replaced program
+    """
+
+    _syscalls: dict = {}
+
+    # VFS options as understood by mount(8): option -> (flag, set)
+    vfs_options = {
+        'ro': (MS_RDONLY, True),
+        'rw': (MS_RDONLY, False),
+        'nosuid': (MS_NOSUID, True),
+        'suid': (MS_NOSUID, False),
+        'nodev': (MS_NODEV, True),
+        'dev': (MS_NODEV, False),
+        'noexec': (MS_NOEXEC, True),
+        'exec': (MS_NOEXEC, False),
+        'sync': (MS_SYNCHRONOUS, True),
+        'async': (MS_SYNCHRONOUS, False),
+        'mand': (MS_MANDLOCK, True),
+        'nomand': (MS_MANDLOCK, False),
+        'dirsync': (MS_DIRSYNC, True),
+        'noatime': (MS_NOATIME, True),
+        'atime': (MS_NOATIME, False),
+        'nodiratime': (MS_NODIRATIME, True),
+        'diratime': (MS_NODIRATIME, False),
+        'relatime': (MS_RELATIME, True),
+        'norelatime': (MS_RELATIME, False),
+        'strictatime': (MS_STRICTATIME, True),
+        'nostrictatime': (MS_STRICTATIME, False),
+        'lazytime': (MS_LAZYTIME, True),
+        'nolazytime': (MS_LAZYTIME, False),
+        'iversion': (MS_IVERSION, True),
+        'noiversion': (MS_IVERSION, False),
+        'silent': (MS_SILENT, True),
+        'loud': (MS_SILENT, False),
+    }
+
+    # options only meaningful to mount(8) or fstab consumers
+    ignored_options = (
+        'defaults',
+        'auto',
+        'noauto',
+        'nofail',
+        '_netdev',
+        'nouser',
+        'nousers',
+        'noowner',
+        'nogroup',
+    )
+
+    # options handled by mount(8) only: mount(2) applies propagation
+    # flags in a separate call on an existing mount
+    mount_program_options = (
+        'bind',
+        'rbind',
+        'move',
+        'remount',
+        'loop',
+        'user',
+        'users',
+        'owner',
+        'group',
+        'shared',
+        'rshared',
+        'slave',
+        'rslave',
+        'private',
+        'rprivate',
+        'unbindable',
+        'runbindable',
+    )
+    ignored_option_prefixes = ('x-', 'comment=')
+
+    # per mount flags as reported by statvfs, kept on remount
+    statvfs_flags = {
+        os.ST_RDONLY: MS_RDONLY,
+        os.ST_NOSUID: MS_NOSUID,
+        os.ST_NODEV: MS_NODEV,
+        os.ST_NOEXEC: MS_NOEXEC,
+        os.ST_NOATIME: MS_NOATIME,
+        os.ST_NODIRATIME: MS_NODIRATIME,
+        os.ST_RELATIME: MS_RELATIME,
+    }
+
+    @staticmethod
+    def mount(device, mountpoint, fstype=None, options=None):
+        """
+        Mount device on mountpoint
+
+        :param string device: device path or kernel filesystem name
+        :param string mountpoint: mount target directory
+        :param string fstype: filesystem type, detected by the
+            mount program if not specified
+        :param string options: comma separated mount options
+        """
+        command = MountBackend.get_mount_command(device, mountpoint, fstype, options)
+        if not MountBackend.is_native(device, fstype, options):
+            Command.run(command)
+            return
+        flags, data = MountBackend._parse_options(options)
+        log.info('Calling: {0} (native)'.format(command))
+        MountBackend._syscall(command, 'mount', device, mountpoint, fstype, flags, data)
+
+    @staticmethod
+    def bind(source, target, read_only=False):
+        """
+        Bind mount source on target
+
+        :param string source: file or directory to bind
+        :param string target: mount target
+        :param bool read_only: make the bind mount read-only
+        """
+        command = ['mount', '--bind'] + (['-o', 'ro'] if read_only else []) + [source, target]
+        if not MountBackend._get_syscalls():
+            Command.run(command)
+            return
+        log.info('Calling: {0} (native)'.format(command))
+        MountBackend._syscall(command, 'mount', source, target, None, MS_BIND, None)
+        if read_only:
+            # the flags of a bind mount can only be changed by a remount
+            MountBackend._syscall(
+                command,
+                'mount',
+                None,
+                target,
+                None,
+                MountBackend._get_mount_flags(target) | MS_REMOUNT | MS_BIND | MS_RDONLY,
+                None,
+            )
+
+    @staticmethod
+    def remount(mountpoint, options):
+        """
+        Remount mountpoint with changed VFS options
+
+        Flags not changed by the given options are kept
+
+        :param string mountpoint: mounted directory
+        :param string options: comma separated mount options, e.g rw
+        """
+        command = ['mount', '-o', 'remount,{0}'.format(options), mountpoint]
+        parsed_options = MountBackend._parse_options(options)
+        if not MountBackend._get_syscalls() or not parsed_options or parsed_options[1]:
+            # filesystem options are merged with the current ones by mount(8)
+            Command.run(command)
+            return
+        log.info('Calling: {0} (native)'.format(command))
+        flags = MountBackend._apply_options(MountBackend._get_mount_flags(mountpoint), options)
+        MountBackend._syscall(command, 'mount', None, mountpoint, None, flags | MS_REMOUNT, None)
+
+    @staticmethod
+    def umount(mountpoint, lazy=False, raise_on_error=True):
+        """
+        Umount mountpoint
+
+        :param string mountpoint: mounted directory
+        :param bool lazy: detach now, cleanup once no longer busy
+        :param bool raise_on_error: control error behaviour
+
+        :return: True on success
+
+        :rtype: bool
+        """
+        command = ['umount'] + (['--lazy'] if lazy else []) + [mountpoint]
+        if not MountBackend._get_syscalls():
+            return Command.run(command, raise_on_error=raise_on_error).returncode == 0
+        log.info('Calling: {0} (native)'.format(command))
+        try:
+            MountBackend._syscall(command, 'umount2', mountpoint, MNT_DETACH if lazy else 0)
+        except DistMigrationCommandException:
+            if raise_on_error:
+                raise
+            return False
+        return True
+
+    @staticmethod
+    def umount_unless_busy(mountpoint):
+        """
+        Umount mountpoint if it is not in use
+
+        A busy mountpoint is not considered an error, all other
+        errors are raised
+
+        :param string mountpoint: mounted directory
+
+        :return: True on success, False if mountpoint is busy
+
+        :rtype: bool
+        """
+        command = ['umount', mountpoint]
+        if not MountBackend._get_syscalls():
+            result = Command.run(command, raise_on_error=False)
+            if result.returncode == 0:
+                return True
+            if 'target is busy' in result.error:
+                log.info('{0}: {1}'.format(command[0], result.error.strip()))
+                return False
+            log.error(
+                'EXEC: Failed with stderr: {0}, stdout: {1}'.format(result.error, result.output)
+            )
+            raise DistMigrationCommandException(
+                '{0}: stderr: {1}, stdout: {2}'.format(command[0], result.error, result.output)
+            )
+        log.info('Calling: {0} (native)'.format(command))
+        return (
+            MountBackend._syscall(command, 'umount2', mountpoint, 0, expected_errors=(errno.EBUSY,))
+            == 0
+        )
+
+    @staticmethod
+    def is_native(device, fstype=None, options=None):
+        """
+        Check if a mount can be done without the mount program
+
+        :param string device: device path or kernel filesystem name
+        :param string fstype: filesystem type
+        :param string options: comma separated mount options
+
+        :rtype: bool
+        """
+        if not MountBackend._get_syscalls():
+            return False
+        if not device.startswith(os.sep) and ('=' in device or ':' in device):
+            # tags like UUID= and network sources are resolved by mount(8)
+            return False
+        if not fstype or fstype in ('auto', 'none', 'swap') or ',' in fstype:
+            return False
+        for sbin in ('/sbin', '/usr/sbin'):
+            if os.path.exists(os.sep.join([sbin, 'mount.{0}'.format(fstype)])):
+                return False
+        return MountBackend._parse_options(options) is not None
+
+    @staticmethod
+    def get_mount_command(device, mountpoint, fstype=None, options=None):
+        """
+        Provide the mount program call for the given mount
+
+        :param string device: device path or kernel filesystem name
+        :param string mountpoint: mount target directory
+        :param string fstype: filesystem type
+        :param string options: comma separated mount options
+
+        :return: command and arguments
+
+        :rtype: list
+        """
+        command = ['mount']
+        if fstype:
+            command += ['-t', fstype]
+        if options:
+            command += ['-o', options]
+        return command + [device, mountpoint]
+
+    @staticmethod
+    def _parse_options(options):
+        # split mount options into mount(2) flags and the option
+        # string passed to the filesystem. None if an option needs
+        # the mount program, e.g loop or bind
+        flags = 0
+        data = []
+        for option in (options or '').split(','):
+            if not option or option in MountBackend.ignored_options:
+                continue
+            if option.lower().startswith(MountBackend.ignored_option_prefixes):
+                if option.startswith('X-mount.'):
+                    return None
+                continue
+            if option in MountBackend.vfs_options:
+                flags = MountBackend._apply_options(flags, option)
+            elif option in MountBackend.mount_program_options or option.startswith(
+                ('loop=', 'offset=', 'sizelimit=', 'helper=', 'uhelper=')
+            ):
+                return None
+            else:
+                data.append(option)
+        return flags, ','.join(data) or None
+
+    @staticmethod
+    def _apply_options(flags, options):
+        for option in options.split(','):
+            if option in MountBackend.vfs_options:
+                flag, enabled = MountBackend.vfs_options[option]
+                flags = flags | flag if enabled else flags & ~flag
+        return flags
+
+    @staticmethod
+    def _get_mount_flags(mountpoint):
+        try:
+            mount_flags = os.statvfs(mountpoint).f_flag
+        except OSError:
+            return 0
+        flags = 0
+        for statvfs_flag, flag in MountBackend.statvfs_flags.items():
+            if mount_flags & statvfs_flag:
+                flags |= flag
+        return flags
+
+    @staticmethod
+    def _syscall(command, name, *args, expected_errors=()):
+        # log and fail like Command.run for the replaced program,
+        # the error number of an expected error is returned
+        syscall = MountBackend._get_syscalls()[name]
+        result = syscall(*[os.fsencode(arg) if isinstance(arg, str) else arg for arg in args])
+        CommandCache.invalidate()
+        if result != 0:
+            error_code = ctypes.get_errno()
+            issue = OSError(
+                error_code, os.strerror(error_code), args[1] if name == 'mount' else args[0]
+            )
+            if error_code in expected_errors:
+                log.info('{0}: {1}'.format(command[0], issue))
+                return error_code
+            log.error('EXEC: Failed with: {0}'.format(issue))
+            raise DistMigrationCommandException('{0}: {1}'.format(command[0], issue))
+        return 0
+
+    @staticmethod
+    def _get_syscalls():
+        if 'mount' not in MountBackend._syscalls:
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                mount = libc.mount
+                umount2 = libc.umount2
+            except (OSError, AttributeError) as issue:
+                log.warning('Using mount program, mount(2) not available: {0}'.format(issue))
+                MountBackend._syscalls['mount'] = None
+            else:
+                mount.argtypes = [
+                    ctypes.c_char_p,
+                    ctypes.c_char_p,
+                    ctypes.c_char_p,
+                    ctypes.c_ulong,
+                    ctypes.c_char_p,
+                ]
+                mount.restype = ctypes.c_int
+                umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+                umount2.restype = ctypes.c_int
+                MountBackend._syscalls.update(mount=mount, umount2=umount2)
+        return MountBackend._syscalls if MountBackend._syscalls['mount'] else {}
@@ -0,0 +1,226 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import os
+import re
+import select
+from collections import namedtuple
+
+mount_info_type = namedtuple(
+    'mount_info_type',
+    [
+        'mount_id',
+        'parent_id',
+        'major_minor',
+        'root',
+        'mountpoint',
+        'options',
+        'fstype',
+        'source',
+        'super_options',
+    ],
+)
+
+
+class MountInfo:
+    """
+    **Indexed snapshot of the mount table of the process**
+
+    The snapshot is read from /proc/self/mountinfo in one go and
+    indexed by mountpoint, source and mount id. It also records
+    the mount tree via the parent ids. Other than os.path.ismount
+    the mount table also knows about bind mounts. The kernel flags
+    the open mountinfo file for poll once the mount table has changed.
+    The snapshot is read again only then
+    """
+
+    mountinfo_file = '/proc/self/mountinfo'
+
+    _state: dict = {}
+
+    @staticmethod
+    def is_mounted(mountpoint):
+        """
+        Check if something is mounted at mountpoint
+
+        :param string mountpoint: directory path
+
+        :rtype: bool
+        """
+        return MountInfo.get_mount(mountpoint) is not None
+
+    @staticmethod
+    def get_mount(mountpoint):
+        """
+        Lookup the visible mount at mountpoint, which is the
+        topmost one if several are stacked
+
+        :param string mountpoint: directory path
+
+        :return: mount_info_type or None
+
+        :rtype: namedtuple
+        """
+        mounts = MountInfo._get_snapshot()['by_mountpoint'].get(os.path.realpath(mountpoint))
+        return mounts[-1] if mounts else None
+
+    @staticmethod
+    def get_source(mountpoint):
+        """
+        Lookup the source of the visible mount at mountpoint,
+        e.g the block device of a filesystem
+
+        :param string mountpoint: directory path
+
+        :return: source or None
+
+        :rtype: str
+        """
+        mount = MountInfo.get_mount(mountpoint)
+        return mount.source if mount else None
+
+    @staticmethod
+    def get_mounts_by_source(source):
+        """
+        Lookup all mounts of a source
+
+        :param string source: mount source, e.g /dev/sda1
+
+        :return: list of mount_info_type elements in mount order
+
+        :rtype: list
+        """
+        return list(MountInfo._get_snapshot()['by_source'].get(source, []))
+
+    @staticmethod
+    def get_submounts(mountpoint):
+        """
+        Lookup all mounts below the mounts at mountpoint
+
+        :param string mountpoint: directory path
+
+        :return: list of mount_info_type elements, parents before children
+
+        :rtype: list
+        """
+        snapshot = MountInfo._get_snapshot()
+        submounts = []
+        # mounts stacked on mountpoint are children of the lowest one
+        queue = snapshot['by_mountpoint'].get(os.path.realpath(mountpoint), [])[:1]
+        for mount in queue:
+            for child in snapshot['children'].get(mount.mount_id, []):
+                if child.mountpoint != mount.mountpoint:
+                    submounts.append(child)
+                queue.append(child)
+        return submounts
+
+    @staticmethod
+    def get_umount_levels(mountpoints):
+        """
+        Group the mounts at the given mountpoints and all mounts
+        below them by their height in the mount tree. The first
+        level holds the leaves, each following level only holds
+        mounts whose submounts are part of an earlier level. The
+        mounts of one level are independent from each other and
+        can be umounted concurrently
+
+        :param list mountpoints: directory paths, paths which are
+            not mounted are ignored
+
+        :return: list of lists of mount_info_type elements
+
+        :rtype: list
+        """
+        snapshot = MountInfo._get_snapshot()
+        selected = {}
+        for mountpoint in mountpoints:
+            queue = list(snapshot['by_mountpoint'].get(os.path.realpath(mountpoint), []))
+            for mount in queue:
+                if mount.mount_id not in selected:
+                    selected[mount.mount_id] = mount
+                    queue.extend(snapshot['children'].get(mount.mount_id, []))
+        heights: dict = {}
+
+        def get_height(mount):
+            if mount.mount_id not in heights:
+                heights[mount.mount_id] = 1 + max(
+                    [get_height(child) for child in snapshot['children'].get(mount.mount_id, [])],
+                    default=-1,
+                )
+            return heights[mount.mount_id]
+
+        levels: list = []
+        for mount in selected.values():
+            height = get_height(mount)
+            while len(levels) <= height:
+                levels.append([])
+            levels[height].append(mount)
+        return [sorted(level, key=lambda mount: mount.mountpoint) for level in levels]
+
+    @staticmethod
+    def refresh():
+        """
+        Read the mount table again on the next query
+        """
+        if 'file' in MountInfo._state:
+            MountInfo._state['file'].close()
+        MountInfo._state.clear()
+
+    @staticmethod
+    def _get_snapshot():
+        state = MountInfo._state
+        if 'file' not in state:
+            state['file'] = open(MountInfo.mountinfo_file)
+            state['poll'] = select.poll()
+            state['poll'].register(state['file'], select.POLLPRI | select.POLLERR)
+            state['snapshot'] = None
+        # a pending event means the mount table changed since the last poll
+        if state['snapshot'] is None or state['poll'].poll(0):
+            state['file'].seek(0)
+            state['snapshot'] = MountInfo._parse(state['file'].read())
+        return state['snapshot']
+
+    @staticmethod
+    def _parse(mountinfo):
+        snapshot: dict = {'by_id': {}, 'by_mountpoint': {}, 'by_source': {}, 'children': {}}
+        for line in mountinfo.splitlines():
+            fields = line.split()
+            if '-' not in fields:
+                continue
+            separator = fields.index('-')
+            mount = mount_info_type(
+                mount_id=int(fields[0]),
+                parent_id=int(fields[1]),
+                major_minor=fields[2],
+                root=MountInfo._unescape(fields[3]),
+                mountpoint=MountInfo._unescape(fields[4]),
+                options=fields[5],
+                fstype=fields[separator + 1],
+                source=MountInfo._unescape(fields[separator + 2]),
+                super_options=fields[separator + 3] if len(fields) > separator + 3 else '',
+            )
+            snapshot['by_id'][mount.mount_id] = mount
+            snapshot['by_mountpoint'].setdefault(mount.mountpoint, []).append(mount)
+            snapshot['by_source'].setdefault(mount.source, []).append(mount)
+            if mount.parent_id != mount.mount_id:
+                snapshot['children'].setdefault(mount.parent_id, []).append(mount)
+        return snapshot
+
+    @staticmethod
+    def _unescape(value):
+        # space, tab, newline and backslash are escaped as octal
+        return re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), value)
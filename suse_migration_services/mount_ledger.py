@@ -0,0 +1,115 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import json
+import os
+import sys
+import time
+
+# project
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.fstab import Fstab
+
+
+class MountLedger:
+    """
+    **Append-only record of the mounts done by the migration units**
+
+    Each mount and bind mount is recorded as one JSON line including
+    the unit which did it and the time. Records are collected and
+    appended to the ledger by sync() in one write followed by fsync.
+    Existing records are never rewritten, a later record for the same
+    mountpoint supersedes an earlier one in the canonical view which
+    is built from the ledger on first use
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename or Defaults.get_system_mount_ledger_file()
+        self.pending = []
+        self.fstab = None
+
+    def add_entry(self, device, mountpoint, fstype=None, options=None, eligible_for_mount=True):
+        """
+        Record a mount, written to the ledger on the next sync()
+
+        :param string device: device path or bind mount source
+        :param string mountpoint: mount target
+        :param string fstype: filesystem type
+        :param string options: comma separated mount options
+        :param bool eligible_for_mount: mounted by mount_system
+        """
+        record = {
+            'unit': os.path.basename(sys.argv[0]),
+            'time': round(time.time(), 3),
+            'device': device,
+            'mountpoint': mountpoint,
+            'fstype': fstype,
+            'options': options,
+            'eligible_for_mount': eligible_for_mount,
+        }
+        self.pending.append(record)
+        if self.fstab:
+            self._add_to_fstab(self.fstab, record)
+
+    def sync(self):
+        """
+        Append the pending records to the ledger and sync it to disk
+        """
+        if self.pending:
+            with open(self.filename, 'a') as ledger:
+                ledger.write(''.join(json.dumps(record) + os.linesep for record in self.pending))
+                ledger.flush()
+                os.fsync(ledger.fileno())
+            self.pending = []
+
+    def get_fstab(self):
+        """
+        Provide the canonical view of the recorded mounts
+
+        Pending records are included, lines not readable as a
+        record, e.g one torn by a crash, are skipped
+
+        :return: Fstab instance
+
+        :rtype: Fstab
+        """
+        if not self.fstab:
+            fstab = Fstab()
+            try:
+                with open(self.filename) as ledger:
+                    for line in ledger:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        self._add_to_fstab(fstab, record)
+            except FileNotFoundError:
+                pass
+            for record in self.pending:
+                self._add_to_fstab(fstab, record)
+            self.fstab = fstab
+        return self.fstab
+
+    @staticmethod
+    def _add_to_fstab(fstab, record):
+        fstab.add_entry(
+            record['device'],
+            record['mountpoint'],
+            record['fstype'],
+            record['options'],
+            record['eligible_for_mount'],
+        )
@@ -15,17 +15,29 @@
 # You should have received a copy of the GNU General Public License
 # along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
 #
+import logging
 import os
+import shutil
 
 # project
-from suse_migration_services.command import Command
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.exceptions import DistMigrationCommandException
+
+log = logging.getLogger(Defaults.get_migration_log_name())
 
 
 class Path:
     """
-    **Directory path helpers**
+    **Directory path and file helpers**
+
+    File operations are implemented natively instead of calling
+    coreutils programs. Errors are raised as
+    DistMigrationCommandException the same way Command.run
+    raises them for the program the operation replaces
     """
 
+    _which_cache: dict = {}
+
     @staticmethod
     def create(path):
         """
@@ -33,7 +45,7 @@ class Path:
 
         :param string path: path name
         """
-        Command.run(['mkdir', '-p', path])
+        Path._call(['mkdir', '-p', path], os.makedirs, path, exist_ok=True)
 
     @staticmethod
     def wipe(path):
@@ -42,7 +54,7 @@ class Path:
 
         :param string path: path name
         """
-        Command.run(['rm', '-r', '-f', path])
+        Path._call(['rm', '-r', '-f', path], Path._wipe, path)
 
     @staticmethod
     def remove(path):
@@ -51,13 +63,40 @@ class Path:
 
         :param string path: path name
         """
-        Command.run(['rmdir', path])
+        Path._call(['rmdir', path], os.rmdir, path)
+
+    @staticmethod
+    def touch(filename):
+        """
+        Create file if it does not exist and update its timestamps
+
+        :param string filename: file path
+        """
+        Path._call(['touch', filename], Path._touch, filename)
+
+    @staticmethod
+    def read(filename):
+        """
+        Read file contents
+
+        :param string filename: file path
+
+        :return: file contents
+
+        :rtype: str
+        """
+        return Path._call(['cat', filename], Path._read, filename)
 
     @staticmethod
     def which(filename, alternative_lookup_paths=None, custom_env=None, access_mode=None):
         """
         Lookup file name in PATH
 
+        Successful lookups are cached. A cached location is used
+        as long as none of the directories searched up to and
+        including the one it was found in changed, which costs
+        one stat call per directory
+
         :param string filename: file base name
         :param list alternative_lookup_paths: list of additional lookup paths
         :param list custom_env: a custom os.environ
@@ -70,7 +109,6 @@ class Path:
         :rtype: str
         """
         lookup_paths = []
-        multipart_message = ['"%s": ' % filename, 'exists: unknown', 'mode match: not checked']
         system_path = os.environ.get('PATH')
         if custom_env:
             system_path = custom_env.get('PATH')
@@ -78,15 +116,69 @@ class Path:
             lookup_paths = system_path.split(os.pathsep)
         if alternative_lookup_paths:
             lookup_paths += alternative_lookup_paths
-        multipart_message[0] += 'in paths "%s"' % ':'.join(lookup_paths)
+        cache_key = (system_path, filename, access_mode, tuple(alternative_lookup_paths or []))
+        cached = Path._which_cache.get(cache_key)
+        if cached:
+            location, mtimes = cached
+            if all(Path._get_mtime(path) == mtime for path, mtime in mtimes):
+                return location
+        mtimes = []
         for path in lookup_paths:
+            # adding a program to a directory searched before the
+            # match must invalidate the cached location as well
+            mtimes.append((path, Path._get_mtime(path)))
             location = os.path.join(path, filename)
-            file_exists = os.path.exists(location)
-            multipart_message[1] = 'exists: "%s"' % file_exists
-            if access_mode and file_exists:
-                mode_match = os.access(location, access_mode)
-                multipart_message[2] = 'mode match: "%s"' % mode_match
-                if mode_match:
-                    return location
-            elif file_exists:
+            if Path._is_match(location, access_mode):
+                Path._which_cache[cache_key] = (location, mtimes)
                 return location
+        return None
+
+    @staticmethod
+    def which_cache_clear():
+        """
+        Forget all cached Path.which lookups
+        """
+        Path._which_cache.clear()
+
+    @staticmethod
+    def _call(command, operation, *args, **kwargs):
+        # log and fail like Command.run for the replaced program
+        log.info('Calling: {0} (native)'.format(command))
+        try:
+            return operation(*args, **kwargs)
+        except OSError as issue:
+            log.error('EXEC: Failed with: {0}'.format(issue))
+            raise DistMigrationCommandException('{0}: {1}'.format(command[0], issue))
+
+    @staticmethod
+    def _wipe(path):
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        elif os.path.lexists(path):
+            os.remove(path)
+
+    @staticmethod
+    def _touch(filename):
+        with open(filename, 'a'):
+            os.utime(filename)
+
+    @staticmethod
+    def _read(filename):
+        with open(filename) as handle:
+            return handle.read()
+
+    @staticmethod
+    def _is_match(location, access_mode):
+        if not os.path.exists(location):
+            return False
+        if access_mode:
+            return os.access(location, access_mode)
+        return True
+
+    @staticmethod
+    def _get_mtime(path):
+        # adding, removing or renaming a file changes the mtime
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,143 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+"""Cache pre-check results keyed by a fingerprint of their inputs"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from suse_migration_services.defaults import Defaults
+from suse_migration_services.version import __VERSION__
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+
+class PreCheckCache:
+    """
+    **Implements a result cache for the pre-checks**
+
+    The fingerprint of a check covers the status of the files it
+    declared as its inputs, the given context e.g the command line
+    options, the version of the checks and the boot id. A stored
+    result is valid as long as the fingerprint is the same, runtime
+    state like loaded AppArmor profiles is expected to change only
+    together with the configuration files or by a reboot
+    """
+
+    def __init__(self, filename=None, context=None):
+        self.filename = filename or Defaults.get_pre_checks_cache_file()
+        self.context = context or {}
+        self.entries = None
+        self.changed = False
+
+    def get_fingerprint(self, name, inputs):
+        """
+        Calculate the fingerprint of a check
+
+        :param string name: check name
+        :param list inputs: file paths or glob patterns, ** matches
+            any number of sub directories
+
+        :return: hex digest
+
+        :rtype: str
+        """
+        status = []
+        for pattern in inputs:
+            for path in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+                status.append([path] + PreCheckCache._get_file_status(path))
+        return hashlib.sha256(
+            json.dumps(
+                [__VERSION__, PreCheckCache._get_boot_id(), self.context, name, status]
+            ).encode()
+        ).hexdigest()
+
+    def get(self, name, fingerprint):
+        """
+        Lookup the findings stored for the given check and fingerprint
+
+        :param string name: check name
+        :param string fingerprint: current fingerprint of the check
+
+        :return: list of findings or None
+
+        :rtype: list
+        """
+        entry = self._get_entries().get(name)
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return None
+        return entry['findings']
+
+    def store(self, name, fingerprint, findings):
+        """
+        Store the findings of a check, written by sync()
+
+        :param string name: check name
+        :param string fingerprint: fingerprint of the check before it ran
+        :param list findings: logged warnings and errors
+        """
+        self._get_entries()[name] = {'fingerprint': fingerprint, 'findings': findings}
+        self.changed = True
+
+    def sync(self):
+        """
+        Write the cache file if results got stored
+        """
+        if not self.changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            handle, temp_name = tempfile.mkstemp(dir=os.path.dirname(self.filename), prefix='.')
+            try:
+                with os.fdopen(handle, 'w') as temp:
+                    json.dump(self.entries, temp)
+                os.replace(temp_name, self.filename)
+            except OSError:
+                os.unlink(temp_name)
+                raise
+            self.changed = False
+        except OSError as issue:
+            log.warning('Failed to write pre-checks cache: {0}'.format(issue))
+
+    def _get_entries(self):
+        if self.entries is None:
+            try:
+                with open(self.filename) as cache:
+                    self.entries = json.load(cache)
+            except (OSError, ValueError):
+                self.entries = {}
+        return self.entries
+
+    @staticmethod
+    def _get_file_status(path):
+        try:
+            status = os.stat(path)
+        except OSError:
+            return [None]
+        return [status.st_ino, status.st_size, status.st_mtime_ns, status.st_ctime_ns]
+
+    @staticmethod
+    def _get_boot_id():
+        try:
+            with open('/proc/sys/kernel/random/boot_id') as boot_id:
+                return boot_id.read().strip()
+        except OSError:
+            return None
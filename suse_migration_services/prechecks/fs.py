@@ -17,6 +17,7 @@
 # You should have received a copy of the GNU General Public License
 # along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
 """Module for checking for encrypted filesystems"""
+
 import logging
 
 from suse_migration_services.command import Command
@@ -34,8 +35,13 @@ def encryption(migration_system=False):
     fstab.read(fstab_path)
     fstab_entries = fstab.get_devices()
 
-    for fstab_entry in fstab_entries:
-        result = Command.run(["blkid", "-s", "TYPE", "-o", "value", fstab_entry.device])
+    results = Command.run_many(
+        [
+            ["blkid", "-s", "TYPE", "-o", "value", fstab_entry.device]
+            for fstab_entry in fstab_entries
+        ]
+    )
+    for fstab_entry, result in zip(fstab_entries, results):
         if result.returncode == 0:
             if 'LUKS' in result.output:
                 log.warning(
@@ -18,16 +18,21 @@
 """
 Call prechecks for LSM migration (apparmor to selinux)
 """
+import hashlib
 import logging
 import json
+import mmap
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from textwrap import dedent
 
 from suse_migration_services.command import Command
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.migration_target import MigrationTarget
 
+APPARMOR_PROFILE_DIR = '/etc/apparmor.d'
+
 # find /etc/apparmor.d/ | wc -l
 DEFAULT_ETC_FILE_COUNT = 263
 # aa-status --json | jq '.profiles | length'
@@ -58,6 +63,17 @@ ADDITIONAL_AA_PROFILES = [
     "monitoring-plugins-userso",
 ]
 
+# rpm FILEDIGESTALGO values, packages without the tag use md5
+RPM_DIGEST_ALGORITHMS = {
+    '1': 'md5',
+    '2': 'sha1',
+    '8': 'sha256',
+    '9': 'sha384',
+    '10': 'sha512',
+    '11': 'sha224',
+}
+RPMFILE_GHOST = 1 << 6
+
 log = logging.getLogger(Defaults.get_migration_log_name())
 
 
@@ -88,10 +104,13 @@ def check_lsm(migration_system=False):
             if aa_status_output:
                 aa_data = json.loads(aa_status_output)
 
-                manual_check_needed = _apparmor_standard_profiles_modified()
+                modified_packages = _get_modified_profile_packages(
+                    ['apparmor-profiles'] + ADDITIONAL_AA_PROFILES
+                )
+                manual_check_needed = _apparmor_standard_profiles_modified(modified_packages)
                 if (
                     _apparmor_additional_profiles(aa_data)
-                    and _apparmor_extended_profiles_modified()
+                    and _apparmor_extended_profiles_modified(modified_packages)
                 ):
                     manual_check_needed = True
 
@@ -122,8 +141,7 @@ def _apparmor_enabled():
 
 def _apparmor_primitive_check():
     # check amount of files in /etc/apparmor.d/
-    apparmor_files = Command.run(['find', '/etc/apparmor.d/'], raise_on_error=False).output
-    if apparmor_files and apparmor_files.count('\n') > DEFAULT_ETC_FILE_COUNT:
+    if _count_files(APPARMOR_PROFILE_DIR) > DEFAULT_ETC_FILE_COUNT:
         message = dedent(
             '''\n
             Looks like customized AppArmor setup is in use:
@@ -135,10 +153,10 @@ def _apparmor_primitive_check():
         return True
 
 
-def _apparmor_standard_profiles_modified():
+def _apparmor_standard_profiles_modified(modified_packages):
     # verify AA files against rpm db
     profile_package = 'apparmor-profiles'
-    if _find_modified_profiles(profile_package):
+    if profile_package in modified_packages:
         message = dedent(
             '''\n
             Modified AppArmor profiles found,
@@ -149,28 +167,93 @@ def _apparmor_standard_profiles_modified():
         return True
 
 
-def _apparmor_extended_profiles_modified():
+def _apparmor_extended_profiles_modified(modified_packages):
     # check packages that carry AA profiles for in place modification
     for pkg in ADDITIONAL_AA_PROFILES:
-        path_filter = '/etc/apparmor.d'
-        if _find_modified_profiles(pkg, path_filter):
+        if pkg in modified_packages:
             message = dedent(
                 '''\n
                 Modified AppArmor profiles found,
                 please verify changes to profiles from "{}": "rpm -V {}".
             '''
             )
-            log.error(message.format(path_filter, pkg))
+            log.error(message.format(APPARMOR_PROFILE_DIR, pkg))
             return True
 
 
-def _find_modified_profiles(pkg, path_filter=None):
-    modified_files = Command.run(['rpm', '-V', pkg], raise_on_error=False).output
-    for line in modified_files.splitlines():
-        if path_filter and line.find(path_filter) == -1:
+def _get_modified_profile_packages(packages):
+    """
+    Verify the AppArmor profiles of the given packages like rpm -V
+
+    The file digests of all packages are read by one rpm query,
+    only the files below APPARMOR_PROFILE_DIR are hashed, in
+    parallel. Missing files and files not installed by rpm, e.g
+    ghost files, are not reported as modified
+
+    :param list packages: package names, not installed ones are ignored
+
+    :return: names of the packages with modified profiles
+
+    :rtype: set
+    """
+    query_format = (
+        '[%{=NAME}\\t%{=FILEDIGESTALGO}\\t%{FILEDIGESTS}\\t%{FILEFLAGS}\\t%{FILENAMES}\\n]'
+    )
+    rpm_query = Command.run(['rpm', '-q', '--qf', query_format] + packages, raise_on_error=False)
+    profiles = []
+    for line in rpm_query.output.splitlines():
+        fields = line.split('\t', 4)
+        if len(fields) != 5:
+            # e.g package is not installed
             continue
-        if line[2] == "5":
-            return True
+        name, algorithm, digest, flags, filename = fields
+        if (
+            digest
+            and not int(flags) & RPMFILE_GHOST
+            and filename.startswith(APPARMOR_PROFILE_DIR + os.sep)
+        ):
+            profiles.append((name, filename, RPM_DIGEST_ALGORITHMS.get(algorithm, 'md5'), digest))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        file_digests = executor.map(
+            _get_file_digest,
+            [filename for name, filename, algorithm, digest in profiles],
+            [algorithm for name, filename, algorithm, digest in profiles],
+        )
+        return {
+            name
+            for (name, filename, algorithm, digest), file_digest in zip(profiles, file_digests)
+            if file_digest and file_digest != digest
+        }
+
+
+def _get_file_digest(filename, algorithm):
+    try:
+        with open(filename, 'rb') as profile:
+            file_hash = hashlib.new(algorithm)
+            if os.fstat(profile.fileno()).st_size:
+                with mmap.mmap(profile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    file_hash.update(data)
+            return file_hash.hexdigest()
+    except OSError:
+        return None
+
+
+def _count_files(directory):
+    # number of lines printed by find: the directory and all entries below
+    count = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    count += _count_files(entry.path)
+                else:
+                    count += 1
+    except FileNotFoundError:
+        return 0
+    except OSError as issue:
+        # count what could be read, like find does on errors
+        log.warning('Failed to read {0}: {1}'.format(directory, issue))
+    return count + 1
 
 
 def _apparmor_additional_profiles(aa_data):
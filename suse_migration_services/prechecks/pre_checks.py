@@ -16,9 +16,11 @@
 # along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
 #
 """Run various pre-checks"""
+
 import argparse
 import logging
 import os
+from functools import partial
 
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
@@ -34,6 +36,8 @@ import suse_migration_services.prechecks.wicked2nm as check_wicked2nm
 import suse_migration_services.prechecks.cpu_arch as check_cpu_arch
 import suse_migration_services.prechecks.sshd as check_sshd
 import suse_migration_services.prechecks.xfs as check_xfs
+from suse_migration_services.prechecks.cache import PreCheckCache
+from suse_migration_services.prechecks.runner import PreCheckRunner
 
 
 def main():
@@ -47,6 +51,8 @@ def main():
         in /etc/zypp/zypp.conf is not set to 'running, latest'
       - for registered systems, check if migration path exists
         by sending a request to the SCC migrations API
+
+    Independent checks run concurrently, see get_pre_checks
     """
     cli_parser = argparse.ArgumentParser(
         prog='suse-migration-pre-checks',
@@ -64,6 +70,21 @@ def main():
         'System documentation.',
     )
 
+    cli_parser.add_argument(
+        '-r',
+        '--report',
+        metavar='FILE',
+        help='Write the duration and the findings of each check '
+        'as JSON report to the given file.',
+    )
+
+    cli_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Run all checks, also those whose inputs did not change '
+        'since their result got cached by a former run.',
+    )
+
     args = cli_parser.parse_args()
 
     if os.geteuid() != 0:
@@ -73,7 +94,11 @@ def main():
     Logger.setup()
     log = logging.getLogger(Defaults.get_migration_log_name())
 
-    log.info('Running suse-migration-pre-checks with options: fix: {}'.format(args.fix))
+    log.info(
+        'Running suse-migration-pre-checks with options: fix: {}, report: {}, no-cache: {}'.format(
+            args.fix, args.report, args.no_cache
+        )
+    )
     migration_system_mode = False
     dms_env_var = os.environ.get('SUSE_MIGRATION_PRE_CHECKS_MODE', None)
 
@@ -91,44 +116,131 @@ def main():
         args.fix = False
 
     log.info('Checking harmful migration conditions')
+    pre_checks = get_pre_checks(args.fix, migration_system_mode, not args.no_cache)
+    try:
+        pre_checks.run()
+    finally:
+        if args.report:
+            log.info('Writing pre-checks report to {0}'.format(args.report))
+            pre_checks.write_report(args.report)
 
-    log.info('--> Checking system architecture version...')
-    check_cpu_arch.cpu_arch(migration_system=migration_system_mode)
-
-    log.info('--> Checking for local private repos...')
-    check_repos.remote_repos(migration_system=migration_system_mode)
-    log.info('Done')
-
-    log.info('--> Checking for encrypted rootfs...')
-    check_fs.encryption(migration_system=migration_system_mode)
-    log.info('Done')
-
-    log.info('--> Checking for XFS v4 filesystems...')
-    check_xfs.xfs_v4(migration_system=migration_system_mode)
-    log.info('Done')
-
-    log.info('--> Checking for latest kernel in multiversion kernel system...')
-    check_multi_kernels.multiversion_and_multiple_kernels(
-        fix=args.fix, migration_system=migration_system_mode
-    )
-    log.info('Done')
 
-    log.info('--> Checking LSM migration...')
-    check_lsm.check_lsm(migration_system=migration_system_mode)
-    log.info('Done')
+def get_pre_checks(fix=False, migration_system=False, use_cache=True):
+    """
+    Register the pre-checks
 
-    log.info('--> Checking upgrade path against registration server...')
-    check_scc.migration(migration_system=migration_system_mode)
-    log.info('Done')
+    Checks not requiring each other are run concurrently.
+    Checks using rpm, zypper or their configuration require the
+    kernels check which modifies the rpm database and zypp.conf
+    on --fix. The repos check runs after cpu_arch such that they
+    do not compete for the zypp lock.
+    The inputs of a check are the files its result depends on,
+    the migration target is an input of all checks
 
-    log.info('--> Checking high availability extension...')
-    check_ha.check_ha(migration_system=migration_system_mode)
-    log.info('Done')
+    :param bool fix: perform fixes
+    :param bool migration_system: running in the migration system
+    :param bool use_cache: skip checks whose inputs did not change
 
-    log.info('--> Checking wicked to NetworkManager migration...')
-    check_wicked2nm.check_wicked2nm(migration_system=migration_system_mode)
-    log.info('Done')
+    :return: PreCheckRunner instance
 
-    log.info('--> Checking sshd configuration...')
-    check_sshd.root_login(migration_system=migration_system_mode)
-    log.info('Done')
+    :rtype: PreCheckRunner
+    """
+    root = Defaults.get_system_root_path() if migration_system else ''
+    target_inputs = [
+        Defaults.get_migration_config_file(),
+        '/migration-image/*-*Migration.*.iso',
+    ]
+    rpm_inputs = [root + '/usr/lib/sysimage/rpm/*', root + '/var/lib/rpm/*']
+
+    def inputs(*paths):
+        return target_inputs + [root + path for path in paths]
+
+    pre_checks = PreCheckRunner(
+        cache=(
+            PreCheckCache(context={'fix': fix, 'migration_system': migration_system})
+            if use_cache
+            else None
+        )
+    )
+    pre_checks.register(
+        'kernels',
+        'latest kernel in multiversion kernel system',
+        partial(
+            check_multi_kernels.multiversion_and_multiple_kernels,
+            fix=fix,
+            migration_system=migration_system,
+        ),
+        inputs=inputs('/etc/zypp/zypp.conf', '/boot/*') + rpm_inputs,
+    )
+    pre_checks.register(
+        'cpu_arch',
+        'system architecture version',
+        partial(check_cpu_arch.cpu_arch, migration_system=migration_system),
+        requires=['kernels'],
+        inputs=inputs('/etc/zypp/zypp.conf') + rpm_inputs,
+    )
+    pre_checks.register(
+        'repos',
+        'local private repos',
+        partial(check_repos.remote_repos, migration_system=migration_system),
+        requires=['kernels', 'cpu_arch'],
+        inputs=inputs('/etc/zypp/repos.d', '/etc/zypp/repos.d/*'),
+    )
+    pre_checks.register(
+        'fs',
+        'encrypted rootfs',
+        partial(check_fs.encryption, migration_system=migration_system),
+        inputs=inputs('/etc/fstab', '/etc/crypttab'),
+    )
+    pre_checks.register(
+        'xfs',
+        'XFS v4 filesystems',
+        partial(check_xfs.xfs_v4, migration_system=migration_system),
+        inputs=inputs('/etc/fstab'),
+    )
+    pre_checks.register(
+        'lsm',
+        'LSM migration',
+        partial(check_lsm.check_lsm, migration_system=migration_system),
+        requires=['kernels'],
+        inputs=inputs('/etc/apparmor.d/**') + rpm_inputs,
+    )
+    pre_checks.register(
+        'scc',
+        'upgrade path against registration server',
+        partial(check_scc.migration, migration_system=migration_system),
+        inputs=inputs(
+            '/etc/zypp/credentials.d/SCCcredentials', '/etc/SUSEConnect', '/etc/products.d/*.prod'
+        ),
+    )
+    pre_checks.register(
+        'ha',
+        'high availability extension',
+        partial(check_ha.check_ha, migration_system=migration_system),
+        requires=['kernels'],
+        inputs=inputs('/etc/corosync/corosync.conf') + rpm_inputs,
+    )
+    pre_checks.register(
+        'wicked2nm',
+        'wicked to NetworkManager migration',
+        partial(check_wicked2nm.check_wicked2nm, migration_system=migration_system),
+        requires=['kernels'],
+        inputs=inputs(
+            '/var/cache/wicked_config/config.xml', '/etc/sysconfig/network/**', '/etc/wicked/**'
+        )
+        + rpm_inputs,
+    )
+    pre_checks.register(
+        'sshd',
+        'sshd configuration',
+        partial(check_sshd.root_login, migration_system=migration_system),
+        requires=['kernels'],
+        inputs=inputs(
+            '/etc/ssh/sshd_config',
+            '/etc/ssh/sshd_config.d/*',
+            '/usr/etc/ssh/sshd_config*',
+            '/etc/systemd/system/multi-user.target.wants/sshd.service',
+        )
+        + rpm_inputs,
+    )
+    return pre_checks
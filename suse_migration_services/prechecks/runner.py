@@ -0,0 +1,221 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+"""Run registered pre-checks concurrently in the order of their dependencies"""
+
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from suse_migration_services.defaults import Defaults
+
+log = logging.getLogger(Defaults.get_migration_log_name())
+
+pre_check_type = namedtuple('pre_check_type', ['name', 'description', 'call', 'requires', 'inputs'])
+
+
+class FindingHandler(logging.Handler):
+    """
+    **Collect the warnings and errors logged by the running checks**
+
+    Records are assigned to the check running in the thread
+    which logged them
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.checks_by_thread = {}
+        self.findings = {}
+
+    def emit(self, record):
+        name = self.checks_by_thread.get(record.thread)
+        if name:
+            self.findings[name].append(
+                {'level': record.levelname, 'message': record.getMessage().strip()}
+            )
+
+
+class PreCheckRunner:
+    """
+    **Registry and runner of the pre-checks**
+
+    Checks are run on a thread pool as soon as all checks they
+    require have finished, independent checks run at the same
+    time. The duration and the logged warnings and errors of
+    each check are collected for the report. With a cache, checks
+    whose inputs did not change are not run, their findings from
+    the cache are logged again
+    """
+
+    def __init__(self, max_workers=4, cache=None):
+        self.max_workers = max_workers
+        self.cache = cache
+        self.checks = {}
+        self.results = {}
+        self.start_time = 0.0
+        self.duration = 0.0
+
+    def register(self, name, description, call, requires=(), inputs=None):
+        """
+        Register a check
+
+        :param string name: unique check name
+        :param string description: what is checked, used for logging
+        :param callable call: check function, called without arguments
+        :param list requires: names of the checks to finish before
+        :param list inputs: files the result depends on, see
+            PreCheckCache.get_fingerprint. None if not cacheable
+        """
+        for required in requires:
+            if required not in self.checks:
+                raise ValueError('Check {0} requires unknown check {1}'.format(name, required))
+        self.checks[name] = pre_check_type(
+            name=name,
+            description=description,
+            call=call,
+            requires=tuple(requires),
+            inputs=inputs,
+        )
+
+    def run(self):
+        """
+        Run all registered checks
+
+        An exception raised by a check does not stop the other
+        checks, the first one is raised once all checks finished
+        """
+        finding_handler = FindingHandler()
+        log.addHandler(finding_handler)
+        self.results = {}
+        self.start_time = time.monotonic()
+        try:
+            pending = dict(self.checks)
+            running = set()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while pending or running:
+                    for check in list(pending.values()):
+                        if all(required in self.results for required in check.requires):
+                            del pending[check.name]
+                            running.add(executor.submit(self._run_check, check, finding_handler))
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+        finally:
+            log.removeHandler(finding_handler)
+            self.duration = time.monotonic() - self.start_time
+            if self.cache:
+                self.cache.sync()
+        log.info(
+            'Pre-checks finished in {0:.2f}s, {1:.2f}s of check runtime'.format(
+                self.duration, sum(result['duration'] for result in self.results.values())
+            )
+        )
+        for name in self.checks:
+            if self.results[name]['exception']:
+                raise self.results[name]['exception']
+
+    def get_report(self):
+        """
+        Provide the results of the last run
+
+        :return: report with the duration and findings of each check
+
+        :rtype: dict
+        """
+        checks = []
+        for check in self.checks.values():
+            result = self.results.get(check.name)
+            if not result:
+                continue
+            levels = [finding['level'] for finding in result['findings']]
+            if result['exception']:
+                status = 'failed'
+            elif 'ERROR' in levels or 'CRITICAL' in levels:
+                status = 'error'
+            elif levels:
+                status = 'warning'
+            else:
+                status = 'passed'
+            checks.append(
+                {
+                    'name': check.name,
+                    'description': check.description,
+                    'requires': list(check.requires),
+                    'status': status,
+                    'cached': result['cached'],
+                    'start': round(result['start'], 3),
+                    'duration': round(result['duration'], 3),
+                    'findings': result['findings'],
+                    'exception': (
+                        '{0}: {1}'.format(type(result['exception']).__name__, result['exception'])
+                        if result['exception']
+                        else None
+                    ),
+                }
+            )
+        return {'duration': round(self.duration, 3), 'checks': checks}
+
+    def write_report(self, filename):
+        """
+        Write the report of the last run as JSON
+
+        :param string filename: path to the report file
+        """
+        with open(filename, 'w') as report:
+            json.dump(self.get_report(), report, indent=2)
+
+    def _run_check(self, check, finding_handler):
+        thread = threading.get_ident()
+        start_time = time.monotonic()
+        result = {
+            'start': start_time - self.start_time,
+            'duration': 0.0,
+            'findings': [],
+            'exception': None,
+            'cached': False,
+        }
+        finding_handler.findings[check.name] = result['findings']
+        finding_handler.checks_by_thread[thread] = check.name
+        try:
+            fingerprint = findings = None
+            if self.cache and check.inputs is not None:
+                fingerprint = self.cache.get_fingerprint(check.name, check.inputs)
+                findings = self.cache.get(check.name, fingerprint)
+            if findings is not None:
+                log.info('--> Checking {0}... inputs unchanged, cached'.format(check.description))
+                result['cached'] = True
+                for finding in findings:
+                    log.log(logging.getLevelName(finding['level']), finding['message'])
+            else:
+                log.info('--> Checking {0}...'.format(check.description))
+                check.call()
+                if fingerprint:
+                    self.cache.store(check.name, fingerprint, result['findings'])
+        except Exception as issue:
+            log.error('Check {0} failed: {1}'.format(check.name, issue))
+            result['exception'] = issue
+        except BaseException as issue:
+            # e.g SystemExit, raised by run() like any other exception
+            result['exception'] = issue
+        finally:
+            del finding_handler.checks_by_thread[thread]
+            result['duration'] = time.monotonic() - start_time
+            # checks waiting for this one are scheduled once
+            # a result exists, no matter how the check ended
+            self.results[check.name] = result
+        log.info('Done: {0} in {1:.2f}s'.format(check.name, result['duration']))
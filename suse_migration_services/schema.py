@@ -13,9 +13,39 @@ schema = {
     'soft_reboot': {'required': False, 'type': 'boolean'},
     'use_zypper_migration': {'required': False, 'type': 'boolean'},
     'verbose_migration': {'required': False, 'type': 'boolean'},
+    'report_progress': {'required': False, 'type': 'boolean'},
     'build_host_independent_initrd': {'required': False, 'type': 'boolean'},
     'pre_checks_fix': {'required': False, 'type': 'boolean'},
     'debug_solver': {'required': False, 'type': 'boolean'},
+    'timeouts': {
+        'required': False,
+        'type': 'dict',
+        'schema': {
+            'command': {'required': False, 'type': 'number', 'min': 0},
+            'unit': {'required': False, 'type': 'number', 'min': 0},
+            'grace': {'required': False, 'type': 'number', 'min': 0},
+            'devices': {'required': False, 'type': 'number', 'min': 0},
+            'programs': {
+                'required': False,
+                'type': 'dict',
+                'keysrules': {'type': 'string'},
+                'valuesrules': {'type': 'number', 'min': 0},
+            },
+        },
+    },
+    'performance': {
+        'required': False,
+        'type': 'dict',
+        'schema': {
+            'mount_options': {'required': False, 'type': 'boolean'},
+            'mount_option_overlay': {
+                'required': False,
+                'type': 'dict',
+                'keysrules': {'type': 'string'},
+                'valuesrules': {'type': 'string'},
+            },
+        },
+    },
     'network': {
         'required': False,
         'type': 'dict',
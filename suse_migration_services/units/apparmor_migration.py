@@ -20,6 +20,7 @@ import fileinput
 import re
 
 # project
+from suse_migration_services.chroot_executor import ChrootExecutor
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
 from suse_migration_services.zypper import Zypper
@@ -84,4 +85,5 @@ class ApparmorToSelinux(DropComponents):
 
 def main():
     system_security = ApparmorToSelinux()
-    system_security.perform()
+    with ChrootExecutor(system_security.root_path):
+        system_security.perform()
@@ -39,7 +39,7 @@ class BtrfsSnapshotPostMigration:
     def perform(self):
         try:
             self.log.info('Running Post-migration btrfs snapshot creation')
-            stat = Command.run(['stat', '-f', '-c', '%T', self.root_path])
+            stat = Command.run(['stat', '-f', '-c', '%T', self.root_path], cache=True)
             if stat and stat.output.strip() == 'btrfs':
                 with open(
                     '/run/suse_migration_snapper_btrfs_pre_snapshot_number'
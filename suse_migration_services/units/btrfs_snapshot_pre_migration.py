@@ -43,7 +43,7 @@ class BtrfsSnapshotPreMigration:
     def perform(self):
         try:
             self.log.info('Running Pre-migration btrfs snapshot creation')
-            stat = Command.run(['stat', '-f', '-c', '%T', self.root_path])
+            stat = Command.run(['stat', '-f', '-c', '%T', self.root_path], cache=True)
             if stat and stat.output.strip() == 'btrfs':
                 # we want pre snapshot to be created before we installed
                 # migration-activation package, if it was installed
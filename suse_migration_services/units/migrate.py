@@ -25,6 +25,7 @@ from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
 from suse_migration_services.zypper import Zypper
+from suse_migration_services.zypper_progress import ZypperProgressReport
 
 from suse_migration_services.exceptions import (
     DistMigrationZypperException,
@@ -43,6 +44,7 @@ class MigrateSystem:
         self.log = logging.getLogger(Defaults.get_migration_log_name())
         self.root_path = Defaults.get_system_root_path()
         self.exit_code_file = Defaults.get_migration_exit_code_file()
+        self.migration_available = True
 
     def perform(self):
         try:
@@ -65,6 +67,9 @@ class MigrateSystem:
             solver_case = Defaults.get_zypp_gen_solver_test_case()
             if migration_config.is_zypp_solver_test_case_requested():
                 solver_case = '--debug-solver'
+            event_callback = None
+            if migration_config.is_progress_report_requested():
+                event_callback = ZypperProgressReport(self.log).report
             os.environ['ZYPP_SINGLE_RPMTRANS'] = self.is_single_rpmtrans_requested()
             os.environ['ZYPP_NO_USRMERGE_PROTECT'] = self.is_single_rpmtrans_requested()
 
@@ -87,9 +92,11 @@ class MigrateSystem:
                         migration_config.get_migration_product(),
                         '--root',
                         self.root_path,
-                    ]
+                    ],
+                    line_callback=self.check_migration_available,
+                    event_callback=event_callback,
                 )
-                if 'No migration available' in zypper_call.output:
+                if not self.migration_available:
                     raise DistMigrationZypperException(
                         'The package management system did not receive any upgrade target information from the repository server'
                     )
@@ -110,6 +117,7 @@ class MigrateSystem:
                         '--allow-downgrade',
                     ],
                     raise_on_error=False,
+                    event_callback=event_callback,
                 )
                 zypper_call.raise_if_failed()
             # report success(0) return code
@@ -134,6 +142,14 @@ class MigrateSystem:
         finally:
             self.duplicate_solver_test_case_data()
 
+    def check_migration_available(self, line):
+        """
+        Watch the zypper migration output for the message telling
+        that the repository server has no upgrade target to offer
+        """
+        if 'No migration available' in line:
+            self.migration_available = False
+
     def duplicate_solver_test_case_data(self):
         """
         We duplicate the created solver test case to cover both use cases
@@ -18,11 +18,19 @@
 import logging
 import re
 import os
+import time
 
 # project
+from suse_migration_services.block_devices import BlockDevices
 from suse_migration_services.command import Command
+from suse_migration_services.command_deadline import CommandDeadline
 from suse_migration_services.defaults import Defaults
+from suse_migration_services.device_aliases import DeviceAliases
+from suse_migration_services.device_waiter import DeviceWaiter
 from suse_migration_services.fstab import Fstab
+from suse_migration_services.mount_backend import MountBackend
+from suse_migration_services.mount_info import MountInfo
+from suse_migration_services.mount_ledger import MountLedger
 from suse_migration_services.path import Path
 from suse_migration_services.logger import Logger
 from suse_migration_services.migration_config import MigrationConfig
@@ -47,6 +55,10 @@ class MountSystem:
         Logger.setup()
         self.log = logging.getLogger(Defaults.get_migration_log_name())
         self.root_path = Defaults.get_system_root_path()
+        self.volume_groups = []
+        self.inactive_volume_groups = []
+        self.lvm_activation_time = 0.0
+        self.mount_option_overlay = {}
 
     def perform(self):
         Path.create(self.root_path)
@@ -72,39 +84,153 @@ class MountSystem:
             # that readonly loopback mount and needs to be
             # remounted for read write access first
             self.log.info('Mount system service: {0} is mounted'.format(isoscan_loop_mount))
-            Command.run(['mount', '-o', 'remount,rw', isoscan_loop_mount])
+            MountBackend.remount(isoscan_loop_mount, 'rw')
 
         self.activate_lvm()
 
-        self.mount_system(self.read_system_fstab())
+        fstab = self.read_system_fstab()
 
+        # the custom config of the system to migrate is available
+        # once its root filesystem got mounted by read_system_fstab
         migration_config = MigrationConfig()
         migration_config.update_migration_config_file()
+        self.mount_option_overlay = migration_config.get_mount_option_overlay()
+
+        self.mount_system(fstab)
+        self.log_lvm_activation()
         self.log.info(
             'Config file content:\n{content}\n'.format(
                 content=migration_config.get_migration_config_file_content()
             )
         )
 
-    def get_uuid(self, device):
+    def activate_lvm(self):
         """
-        Retrieve UUID from block device
+        Lookup the LVM volume groups visible to the host
+
+        The volume groups are not activated all at once. Only those
+        needed to find migration_target and those referenced by the
+        fstab of the system to migrate get activated, by
+        get_target_root and activate_fstab_volume_groups
         """
-        blkid_result = Command.run(
-            ['blkid', device, '-s', 'UUID', '-o', 'value'], raise_on_error=False
-        )
-        return blkid_result.output.strip(os.linesep) if blkid_result else ''
+        if BlockDevices().get_devices(['lvm']):
+            self.log.info('LVM managed block device(s) found')
+            self.volume_groups = Command.run(
+                ['vgs', '--noheadings', '-o', 'vg_name']
+            ).output.split()
+            self.inactive_volume_groups = list(self.volume_groups)
 
-    def activate_lvm(self):
-        lsblk_call = Command.run(['lsblk', '-p', '-n', '-r', '-o', 'NAME,TYPE'])
-        for entry in lsblk_call.output.split(os.linesep):
-            block_record = entry.split()
-            if len(block_record) >= 2:
-                block_type = block_record[1]
-                if block_type == 'lvm':
-                    self.log.info('LVM managed block device(s) found, activating LVM')
-                    Command.run(['vgchange', '-a', 'y'])
-                    return
+    def activate_volume_groups(self, volume_groups):
+        """
+        Activate the given, not yet active, volume groups concurrently
+
+        :param list volume_groups: volume group names
+        """
+        volume_groups = [
+            volume_group
+            for volume_group in volume_groups
+            if volume_group in self.inactive_volume_groups
+        ]
+        if volume_groups:
+            self.log.info('Activating LVM volume group(s): {0}'.format(', '.join(volume_groups)))
+            start_time = time.monotonic()
+            Command.run_many(
+                [['vgchange', '-a', 'y', volume_group] for volume_group in volume_groups]
+            )
+            self.lvm_activation_time += time.monotonic() - start_time
+            for volume_group in volume_groups:
+                self.inactive_volume_groups.remove(volume_group)
+            DeviceAliases.refresh()
+
+    def activate_fstab_volume_groups(self, fstab_file):
+        """
+        Activate the volume groups referenced by the given fstab
+
+        LVM devices referenced as /dev/VG/LV or /dev/mapper/VG-LV name
+        their volume group. If any other /dev/ device or UUID=, LABEL=
+        or PARTUUID= tag does not exist it might be a not yet active
+        logical volume and all remaining volume groups get activated.
+        Devices which are no block devices, e.g tmpfs or NFS shares,
+        are ignored
+
+        :param string fstab_file: path to a fstab file
+        """
+        if not self.inactive_volume_groups:
+            return
+        volume_groups = []
+        with open(fstab_file) as fstab:
+            for line in fstab:
+                fstab_record = line.split()
+                if (
+                    len(fstab_record) < 3
+                    or fstab_record[0].startswith('#')
+                    or fstab_record[2].lower() in ('none', 'swap')
+                ):
+                    continue
+                device_path = Fstab.get_device_path(fstab_record[0])
+                if not device_path.startswith('/dev/'):
+                    # e.g tmpfs, proc or network filesystems
+                    continue
+                volume_group = self.get_volume_group(device_path)
+                if volume_group:
+                    volume_groups.append(volume_group)
+                elif not DeviceAliases.exists(device_path):
+                    self.log.info(
+                        '{0} not found, activating all volume groups'.format(fstab_record[0])
+                    )
+                    volume_groups = self.inactive_volume_groups
+                    break
+        self.activate_volume_groups(volume_groups)
+
+    def get_volume_group(self, device):
+        """
+        Provide the name of the volume group from a LVM device path
+
+        :param string device: device path, e.g /dev/VG/LV
+
+        :return: volume group name or None if device is not a LVM device
+
+        :rtype: str
+        """
+        if device.startswith('/dev/mapper/'):
+            # dashes in the volume group name are doubled in the map name
+            match = re.match(r'((?:[^-]|--)+)-[^-]', os.path.basename(device))
+            volume_group = match.group(1).replace('--', '-') if match else None
+        else:
+            path_elements = device.split(os.sep)
+            volume_group = path_elements[2] if len(path_elements) == 4 else None
+        return volume_group if volume_group in self.volume_groups else None
+
+    def log_lvm_activation(self):
+        """
+        Log how many volume groups got activated and the time saved
+        compared with activating all of them. The saving is estimated
+        from the mean activation time of the activated volume groups
+        """
+        if self.volume_groups:
+            activated_count = len(self.volume_groups) - len(self.inactive_volume_groups)
+            message = 'Activated {0} of {1} LVM volume group(s) in {2:.1f}s'.format(
+                activated_count, len(self.volume_groups), self.lvm_activation_time
+            )
+            if activated_count and self.inactive_volume_groups:
+                message += ', leaving {0} inactive saved about {1:.1f}s'.format(
+                    len(self.inactive_volume_groups),
+                    self.lvm_activation_time / activated_count * len(self.inactive_volume_groups),
+                )
+            self.log.info(message)
+
+    def is_multipath_device(self, device, wwn):
+        """
+        Check if device is the multipath map of the given WWN or a
+        partition of it. Multipath maps with user friendly names
+        don't carry the WWN in their name but in their dm-uuid alias
+        """
+        if wwn in device:
+            return True
+        for alias in DeviceAliases.get_aliases(device, 'by-id'):
+            if os.path.basename(alias).startswith('dm-uuid-') and 'mpath-' + wwn in alias:
+                return True
+        return False
 
     def get_target_root(self):
         """
@@ -121,28 +247,15 @@ class MountSystem:
 
             if match:
                 migration_rootfs_uuid = match.group(1)
-                is_multipath = False
-                if match_wwn:
-                    migration_rootfs_wwn = match_wwn.group(1)
-                    is_multipath = True
-                lsblk_call = Command.run(['lsblk', '-p', '-n', '-r', '-o', 'NAME,TYPE'])
-                considered_block_types = ['part', 'raid', 'lvm']
-                for entry in lsblk_call.output.split(os.linesep):
-                    block_record = entry.split()
-                    if len(block_record) >= 2:
-                        block_type = block_record[1]
-                        if block_type in considered_block_types:
-                            device = block_record[0]
-                            uuid = self.get_uuid(device)
-                            if uuid == migration_rootfs_uuid:
-                                if is_multipath and migration_rootfs_wwn not in device:
-                                    self.log.info(
-                                        'Skipping {0} since it is not the multipath root device'.format(
-                                            device
-                                        )
-                                    )
-                                else:
-                                    return device
+                migration_rootfs_wwn = match_wwn.group(1) if match_wwn else None
+                device = self.find_target_root(migration_rootfs_uuid, migration_rootfs_wwn)
+                while not device and self.inactive_volume_groups:
+                    # the volume group holding migration_target is not
+                    # known before it is active, try batch by batch
+                    self.activate_volume_groups(self.inactive_volume_groups[:4])
+                    device = self.find_target_root(migration_rootfs_uuid, migration_rootfs_wwn)
+                if device:
+                    return device
             # nothing was found
             raise DistMigrationSystemMountException('no match for migration_target= in cmdline')
         except Exception as issue:
@@ -150,15 +263,38 @@ class MountSystem:
             self.log.error(message)
             raise DistMigrationSystemMountException(message)
 
+    def find_target_root(self, uuid, wwn=None):
+        """
+        Lookup the device of the filesystem with the given UUID
+
+        :param string uuid: filesystem UUID
+        :param string wwn: only multipath devices of this WWN
+
+        :return: device name or None
+
+        :rtype: str
+        """
+        considered_block_types = ['part', 'raid', 'lvm']
+        for block_device in BlockDevices().get_devices_by_uuid(uuid, considered_block_types):
+            device = block_device.name
+            if wwn and not self.is_multipath_device(device, wwn):
+                self.log.info(
+                    'Skipping {0} since it is not the multipath root device'.format(device)
+                )
+            else:
+                return device
+        return None
+
     def read_system_fstab(self):
         self.log.info('Reading fstab from DMS selected target disk')
         migration_target_root = self.get_target_root()
         try:
             self.log.info('Lookup for fstab on {0}'.format(migration_target_root))
-            Command.run(['mount', migration_target_root, self.root_path])
+            MountBackend.mount(migration_target_root, self.root_path)
             fstab_file = os.sep.join([self.root_path, 'etc', 'fstab'])
             if os.path.isfile(fstab_file):
                 self.log.info('Found {0} on {1}'.format(fstab_file, migration_target_root))
+                self.activate_fstab_volume_groups(fstab_file)
                 fstab = Fstab()
                 fstab.read(fstab_file)
                 return fstab
@@ -166,39 +302,89 @@ class MountSystem:
                 'Could not find system with fstab on {0}'.format(migration_target_root)
             )
         except Exception as issue:
-            Command.run(['umount', self.root_path], raise_on_error=False)
+            MountBackend.umount(self.root_path, raise_on_error=False)
             raise DistMigrationSystemNotFoundException(
                 'Reading fstab failed with: {}'.format(issue)
             )
 
     def mount_system(self, fstab):
         self.log.info('Mount system in {0}'.format(self.root_path))
-        system_mount = Fstab()
+        system_mount = MountLedger()
         explicit_mount_points = {
             'devtmpfs': os.sep.join([self.root_path, 'dev']),
             'proc': os.sep.join([self.root_path, 'proc']),
             'sysfs': os.sep.join([self.root_path, 'sys']),
             'tmpfs': os.sep.join([self.root_path, 'run']),
         }
+        # entries whose device did not show up yet are mounted
+        # later together with the entries mounted below them.
+        # Entries not required for boot, e.g an absent backup
+        # disk marked nofail, are skipped without waiting
+        late_fstab = Fstab()
+        for fstab_entry in fstab.get_missing_entries():
+            if (
+                fstab_entry.eligible_for_mount
+                and fstab_entry.device.startswith('/dev/')
+                and not {'nofail', 'noauto'} & set(fstab_entry.options.split(','))
+            ):
+                late_fstab.add_entry(
+                    fstab_entry.device,
+                    fstab_entry.mountpoint,
+                    fstab_entry.fstype,
+                    fstab_entry.options,
+                )
         try:
-            for fstab_entry in fstab.get_devices():
-                mountpoint = ''.join([self.root_path, fstab_entry.mountpoint])
-                if mountpoint not in explicit_mount_points.values():
-                    if fstab_entry.eligible_for_mount:
-                        self.log.info('Mounting {0}'.format(mountpoint))
-                        Command.run(
-                            ['mount', '-o', fstab_entry.options, fstab_entry.device, mountpoint]
+            # filesystems of one level of the mount tree are
+            # independent from each other. Mounts done via mount(2)
+            # return immediately, those which need the mount program
+            # are called concurrently
+            for mount_level in fstab.get_mount_levels():
+                mount_commands = []
+                for fstab_entry in mount_level:
+                    mountpoint = ''.join([self.root_path, fstab_entry.mountpoint])
+                    if fstab_entry.eligible_for_mount and late_fstab.get_parent(
+                        fstab_entry.mountpoint
+                    ):
+                        late_fstab.add_entry(
+                            fstab_entry.device,
+                            fstab_entry.mountpoint,
+                            fstab_entry.fstype,
+                            fstab_entry.options,
                         )
-                    system_mount.add_entry(
-                        fstab_entry.device,
-                        mountpoint,
-                        fstab_entry.fstype,
-                        fstab_entry.eligible_for_mount,
-                    )
+                    elif mountpoint not in explicit_mount_points.values():
+                        if fstab_entry.eligible_for_mount:
+                            self.log.info('Mounting {0}'.format(mountpoint))
+                            mount_options = self.get_mount_options(
+                                fstab_entry.fstype, fstab_entry.options
+                            )
+                            mount_args = (
+                                fstab_entry.device,
+                                mountpoint,
+                                fstab_entry.fstype,
+                                mount_options,
+                            )
+                            if MountBackend.is_native(
+                                fstab_entry.device, fstab_entry.fstype, mount_options
+                            ):
+                                MountBackend.mount(*mount_args)
+                            else:
+                                mount_commands.append(MountBackend.get_mount_command(*mount_args))
+                        elif fstab_entry.mountpoint == '/':
+                            self.remount_root(fstab_entry.fstype)
+                        system_mount.add_entry(
+                            fstab_entry.device,
+                            mountpoint,
+                            fstab_entry.fstype,
+                            fstab_entry.options,
+                            eligible_for_mount=fstab_entry.eligible_for_mount,
+                        )
+                Command.run_many(mount_commands)
+            if late_fstab.get_devices():
+                self.mount_late_entries(late_fstab, system_mount)
 
             self.log.info('Mounting kernel file systems inside {0}'.format(self.root_path))
             for mount_type, mount_point in explicit_mount_points.items():
-                Command.run(['mount', '-t', mount_type, mount_type, mount_point])
+                MountBackend.mount(mount_type, mount_point, mount_type)
                 system_mount.add_entry(mount_type, mount_point)
             self.log.info(
                 'Bind mount subdirectories from /run inside chroot {0}'.format(self.root_path)
@@ -208,15 +394,110 @@ class MountSystem:
             raise DistMigrationSystemMountException(
                 'Mounting system for upgrade failed with {0}'.format(issue)
             )
-        system_mount.export(Defaults.get_system_mount_info_file())
+        system_mount.sync()
+
+    def mount_late_entries(self, late_fstab, system_mount):
+        """
+        Mount the given fstab entries, each as soon as its device
+        and the entry it is mounted below are available. Entries
+        whose device does not appear within the device timeout
+        are skipped
+
+        :param Fstab late_fstab: entries to mount
+        :param MountLedger system_mount: ledger to record the mounts
+        """
+        mountpoints = set()
+        devices = [fstab_entry.device for fstab_entry in late_fstab.get_devices()]
+        self.log.info('Waiting for device(s): {0}'.format(', '.join(devices)))
+        for device in DeviceWaiter.wait(devices, CommandDeadline.get_device_timeout()):
+            self.log.info('Device {0} is available'.format(device))
+            for fstab_entry in late_fstab.get_devices():
+                parent = late_fstab.get_parent(fstab_entry.mountpoint)
+                if (
+                    fstab_entry.mountpoint not in mountpoints
+                    and (not parent or parent.mountpoint in mountpoints)
+                    and os.path.exists(fstab_entry.device)
+                ):
+                    mountpoint = ''.join([self.root_path, fstab_entry.mountpoint])
+                    self.log.info('Mounting {0}'.format(mountpoint))
+                    MountBackend.mount(
+                        fstab_entry.device,
+                        mountpoint,
+                        fstab_entry.fstype,
+                        self.get_mount_options(fstab_entry.fstype, fstab_entry.options),
+                    )
+                    system_mount.add_entry(
+                        fstab_entry.device, mountpoint, fstab_entry.fstype, fstab_entry.options
+                    )
+                    mountpoints.add(fstab_entry.mountpoint)
+        for fstab_entry in late_fstab.get_devices():
+            if fstab_entry.mountpoint not in mountpoints:
+                self.log.warning(
+                    'Skipped {0}, device {1} or its parent mount not available'.format(
+                        fstab_entry.mountpoint, fstab_entry.device
+                    )
+                )
+
+    def get_mount_options(self, fstype, options):
+        """
+        Append the mount option overlay of the filesystem type
+
+        Options of the system to migrate which are set by the
+        overlay are replaced, e.g commit=5 by commit=60. The
+        overlay is only used while the system is mounted for
+        the migration, the mount ledger keeps the original options
+
+        :param string fstype: filesystem type
+        :param string options: comma separated mount options
+
+        :return: comma separated mount options
+
+        :rtype: str
+        """
+        overlay = self.mount_option_overlay.get(fstype)
+        if not overlay:
+            return options
+        overlay_names = [option.split('=')[0] for option in overlay.split(',')]
+        return ','.join(
+            [
+                option
+                for option in (options or '').split(',')
+                if option and option.split('=')[0] not in overlay_names
+            ]
+            + [overlay]
+        )
+
+    def remount_root(self, fstype):
+        """
+        Apply the mount option overlay to the root filesystem
+        which got mounted before its fstab entry was known. Only
+        the VFS options of the overlay are used, filesystems refuse
+        to change some of their own options on remount, e.g xfs
+        logbufs. The overlay is an optimization, a failed remount
+        is not an error
+
+        :param string fstype: filesystem type of the root filesystem
+        """
+        overlay = ','.join(
+            [
+                option
+                for option in (self.mount_option_overlay.get(fstype) or '').split(',')
+                if option in MountBackend.vfs_options
+            ]
+        )
+        if overlay:
+            try:
+                MountBackend.remount(self.root_path, overlay)
+            except Exception as issue:
+                self.log.warning(
+                    'Mount option overlay not applied to {0}: {1}'.format(self.root_path, issue)
+                )
 
     def is_mounted(self, mount_point):
         self.log.info('Checking {0} is mounted'.format(mount_point))
-        # a bind mount is neither a device nor an inode.
-        # Thus, ismount will return False for those, as
-        # it is very unlikely that a bind mount is used in fstab,
-        # that case is not handled
-        return os.path.ismount(mount_point)
+        # other than os.path.ismount the mount table also
+        # knows about bind mounts
+        return MountInfo.is_mounted(mount_point)
 
 
 def main():
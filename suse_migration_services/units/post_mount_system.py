@@ -25,6 +25,7 @@ from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
 from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.command import Command
+from suse_migration_services.path import Path
 
 
 class PostMountSystem:
@@ -59,7 +60,7 @@ class PostMountSystem:
                         target_dir = os.path.dirname(source_file)[len(self.root_path) :]
                         self.log.info('Copy file: {0} to: {1}'.format(source_file, target_dir))
                         if not os.path.exists(target_dir):
-                            Command.run(['mkdir', '-p', target_dir])
+                            Path.create(target_dir)
                         shutil.copy(source_file, target_dir)
             if 'rules' in preserve_info.keys():
                 Command.run(['udevadm', 'control', '--reload'])
@@ -25,8 +25,11 @@ from configparser import ConfigParser
 from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.path import Path
 from suse_migration_services.command import Command
-from suse_migration_services.fstab import Fstab
+from suse_migration_services.mount_ledger import MountLedger
+from suse_migration_services.mount_backend import MountBackend
+from suse_migration_services.mount_info import MountInfo
 from suse_migration_services.defaults import Defaults
+from suse_migration_services.device_aliases import DeviceAliases
 from suse_migration_services.suse_connect import SUSEConnect
 from suse_migration_services.logger import Logger
 from suse_migration_services.units.setup_host_network import SetupHostNetwork
@@ -133,21 +136,18 @@ class PrepareMigration:
                         # but the mount target does not exist.
                         # Create it as empty file prior bind mounting
                         pass
-                    Command.run(['mount', '--bind', zypper_log_file, zypper_host_log_file])
+                    MountBackend.bind(zypper_log_file, zypper_host_log_file)
             except Exception as issue:
                 self.log.warning('Bind mounting zypper log file failed with: {0}'.format(issue))
         try:
             # log network info as network-online.target is done at this point
             SetupHostNetwork().log_network_details()
-            system_mount = Fstab()
-            system_mount.read(Defaults.get_system_mount_info_file())
+            system_mount = MountLedger()
             self.log.info('Bind mounting /etc/zypp')
-            Command.run(['mount', '--bind', zypp_metadata, '/etc/zypp'])
+            MountBackend.bind(zypp_metadata, '/etc/zypp')
             system_mount.add_entry(zypp_metadata, '/etc/zypp')
             self.log.info('Bind mounting /usr/lib/zypp/plugins')
-            Command.run(
-                ['mount', '--bind', zypp_plugins_services, '/usr/lib/zypp/plugins/services']
-            )
+            MountBackend.bind(zypp_plugins_services, '/usr/lib/zypp/plugins/services')
             system_mount.add_entry(zypp_plugins_services, '/usr/lib/zypp/plugins/services')
             if os.path.exists(self.cloud_register_metadata_path):
                 self.log.info(
@@ -156,13 +156,9 @@ class PrepareMigration:
                     )
                 )
                 Path.create(self.cache_cloudregister_path)
-                Command.run(
-                    [
-                        'mount',
-                        '--bind',
-                        self.cloud_register_metadata_path,
-                        self.cache_cloudregister_path,
-                    ]
+                MountBackend.bind(self.cloud_register_metadata_path, self.cache_cloudregister_path)
+                system_mount.add_entry(
+                    self.cloud_register_metadata_path, self.cache_cloudregister_path
                 )
             if os.path.exists(self.cloud_register_certs_bind_mount_path):
                 self.log.info(
@@ -171,20 +167,18 @@ class PrepareMigration:
                     )
                 )
                 Path.create(self.cloud_register_certs_path)
-                Command.run(
-                    [
-                        'mount',
-                        '--bind',
-                        self.cloud_register_certs_bind_mount_path,
-                        self.cloud_register_certs_path,
-                    ]
+                MountBackend.bind(
+                    self.cloud_register_certs_bind_mount_path, self.cloud_register_certs_path
+                )
+                system_mount.add_entry(
+                    self.cloud_register_certs_bind_mount_path, self.cloud_register_certs_path
                 )
                 self.report_if_regionsrv_certs_not_found(self.cloud_register_certs_path)
                 update_smt_cache = '/usr/sbin/updatesmtcache'
                 if os.path.isfile(update_smt_cache):
                     self.log.info('Updating SMT cache')
                     Command.run([update_smt_cache])
-            system_mount.export(Defaults.get_system_mount_info_file())
+            system_mount.sync()
             # Check if system is registered
             migration_config = MigrationConfig()
             migration_config.update_migration_config_file()
@@ -252,23 +246,11 @@ class PrepareMigration:
         Find by-id disk device which is associated with the
         root mount point given in root_path
         """
-        root_device = Command.run(
-            [
-                'findmnt',
-                '--first',
-                '--noheadings',
-                '--output',
-                'SOURCE',
-                '--mountpoint',
-                self.root_path,
-            ]
-        ).output
+        root_device = MountInfo.get_source(self.root_path)
         if root_device:
-            # The findmnt output can contain extra volume information
-            # which we don't need for the subsequent lsblk call.
-            root_device = root_device.split('[')[0]
             lsblk_call = Command.run(
-                ['lsblk', '-p', '-n', '-r', '-s', '-o', 'NAME,TYPE', root_device.strip()]
+                ['lsblk', '-p', '-n', '-r', '-s', '-o', 'NAME,TYPE', root_device],
+                cache=True,
             )
             considered_block_types = ['disk', 'raid']
             for entry in lsblk_call.output.split(os.linesep):
@@ -279,10 +261,9 @@ class PrepareMigration:
                         return self.get_by_id_device(block_record[0])
 
     def get_by_id_device(self, unix_node):
-        by_id_path = '/dev/disk/by-id'
-        for device in sorted(glob.iglob('{}/*'.format(by_id_path))):
-            if os.path.islink(device) and os.path.realpath(device) == unix_node:
-                return device
+        by_id_devices = DeviceAliases.get_aliases(unix_node, 'by-id')
+        if by_id_devices:
+            return by_id_devices[0]
 
     def get_regionsrv_client_file_location(self):
         """
@@ -17,12 +17,18 @@
 #
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # project
 from suse_migration_services.command import Command
+from suse_migration_services.command_trace import CommandTrace
 from suse_migration_services.logger import Logger
 from suse_migration_services.defaults import Defaults
-from suse_migration_services.fstab import Fstab
+from suse_migration_services.exceptions import DistMigrationCommandException
+from suse_migration_services.mount_backend import MountBackend
+from suse_migration_services.mount_info import MountInfo
+from suse_migration_services.mount_ledger import MountLedger
 from suse_migration_services.migration_config import MigrationConfig
 
 
@@ -34,14 +40,17 @@ class Reboot:
         After the migration process is finished, the system reboots
         unless the debug option is set.
 
-        Before reboot a reverse umount of the filesystems that got mounted
-        by the mount_system service is performed and thus releases the
-        upgraded system from the migration host. If for whatever reason
+        Before reboot the filesystems that got mounted by the migration
+        services are umounted and thus the upgraded system is released
+        from the migration host. The mount tree is umounted from the
+        leaves to the root, the mounts of one tree level concurrently.
+        A busy filesystem gets lazily detached. If for whatever reason
         a filesystem is busy and can't be umounted, this condition is not
         handled as an error. The reason is that the cleanup should not
         prevent us from continuing with the reboot process. The risk on
         reboot of the migration host with a potential active mount
-        is something we accept
+        is something we accept. A mount option overlay applied
+        for the migration ends with the umount of the filesystem
         """
         Logger.setup()
         self.log = logging.getLogger(Defaults.get_migration_log_name())
@@ -56,6 +65,13 @@ class Reboot:
                     content=migration_config.get_migration_config_file_content()
                 )
             )
+            command_summary = CommandTrace.summarize()
+            if command_summary:
+                self.log.info(
+                    'Commands ranked by runtime and resource usage:{0}{1}'.format(
+                        os.linesep, command_summary
+                    )
+                )
             # stop console dialog log. The service holds a busy state
             # on system-root and stands in our way in case of debug
             # mode because it grabs the master console in/output
@@ -64,17 +80,31 @@ class Reboot:
                 self.log.info('Reboot skipped due to debug flag set')
             else:
                 self.log.info('Umounting system')
-                system_mount = Fstab()
-                system_mount.read(Defaults.get_system_mount_info_file())
-                for mount in reversed(system_mount.get_devices()):
-                    self.log.info(
-                        'Umounting {0}: {1}'.format(
-                            mount.mountpoint,
-                            Command.run(
-                                ['umount', '--lazy', mount.mountpoint], raise_on_error=False
-                            ),
-                        )
+                system_mount = MountLedger().get_fstab()
+                umount_states = {}
+                for umount_level in MountInfo.get_umount_levels(
+                    [mount.mountpoint for mount in system_mount.get_devices()]
+                ):
+                    umount_states.update(self.umount_level(umount_level))
+                failed_mountpoints = [
+                    mountpoint for mountpoint, state in umount_states.items() if state == 'failed'
+                ]
+                if failed_mountpoints:
+                    self.log.error('Failed to umount: {0}'.format(', '.join(failed_mountpoints)))
+                busy_mountpoints = [
+                    mountpoint for mountpoint, state in umount_states.items() if state == 'busy'
+                ]
+                if busy_mountpoints:
+                    self.log.warning(
+                        'Busy mounts lazily detached: {0}'.format(', '.join(busy_mountpoints))
                     )
+                    if migration_config.get_mount_option_overlay():
+                        # detached filesystems stay alive with the
+                        # migration mount options, e.g lazytime and a
+                        # long journal commit interval, until no longer
+                        # busy. Write their pending changes before restart
+                        self.log.info('Syncing lazily detached filesystems')
+                        os.sync()
                 if not migration_config.is_soft_reboot_requested():
                     restart_system = 'reboot'
                 else:
@@ -91,6 +121,47 @@ class Reboot:
             self.log.warning('Reboot system: [Force Reboot]')
             Command.run(['systemctl', '--force', 'reboot'])
 
+    def umount_level(self, umount_level):
+        """
+        Umount the independent mounts of one mount tree level concurrently
+
+        :param list umount_level: list of mount_info_type elements
+
+        :return: umount state of each mountpoint, see umount()
+
+        :rtype: dict
+        """
+        mountpoints = [mount.mountpoint for mount in umount_level]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return dict(zip(mountpoints, executor.map(self.umount, mountpoints)))
+
+    def umount(self, mountpoint):
+        """
+        Umount mountpoint, a busy mountpoint is lazily detached
+
+        :param string mountpoint: mounted directory
+
+        :return: one of umounted, busy or failed
+
+        :rtype: str
+        """
+        start_time = time.monotonic()
+        try:
+            busy = not MountBackend.umount_unless_busy(mountpoint)
+        except DistMigrationCommandException as issue:
+            self.log.error('Umount of {0} failed: {1}'.format(mountpoint, issue))
+            return 'failed'
+        if busy:
+            MountBackend.umount(mountpoint, lazy=True, raise_on_error=False)
+        self.log.info(
+            'Umounted {0}{1} in {2:.3f}s'.format(
+                mountpoint,
+                ' (busy, lazily detached)' if busy else '',
+                time.monotonic() - start_time,
+            )
+        )
+        return 'busy' if busy else 'umounted'
+
 
 def main():
     reboot = Reboot()
@@ -21,6 +21,7 @@ import logging
 # project
 from suse_migration_services.command import Command
 from suse_migration_services.defaults import Defaults
+from suse_migration_services.mount_backend import MountBackend
 from suse_migration_services.logger import Logger
 from suse_migration_services.migration_config import MigrationConfig
 
@@ -57,13 +58,8 @@ class RegenerateBootImage:
                 self.log.info(
                     'Running mount --bind {0} {1}'.format(bind_dir, self.root_path + bind_dir)
                 )
-                Command.run(
-                    [
-                        'mount',
-                        '--bind',
-                        bind_dir,
-                        os.path.normpath(os.sep.join([self.root_path, bind_dir])),
-                    ]
+                MountBackend.bind(
+                    bind_dir, os.path.normpath(os.sep.join([self.root_path, bind_dir]))
                 )
             except Exception as issue:
                 message = 'Unable to mount: {0}'.format(issue)
@@ -22,13 +22,17 @@ import shutil
 
 # project
 from suse_migration_services.command import Command
-from suse_migration_services.fstab import Fstab
+from suse_migration_services.mount_ledger import MountLedger
+from suse_migration_services.mount_backend import MountBackend
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
 from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.path import Path
 
-from suse_migration_services.exceptions import DistMigrationHostNetworkException
+from suse_migration_services.exceptions import (
+    DistMigrationCommandException,
+    DistMigrationHostNetworkException,
+)
 
 
 class SetupHostNetwork:
@@ -45,8 +49,7 @@ class SetupHostNetwork:
         self.root_path = Defaults.get_system_root_path()
 
     def perform(self, container):
-        system_mount = Fstab()
-        system_mount.read(Defaults.get_system_mount_info_file())
+        system_mount = MountLedger()
 
         sysconfig_network_providers = os.sep.join(
             [self.root_path, 'etc', 'sysconfig', 'network', 'providers']
@@ -79,20 +82,13 @@ class SetupHostNetwork:
             if os.path.islink(network_manager_service):
                 Path.create('/etc/NetworkManager')
                 Path.create('/usr/lib/NetworkManager')
-                Command.run(['mount', '--bind', etc_network_manager, '/etc/NetworkManager'])
-                Command.run(['mount', '--bind', usr_lib_network_manager, '/usr/lib/NetworkManager'])
+                MountBackend.bind(etc_network_manager, '/etc/NetworkManager')
+                MountBackend.bind(usr_lib_network_manager, '/usr/lib/NetworkManager')
                 system_mount.add_entry(etc_network_manager, '/etc/NetworkManager')
                 system_mount.add_entry(usr_lib_network_manager, '/usr/lib/NetworkManager')
 
             if os.path.exists(sysconfig_network_providers):
-                Command.run(
-                    [
-                        'mount',
-                        '--bind',
-                        sysconfig_network_providers,
-                        '/etc/sysconfig/network/providers',
-                    ]
-                )
+                MountBackend.bind(sysconfig_network_providers, '/etc/sysconfig/network/providers')
                 system_mount.add_entry(
                     sysconfig_network_providers, '/etc/sysconfig/network/providers'
                 )
@@ -109,7 +105,7 @@ class SetupHostNetwork:
                     Command.run(['nm-online', '-q'])
             if os.path.islink(wicked_service):
                 self.wicked2nm_migrate(activate_connections=False if container else True)
-            system_mount.export(Defaults.get_system_mount_info_file())
+            system_mount.sync()
             if container:
                 Command.run(['systemctl', 'stop', 'NetworkManager'])
 
@@ -117,17 +113,10 @@ class SetupHostNetwork:
             # `suseconnect -l` have working DNS
             for subdir in ('NetworkManager', 'netconfig'):
                 run_dir = os.path.join(self.root_path, 'run', subdir)
-                os.makedirs(run_dir, exist_ok=True)
-                Command.run(['touch', os.path.join(run_dir, 'resolv.conf')])
-                Command.run(
-                    [
-                        'mount',
-                        '--bind',
-                        '-o',
-                        'ro',
-                        '/etc/resolv.conf',
-                        os.path.join(run_dir, 'resolv.conf'),
-                    ]
+                Path.create(run_dir)
+                Path.touch(os.path.join(run_dir, 'resolv.conf'))
+                MountBackend.bind(
+                    '/etc/resolv.conf', os.path.join(run_dir, 'resolv.conf'), read_only=True
                 )
         except Exception as issue:
             message = 'Preparation of migration host network failed with {}'
@@ -142,28 +131,27 @@ class SetupHostNetwork:
         to provide most useful information about the network interfaces
         and its setup.
         """
-        self.log.info(
-            'All Network Interfaces {0}{1}'.format(
-                os.linesep, Command.run(['ip', 'a'], raise_on_error=False).output
-            )
-        )
-        self.log.info(
-            'Routing Tables {0}{1}'.format(
-                os.linesep, Command.run(['ip', 'r'], raise_on_error=False).output
-            )
-        )
-        self.log.info(
-            'DNS Resolver {0}{1}'.format(
-                os.linesep, Command.run(['cat', '/etc/resolv.conf'], raise_on_error=False).output
-            )
+        network_details = [
+            ('All Network Interfaces', ['ip', 'a']),
+            ('Routing Tables', ['ip', 'r']),
+        ]
+        results = Command.run_many(
+            [command for _, command in network_details], raise_on_error=False
         )
+        for (title, _), result in zip(network_details, results):
+            self.log.info('{0} {1}{2}'.format(title, os.linesep, result.output))
+        network_files = [('DNS Resolver', ['/etc/resolv.conf'])]
         bonding_paths = '/proc/net/bonding/bond*'
         if os.path.exists(os.path.dirname(bonding_paths)):
-            self.log.info(
-                'Network Bonding {0}{1}'.format(
-                    os.linesep, Command.run(['cat', bonding_paths], raise_on_error=False).output
-                )
-            )
+            network_files.append(('Network Bonding', sorted(glob.glob(bonding_paths))))
+        for title, filenames in network_files:
+            contents = []
+            for filename in filenames:
+                try:
+                    contents.append(Path.read(filename))
+                except DistMigrationCommandException as issue:
+                    contents.append(format(issue))
+            self.log.info('{0} {1}{2}'.format(title, os.linesep, os.linesep.join(contents)))
 
     def wicked2nm_migrate(self, activate_connections=True):
         """
@@ -184,14 +172,18 @@ class SetupHostNetwork:
             self.log.info('No wicked config present, skipping wicked2nm.')
             return
         if (
-            Command.run(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False).returncode
+            Command.run(
+                ['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True
+            ).returncode
             != 0
         ):
             self.log.info('No wicked2nm present, skipping wicked2nm.')
             return
         if (
             Command.run(
-                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'], raise_on_error=False
+                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'],
+                raise_on_error=False,
+                cache=True,
             ).returncode
             != 0
         ):
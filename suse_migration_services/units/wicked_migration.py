@@ -20,9 +20,11 @@ import logging
 import glob
 
 # project
+from suse_migration_services.chroot_executor import ChrootExecutor
 from suse_migration_services.command import Command
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.logger import Logger
+from suse_migration_services.path import Path
 from suse_migration_services.drop_components import DropComponents
 from suse_migration_services.zypper import Zypper
 from suse_migration_services.resolv_conf import ResolvConf
@@ -88,9 +90,13 @@ class WickedToNetworkManager(DropComponents):
             nm_connections_path = os.path.normpath(
                 os.sep.join([self.root_path, 'etc/NetworkManager/system-connections'])
             )
-            Command.run(['mkdir', '-p', nm_connections_path])
-            for connection in sorted(glob.iglob(nm_connection_pattern)):
-                Command.run(['cp', connection, nm_connections_path])
+            Path.create(nm_connections_path)
+            Command.run_many(
+                [
+                    ['cp', connection, nm_connections_path]
+                    for connection in sorted(glob.iglob(nm_connection_pattern))
+                ]
+            )
 
             rc_target = os.path.normpath(os.sep.join([self.root_path, 'etc/resolv.conf']))
             rc_backup = '/tmp/resolv.conf.backup'
@@ -126,4 +132,5 @@ class WickedToNetworkManager(DropComponents):
 
 def main():
     network_migration = WickedToNetworkManager()
-    network_migration.perform()
+    with ChrootExecutor(network_migration.root_path):
+        network_migration.perform()
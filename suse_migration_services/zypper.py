@@ -21,6 +21,7 @@ import os
 from suse_migration_services.command import Command
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.exceptions import DistMigrationZypperException
+from suse_migration_services.zypper_progress import ZypperProgress
 
 
 class Zypper:
@@ -29,13 +30,16 @@ class Zypper:
     """
 
     @staticmethod
-    def run(args, raise_on_error=True, chroot=''):
+    def run(args, raise_on_error=True, chroot='', line_callback=None, event_callback=None):
         """
         Invoke zypper and block the caller. The return value is a
         ZypperCall instance containing the result of invocation.
+        The merged stdout/stderr of zypper is streamed to the
+        migration log file, only the first and last lines of it
+        are kept in the ZypperCall result.
 
         raise_on_error:
-            is directly passed to the underlying Command.run invocation
+            is directly passed to the underlying Command.run_stream invocation
             and thus will raise whenever zypper exists with a non-zero
             status. To check the status according to zypper sematics,
             use raise_on_error=False with ZypperCall.success and
@@ -43,12 +47,24 @@ class Zypper:
 
         chroot:
             run zypper chrooted against the given path
+
+        line_callback:
+            called with each line of zypper output as it arrives
+
+        event_callback:
+            run zypper with --xmlout and call event_callback with
+            each progress event parsed from the xml stream, see
+            ZypperProgress for the event types
         """
         log_file = Defaults.get_migration_log_file(system_root=False if chroot else True)
-        command_string = ' '.join(
-            ['set -o pipefail; zypper'] + list(args) + ['|& tee -a', log_file]
-        )
-        command = []
+        # zypper is called without a shell in between, empty arguments
+        # which vanished in the former shell command string must not
+        # be passed on as they would be taken as an (empty) argument
+        command = ['zypper'] + [arg for arg in args if arg]
+        progress = None
+        if event_callback:
+            progress = ZypperProgress(event_callback)
+            command.insert(1, '--xmlout')
         if chroot:
             # Calling zypper in a new system root should be done in
             # offline systemd mode to prevent package scripts to access
@@ -57,14 +73,25 @@ class Zypper:
             custom_env['SYSTEMD_OFFLINE'] = '1'
             os.environ.update(custom_env)
 
-            command += ['chroot', chroot]
+            # the log file path is relative to the new root
+            log_file = os.path.normpath(os.sep.join([chroot, log_file]))
+            command = ['chroot', chroot] + command
         try:
-            result = Command.run(
-                command + ['bash', '-c', command_string], raise_on_error=raise_on_error
-            )
+            with open(log_file, 'a', buffering=1) as log:
+
+                def tee(line):
+                    log.write(line + os.linesep)
+                    if progress:
+                        progress.feed(line)
+                    if line_callback:
+                        line_callback(line)
+
+                result = Command.run_stream(
+                    command, line_callback=tee, raise_on_error=raise_on_error, merge_stderr=True
+                )
         except Exception as issue:
             raise DistMigrationZypperException('zypper failed with: {}'.format(issue))
-        return ZypperCall(args, command_string, result)
+        return ZypperCall(args, ' '.join(command), result)
 
     @staticmethod
     def install(*pkgs: str, raise_on_error=True, system_root=None, chroot='', extra_args=[]):
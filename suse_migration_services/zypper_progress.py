@@ -0,0 +1,287 @@
+# Copyright (c) 2026 SUSE Linux LLC.  All rights reserved.
+#
+# This file is part of suse-migration-services.
+#
+# suse-migration-services is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# suse-migration-services is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with suse-migration-services. If not, see <http://www.gnu.org/licenses/>
+#
+import re
+import time
+from collections import namedtuple
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+download_event_type = namedtuple(
+    'download_event_type', ['url', 'percent', 'rate', 'bytes_downloaded', 'done']
+)
+install_event_type = namedtuple('install_event_type', ['current', 'total', 'name', 'rate', 'eta'])
+scriptlet_event_type = namedtuple('scriptlet_event_type', ['name'])
+progress_event_type = namedtuple('progress_event_type', ['id', 'name', 'percent', 'done'])
+message_event_type = namedtuple('message_event_type', ['type', 'text'])
+
+
+class ZypperProgress:
+    """
+    **Implements a streaming parser for zypper --xmlout output**
+
+    Lines of zypper output are passed to feed() as they arrive.
+    Each completed top level node of the xml stream is turned
+    into a typed event passed to the event_callback and dropped
+    afterwards such that memory consumption stays constant no
+    matter how long the zypper process runs.
+
+    Events are:
+
+    * download_event_type: per file download progress, rate in
+      bytes/sec as reported by zypper and bytes_downloaded as the
+      total of all downloads estimated from the reported rates
+    * install_event_type: package counter, rate in packages/sec
+      and eta in seconds for the remaining packages
+    * scriptlet_event_type: name of the currently running scriptlet
+    * progress_event_type: any other progress node
+    * message_event_type: message nodes and any other plain text line
+
+    The zypper migration plugin does not talk xml, its plain text
+    "Retrieving ..." and "(n/m) Installing: ..." lines are turned
+    into download and install events as well. The download rate is
+    not part of that output, the bytes_downloaded total is summed up
+    from the package sizes zypper reports instead.
+
+    :param function event_callback: called with each event
+    """
+
+    install_pattern = re.compile(r'^\(\s*(\d+)/(\d+)\)\s*(.*)$')
+    scriptlet_pattern = re.compile(r'\bscripts?\b', re.IGNORECASE)
+    package_pattern = re.compile(r'^(Installing|Removing|Retrieving):')
+    text_done_pattern = re.compile(r'\s*\.*\s*\[([^\]]*)\]$')
+    text_download_pattern = re.compile(r'^Retrieving(?::| package)\s+(\S+)(.*)$')
+    text_size_pattern = re.compile(r'\),\s*([\d.,]+)\s*(B|KiB|MiB|GiB)\b')
+    size_units = {'B': 1, 'KiB': 1024, 'MiB': 1048576, 'GiB': 1073741824}
+
+    def __init__(self, event_callback):
+        self.event_callback = event_callback
+        self.bytes_downloaded = 0
+        self.download_updates = {}
+        self.install_start = None
+        self.install_current = None
+        self.scriptlet = None
+        self._reset()
+
+    def feed(self, line):
+        """
+        Process one line of zypper output
+
+        :param str line: output line
+        """
+        stripped = line.strip()
+        if stripped.startswith('<?xml'):
+            # zypper and the migration plugin may run several zypper
+            # processes in a row, each of them starts a new document
+            self._reset()
+            return
+        if self.depth <= 1 and not stripped.startswith('<'):
+            if stripped:
+                self._process_text(stripped)
+            return
+        try:
+            self.parser.feed(line + '\n')
+            for event, element in self.parser.read_events():
+                if event == 'start':
+                    self.depth += 1
+                    if self.depth == 1:
+                        self.stream = element
+                    continue
+                self.depth -= 1
+                if self.depth == 1:
+                    self._process(element)
+                    if self.stream is not None:
+                        self.stream.remove(element)
+                elif self.depth == 0:
+                    self._reset()
+        except ParseError:
+            # not a well formed zypper xml stream, drop the broken
+            # part and continue with the nodes that follow
+            self._reset()
+            self.parser.feed('<stream>')
+
+    def _reset(self):
+        self.parser = XMLPullParser(events=('start', 'end'))
+        self.stream = None
+        self.depth = 0
+
+    def _process(self, element):
+        if element.tag == 'message':
+            self.event_callback(
+                message_event_type(
+                    type=element.get('type', 'info'), text=(element.text or '').strip()
+                )
+            )
+        elif element.tag == 'download':
+            self._process_download(element)
+        elif element.tag == 'progress':
+            self._process_progress(element)
+
+    def _process_text(self, text):
+        status = self.text_done_pattern.search(text)
+        if status:
+            text = text[: status.start()]
+        install = self.install_pattern.match(text)
+        if install and self.package_pattern.match(install.group(3)):
+            self._process_install(int(install.group(1)), int(install.group(2)), install.group(3))
+            return
+        download = self.text_download_pattern.match(text)
+        if download:
+            size = self.text_size_pattern.search(download.group(2))
+            if size:
+                self.bytes_downloaded += int(
+                    float(size.group(1).replace(',', '.')) * self.size_units[size.group(2)]
+                )
+            done = status is not None and status.group(1).startswith('done')
+            self.event_callback(
+                download_event_type(
+                    url=download.group(1),
+                    percent=100 if done else -1,
+                    rate=-1,
+                    bytes_downloaded=self.bytes_downloaded,
+                    done=done,
+                )
+            )
+            return
+        self.event_callback(message_event_type(type='text', text=text))
+
+    def _process_download(self, element):
+        url = element.get('url', '')
+        rate = _to_int(element.get('rate'))
+        now = time.monotonic()
+        last_update = self.download_updates.get(url)
+        if last_update is not None and rate > 0:
+            self.bytes_downloaded += int(rate * (now - last_update))
+        done = element.get('done') is not None
+        if done:
+            self.download_updates.pop(url, None)
+        else:
+            self.download_updates[url] = now
+        self.event_callback(
+            download_event_type(
+                url=url,
+                percent=_to_int(element.get('percent')),
+                rate=rate,
+                bytes_downloaded=self.bytes_downloaded,
+                done=done,
+            )
+        )
+
+    def _process_progress(self, element):
+        name = element.get('name', '')
+        install = self.install_pattern.match(name)
+        if install:
+            name = install.group(3)
+            self._process_install(int(install.group(1)), int(install.group(2)), name)
+        if self.scriptlet_pattern.search(name) and not self.package_pattern.match(name):
+            if name != self.scriptlet:
+                self.scriptlet = name
+                self.event_callback(scriptlet_event_type(name=name))
+        elif not install:
+            self.event_callback(
+                progress_event_type(
+                    id=element.get('id', ''),
+                    name=name,
+                    percent=_to_int(element.get('value')),
+                    done=element.get('done') is not None,
+                )
+            )
+
+    def _process_install(self, current, total, name):
+        if current == self.install_current:
+            # progress update of the package already reported
+            return
+        self.install_current = current
+        now = time.monotonic()
+        if self.install_start is None:
+            self.install_start = (now, current)
+        start_time, start_count = self.install_start
+        elapsed = now - start_time
+        rate = (current - start_count) / elapsed if elapsed > 0 else 0.0
+        eta = int((total - current) / rate) if rate > 0 else None
+        self.event_callback(
+            install_event_type(current=current, total=total, name=name, rate=rate, eta=eta)
+        )
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class ZypperProgressReport:
+    """
+    **Condensed logging of zypper progress events**
+
+    Logs the install progress once per percent including the
+    install rate and ETA, every scriptlet and the throughput of
+    the download phase once the install phase starts
+
+    :param object log: logger instance
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.download_start = None
+        self.bytes_downloaded = 0
+        self.install_percent = None
+
+    def report(self, event):
+        """
+        Event callback for ZypperProgress
+
+        :param namedtuple event: one of the ZypperProgress events
+        """
+        if isinstance(event, download_event_type):
+            if self.download_start is None:
+                self.download_start = time.monotonic()
+            self.bytes_downloaded = event.bytes_downloaded
+        elif isinstance(event, install_event_type):
+            if self.install_percent is None and self.download_start is not None:
+                self._report_download()
+            percent = event.current * 100 // event.total if event.total else 0
+            if percent != self.install_percent:
+                self.install_percent = percent
+                self.log.info(
+                    'Installing {0}/{1} ({2}%) at {3:.1f} packages/sec, ETA: {4}'.format(
+                        event.current,
+                        event.total,
+                        percent,
+                        event.rate,
+                        _format_seconds(event.eta),
+                    )
+                )
+        elif isinstance(event, scriptlet_event_type):
+            self.log.info('Running: {0}'.format(event.name))
+
+    def _report_download(self):
+        elapsed = time.monotonic() - self.download_start
+        mib_downloaded = self.bytes_downloaded / 1048576
+        self.log.info(
+            'Download phase: ~{0:.1f} MiB in {1} at ~{2:.1f} MiB/sec'.format(
+                mib_downloaded,
+                _format_seconds(int(elapsed)),
+                mib_downloaded / elapsed if elapsed > 0 else 0.0,
+            )
+        )
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return 'unknown'
+    return '{0:d}:{1:02d}:{2:02d}'.format(seconds // 3600, seconds % 3600 // 60, seconds % 60)
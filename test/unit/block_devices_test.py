@@ -0,0 +1,84 @@
+from unittest.mock import patch, call
+from collections import namedtuple
+
+from suse_migration_services.block_devices import BlockDevices
+
+command_type = namedtuple('command', ['output', 'error', 'returncode'])
+
+
+class TestBlockDevices:
+    @patch('suse_migration_services.command.Command.run')
+    def setup_method(self, cls, mock_Command_run):
+        with open('../data/lsblk.json') as lsblk:
+            mock_Command_run.return_value = command_type(
+                output=lsblk.read(), error='', returncode=0
+            )
+        self.block_devices = BlockDevices()
+        mock_Command_run.assert_called_once_with(
+            ['lsblk', '--json', '--list', '-p', '-o', 'NAME,TYPE,UUID,WWN,MOUNTPOINTS'],
+            cache=True,
+        )
+
+    def test_get_devices(self):
+        assert [device.name for device in self.block_devices.get_devices()] == [
+            '/dev/sda',
+            '/dev/sdb',
+            '/dev/mapper/3600a0b80001',
+            '/dev/mapper/3600a0b80001-part1',
+            '/dev/mapper/3600a0b80001-part2',
+            '/dev/vda',
+            '/dev/vda1',
+            '/dev/md0',
+        ]
+        root = self.block_devices.get_devices(['part'])[1]
+        assert root.mountpoints == ['/', '/home']
+        assert root.uuid == 'bd604632-663b-4d4c-b5b0-8d8686267ea2'
+        assert self.block_devices.get_devices(['disk'])[0].wwn == '0x5000c500a1b2c3d4'
+        assert self.block_devices.get_devices(['disk'])[0].mountpoints == []
+
+    @patch('suse_migration_services.command.Command.run_many')
+    def test_get_devices_by_uuid(self, mock_Command_run_many):
+        devices = self.block_devices.get_devices_by_uuid(
+            'bd604632-663b-4d4c-b5b0-8d8686267ea2', ['part', 'lvm']
+        )
+        assert [device.name for device in devices] == ['/dev/mapper/3600a0b80001-part2']
+        assert self.block_devices.get_devices_by_uuid('FCF7-B051', ['lvm']) == []
+        assert not mock_Command_run_many.called
+
+    @patch('suse_migration_services.command.Command.run_many')
+    def test_get_devices_by_uuid_probes_missing(self, mock_Command_run_many):
+        mock_Command_run_many.return_value = [command_type(output='UUID\n', error='', returncode=0)]
+        devices = self.block_devices.get_devices_by_uuid('UUID', ['part'])
+        assert [device.name for device in devices] == ['/dev/vda1']
+        mock_Command_run_many.assert_called_once_with(
+            [['blkid', '/dev/vda1', '-s', 'UUID', '-o', 'value']], raise_on_error=False
+        )
+        # probing happens only once
+        assert self.block_devices.get_devices_by_uuid('other', ['part']) == []
+        assert mock_Command_run_many.call_count == 1
+
+    @patch('suse_migration_services.command.Command.run_many')
+    def test_get_devices_by_uuid_probe_fails(self, mock_Command_run_many):
+        mock_Command_run_many.return_value = [
+            command_type(output=None, error=None, returncode=-1),
+            command_type(output='', error='', returncode=2),
+            command_type(output='', error='', returncode=2),
+            command_type(output='', error='', returncode=2),
+            command_type(output='', error='', returncode=2),
+        ]
+        assert self.block_devices.get_devices_by_uuid('UUID', ['part', 'disk', 'mpath']) == []
+        assert mock_Command_run_many.call_args == call(
+            [
+                ['blkid', '/dev/sda', '-s', 'UUID', '-o', 'value'],
+                ['blkid', '/dev/sdb', '-s', 'UUID', '-o', 'value'],
+                ['blkid', '/dev/mapper/3600a0b80001', '-s', 'UUID', '-o', 'value'],
+                ['blkid', '/dev/vda', '-s', 'UUID', '-o', 'value'],
+                ['blkid', '/dev/vda1', '-s', 'UUID', '-o', 'value'],
+            ],
+            raise_on_error=False,
+        )
+
+    @patch('suse_migration_services.command.Command.run_many')
+    def test_get_devices_by_uuid_nothing_to_probe(self, mock_Command_run_many):
+        assert self.block_devices.get_devices_by_uuid('UUID', ['raid1']) == []
+        assert not mock_Command_run_many.called
@@ -0,0 +1,192 @@
+import os
+import logging
+import threading
+from multiprocessing import Pipe
+from unittest.mock import patch
+from pytest import raises, fixture
+
+from suse_migration_services.chroot_executor import ChrootExecutor
+from suse_migration_services.command import Command
+from suse_migration_services.exceptions import DistMigrationCommandException
+
+
+@patch('os.chroot')
+class TestChrootExecutor(object):
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog, tmp_path):
+        self._caplog = caplog
+        self.root_path = format(tmp_path)
+
+    def test_run(self, mock_chroot):
+        with ChrootExecutor(self.root_path) as executor:
+            result = Command.run(
+                ['chroot', self.root_path, 'bash', '-c', 'echo $PPID; echo error >&2']
+            )
+            assert result.output == '{0}\n'.format(executor.pid)
+            assert result.error == 'error\n'
+            assert result.returncode == 0
+            result = Command.run(
+                ['chroot', self.root_path + '/', 'bash', '-c', 'exit 3'], raise_on_error=False
+            )
+            assert result.returncode == 3
+            assert result.output == '(no output on stdout)'
+            result = Command.run(
+                ['chroot', self.root_path, 'no-such-command'], raise_on_error=False
+            )
+            assert result.returncode == 127
+            assert result.error == (
+                "chroot: failed to run command 'no-such-command': No such file or directory"
+            )
+        assert executor.pid is None
+        assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is None
+        mock_chroot.assert_not_called()
+
+    def test_run_stream(self, mock_chroot):
+        lines = []
+        with ChrootExecutor(self.root_path):
+            result = Command.run_stream(
+                ['chroot', self.root_path, 'bash', '-c', 'echo 1; echo 2 >&2; echo 3'],
+                line_callback=lines.append,
+            )
+            assert lines == ['1', '3']
+            assert result.output == '1\n3'
+            assert result.error == '2'
+            result = Command.run_stream(
+                ['chroot', self.root_path, 'bash', '-c', 'echo 1; echo 2 >&2'],
+                merge_stderr=True,
+            )
+            assert result.output == '1\n2'
+            result = Command.run_stream(
+                ['chroot', self.root_path, 'no-such-command'],
+                merge_stderr=True,
+                raise_on_error=False,
+            )
+            assert result.returncode == 127
+            with raises(DistMigrationCommandException):
+                Command.run_stream(['chroot', self.root_path, 'bash', '-c', 'exit 1'])
+
+    def test_run_stream_callback_failed(self, mock_chroot):
+        def line_callback(line):
+            raise ValueError(line)
+
+        with ChrootExecutor(self.root_path) as executor:
+            with raises(ValueError):
+                Command.run_stream(
+                    ['chroot', self.root_path, 'bash', '-c', 'echo 1; echo 2'],
+                    line_callback=line_callback,
+                )
+            assert executor.pid is None
+            assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is None
+
+    def test_get(self, mock_chroot):
+        with ChrootExecutor(self.root_path) as executor:
+            assert ChrootExecutor.get(['chroot', '/other', 'true']) is None
+            assert ChrootExecutor.get(['bash', '-c', 'true']) is None
+            assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is executor
+            # busy until the reserved executor has been used
+            assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is None
+            executor.communicate(['true'], os.environ)
+            pid = executor.pid
+            executor.pid = None
+            assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is None
+            assert not executor.lock.locked()
+            executor.pid = pid
+
+    def test_start_chroot_failed(self, mock_chroot):
+        mock_chroot.side_effect = OSError('Operation not permitted')
+        executor = ChrootExecutor(self.root_path)
+        with self._caplog.at_level(logging.WARNING):
+            executor.start()
+            assert (
+                'Chroot executor for {0} not available: Operation not permitted'.format(
+                    self.root_path
+                )
+                in self._caplog.text
+            )
+        assert executor.pid is None
+        assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is None
+
+    @patch.object(ChrootExecutor, '_serve')
+    def test_start_helper_failed(self, mock_serve, mock_chroot):
+        mock_serve.side_effect = Exception
+        with self._caplog.at_level(logging.WARNING):
+            with ChrootExecutor(self.root_path) as executor:
+                assert executor.pid is None
+            assert 'not available: EOFError' in self._caplog.text
+
+    def test_helper_died(self, mock_chroot):
+        with ChrootExecutor(self.root_path) as executor:
+            os.kill(executor.pid, 9)
+            with raises(DistMigrationCommandException):
+                Command.run(['chroot', self.root_path, 'true'])
+            assert executor.pid is None
+            assert not executor.lock.locked()
+
+    def test_send_failed(self, mock_chroot):
+        with ChrootExecutor(self.root_path) as executor:
+            assert ChrootExecutor.get(['chroot', self.root_path, 'true']) is executor
+            with patch.object(executor.connection, 'send') as mock_send:
+                mock_send.side_effect = OSError('Broken pipe')
+                with raises(DistMigrationCommandException):
+                    executor.communicate(['true'], os.environ)
+            assert executor.pid is None
+
+    def test_recv_failed(self, mock_chroot):
+        with ChrootExecutor(self.root_path) as executor:
+            os.kill(executor.pid, 9)
+            with raises(DistMigrationCommandException):
+                executor._recv()
+            assert executor.pid is None
+
+    def test_close_helper_gone(self, mock_chroot):
+        executor = ChrootExecutor(self.root_path)
+        executor.start()
+        with patch.object(executor.connection, 'send') as mock_send:
+            mock_send.side_effect = OSError('Broken pipe')
+            executor.close()
+        assert executor.pid is None
+
+    @patch('os.chdir')
+    def test_serve(self, mock_chdir, mock_chroot):
+        # the helper side running in-process over a real pipe
+        connection, helper_connection = Pipe()
+        helper = threading.Thread(
+            target=ChrootExecutor._serve, args=(self.root_path, helper_connection)
+        )
+        helper.start()
+        try:
+            assert connection.recv() == ('ready', None)
+            mock_chroot.assert_called_once_with(self.root_path)
+            mock_chdir.assert_called_once_with(os.sep)
+            connection.send(
+                ('communicate', ['bash', '-c', 'echo out; echo err >&2; exit 2'], {}, False)
+            )
+            assert connection.recv() == (b'out\n', b'err\n', 2)
+            connection.send(('stream', ['bash', '-c', 'echo 1; echo 2 >&2'], {}, False))
+            assert connection.recv() == ('stdout', '1')
+            assert connection.recv() == ('stderr', '2')
+            assert connection.recv() == ('exit', 0)
+            connection.send(('stream', ['bash', '-c', 'echo 1 >&2; exit 1'], {}, True))
+            assert connection.recv() == ('stdout', '1')
+            assert connection.recv() == ('exit', 1)
+            error = "chroot: failed to run command 'no-such-command': No such file or directory"
+            connection.send(('communicate', ['no-such-command'], {}, False))
+            assert connection.recv() == (b'', error.encode(), 127)
+            connection.send(('stream', ['no-such-command'], {}, False))
+            assert connection.recv() == ('stderr', error)
+            assert connection.recv() == ('exit', 127)
+            connection.send(('stream', ['no-such-command'], {}, True))
+            assert connection.recv() == ('stdout', error)
+            assert connection.recv() == ('exit', 127)
+        finally:
+            connection.send(None)
+            helper.join(timeout=10)
+        assert not helper.is_alive()
+
+    @patch('os.chdir')
+    def test_serve_chroot_failed(self, mock_chdir, mock_chroot):
+        mock_chroot.side_effect = OSError('Operation not permitted')
+        connection, helper_connection = Pipe()
+        ChrootExecutor._serve(self.root_path, helper_connection)
+        assert connection.recv() == ('error', 'Operation not permitted')
+        assert not mock_chdir.called
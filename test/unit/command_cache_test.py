@@ -0,0 +1,103 @@
+import os
+from unittest.mock import patch
+from pytest import fixture
+
+from suse_migration_services.command_cache import CommandCache
+
+
+class TestCommandCache(object):
+    @fixture(autouse=True)
+    def setup_cache_dir(self, tmp_path):
+        self.cache_dir = str(tmp_path / 'command-cache')
+        with patch(
+            'suse_migration_services.defaults.Defaults.get_command_cache_dir',
+            return_value=self.cache_dir,
+        ):
+            yield
+
+    def test_get_not_cached(self):
+        assert CommandCache.get(['lsblk']) is None
+
+    def test_store_and_get(self):
+        CommandCache.store(['lsblk', '-p'], 'output', 'error', 0)
+        assert CommandCache.get(['lsblk', '-p']) == ('output', 'error', 0)
+        assert CommandCache.get(['lsblk']) is None
+
+    def test_invalidate(self):
+        CommandCache.store(['lsblk'], 'output', '', 0)
+        CommandCache.invalidate()
+        assert CommandCache.get(['lsblk']) is None
+        assert os.listdir(self.cache_dir) == ['epoch']
+        CommandCache.store(['lsblk'], 'new_output', '', 0)
+        assert CommandCache.get(['lsblk']) == ('new_output', '', 0)
+
+    def test_invalidate_concurrent(self):
+        CommandCache.store(['lsblk'], 'output', '', 0)
+        CommandCache.store(['findmnt'], 'output', '', 0)
+        temp_file = os.sep.join([self.cache_dir, '.tmp_other_writer'])
+        with open(temp_file, 'w'):
+            pass
+        os_unlink = os.unlink
+
+        def unlink(path):
+            # entry got removed by a concurrent invalidation
+            os_unlink(path)
+            raise FileNotFoundError(path)
+
+        with patch('suse_migration_services.command_cache.log') as mock_log:
+            with patch('os.unlink', side_effect=unlink):
+                CommandCache.invalidate()
+            assert not mock_log.warning.called
+        assert sorted(os.listdir(self.cache_dir)) == ['.tmp_other_writer', 'epoch']
+
+    def test_get_other_command(self):
+        CommandCache.store(['lsblk'], 'output', '', 0)
+        with patch('json.load', return_value={'command': ['findmnt']}):
+            assert CommandCache.get(['lsblk']) is None
+
+    @patch('os.scandir')
+    def test_invalidate_failed(self, mock_scandir):
+        CommandCache.store(['lsblk'], 'output', '', 0)
+        mock_scandir.side_effect = OSError('busy')
+        with patch('suse_migration_services.command_cache.log') as mock_log:
+            CommandCache.invalidate()
+            mock_log.warning.assert_called_once_with('Failed to invalidate command cache: busy')
+
+    @patch('os.replace')
+    def test_store_write_failed(self, mock_replace):
+        mock_replace.side_effect = OSError('no space left')
+        CommandCache.store(['lsblk'], 'output', '', 0)
+        assert os.listdir(self.cache_dir) == []
+
+    def test_invalidate_no_cache(self):
+        CommandCache.invalidate()
+        assert not os.path.exists(self.cache_dir)
+
+    @patch('os.makedirs')
+    def test_store_failed(self, mock_makedirs):
+        mock_makedirs.side_effect = OSError('read-only')
+        with patch('suse_migration_services.command_cache.log') as mock_log:
+            CommandCache.store(['lsblk'], 'output', '', 0)
+            mock_log.warning.assert_called_once_with(
+                "Failed to cache result of ['lsblk']: read-only"
+            )
+
+    def test_is_mutating(self):
+        assert CommandCache.is_mutating(['mount', '/dev/sda1', '/mnt'])
+        assert CommandCache.is_mutating(['/usr/bin/umount', '/mnt'])
+        assert CommandCache.is_mutating(['zypper', 'dup'])
+        assert CommandCache.is_mutating(['vgchange', '-a', 'y'])
+        assert CommandCache.is_mutating(['rpm', '-e', 'package'])
+        assert CommandCache.is_mutating(['rpm', '-Uvh', 'package.rpm'])
+        assert CommandCache.is_mutating(['chroot', '/system-root', 'rpm', '--erase', 'package'])
+        assert not CommandCache.is_mutating(['rpm', '-q', 'package'])
+        assert not CommandCache.is_mutating(['rpm', '-qi', 'package'])
+        assert not CommandCache.is_mutating(['chroot', '/system-root', 'rpm', '-q', 'package'])
+        assert CommandCache.is_mutating(['SUSEConnect', '--rollback'])
+        assert CommandCache.is_mutating(['snapper', 'create'])
+        assert CommandCache.is_mutating(['chroot', '/system-root', 'zypper', 'install', 'package'])
+        assert CommandCache.is_mutating(['chroot', '--userspec=root', '/system-root', 'snapper'])
+        assert CommandCache.is_mutating(['chroot', '/system-root'])
+        assert not CommandCache.is_mutating(['lsblk', '-p'])
+        assert not CommandCache.is_mutating(['/usr/bin/stat', '-f', '/'])
+        assert not CommandCache.is_mutating(['chroot', '/system-root', 'cat', '/etc/os-release'])
@@ -0,0 +1,113 @@
+import os
+import signal
+import subprocess
+import time
+from unittest.mock import patch, Mock
+
+from suse_migration_services.command_deadline import CommandDeadline, CommandWatchdog
+from suse_migration_services.exceptions import DistMigrationConfigDataException
+
+
+class TestCommandDeadline:
+    def setup_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
+    def teardown_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
+    @patch('suse_migration_services.migration_config.MigrationConfig')
+    def test_get_timeout(self, mock_MigrationConfig):
+        mock_MigrationConfig.return_value.get_timeouts.return_value = {
+            'command': 60,
+            'programs': {'zypper': 0, 'rpm': 30},
+        }
+        assert CommandDeadline.get_timeout(['ls']) == 60
+        assert CommandDeadline.get_timeout(['/usr/bin/rpm', '-q', 'foo']) == 30
+        assert CommandDeadline.get_timeout(['chroot', '/system-root', 'rpm']) == 30
+        assert CommandDeadline.get_timeout(['zypper', 'dup']) is None
+        assert CommandDeadline.get_timeout(['nm-online', '-q']) == 300
+        assert CommandDeadline.get_timeout(['zypper', 'dup'], timeout=5) == 5
+        assert CommandDeadline.get_grace_time() == 10
+        mock_MigrationConfig.assert_called_once_with()
+
+    @patch('suse_migration_services.migration_config.MigrationConfig')
+    def test_get_timeout_unit_deadline(self, mock_MigrationConfig):
+        mock_MigrationConfig.return_value.get_timeouts.return_value = {'unit': 100}
+        with patch.object(CommandDeadline, 'unit_start', time.monotonic() - 90):
+            assert 9 < CommandDeadline.get_timeout(['zypper', 'dup']) <= 10
+            assert 9 < CommandDeadline.get_timeout(['nm-online', '-q']) <= 10
+            assert CommandDeadline.get_timeout(['ls'], timeout=1) == 1
+        with patch.object(CommandDeadline, 'unit_start', time.monotonic() - 200):
+            assert CommandDeadline.get_timeout(['ls']) == 0
+
+    @patch('suse_migration_services.migration_config.MigrationConfig')
+    def test_get_device_timeout(self, mock_MigrationConfig):
+        mock_MigrationConfig.return_value.get_timeouts.return_value = {}
+        assert CommandDeadline.get_device_timeout() == 30
+        CommandDeadline._timeouts.clear()
+        mock_MigrationConfig.return_value.get_timeouts.return_value = {'unit': 100, 'devices': 60}
+        with patch.object(CommandDeadline, 'unit_start', time.monotonic() - 90):
+            assert 9 < CommandDeadline.get_device_timeout() <= 10
+        with patch.object(CommandDeadline, 'unit_start', time.monotonic()):
+            assert CommandDeadline.get_device_timeout() == 60
+
+    @patch('suse_migration_services.migration_config.MigrationConfig')
+    def test_get_timeout_invalid_config(self, mock_MigrationConfig):
+        mock_MigrationConfig.side_effect = DistMigrationConfigDataException('invalid')
+        assert CommandDeadline.get_timeout(['ls']) is None
+        assert CommandDeadline.get_timeout(['crm', 'cluster', 'health']) == 900
+
+    @patch('suse_migration_services.defaults.Defaults.get_migration_config_file')
+    def test_get_timeout_no_config(self, mock_get_migration_config_file):
+        mock_get_migration_config_file.return_value = '../data/no-such-config.yml'
+        assert CommandDeadline.get_timeout(['ls']) is None
+        assert CommandDeadline.get_timeout(['nm-online']) == 300
+
+
+class TestCommandWatchdog:
+    def setup_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
+    def test_expire(self):
+        process = subprocess.Popen(['sleep', '10'], start_new_session=True)
+        watchdog = CommandWatchdog(['sleep', '10'], process.pid, 0.1)
+        watchdog.start()
+        assert process.wait(timeout=5) == -signal.SIGTERM
+        assert watchdog.stop() is True
+
+    @patch.object(CommandDeadline, 'get_grace_time')
+    def test_expire_ignoring_sigterm(self, mock_get_grace_time):
+        mock_get_grace_time.return_value = 0.1
+        process = subprocess.Popen(['bash', '-c', 'trap "" TERM; sleep 10'], start_new_session=True)
+        # give bash the time to setup the trap
+        time.sleep(0.2)
+        watchdog = CommandWatchdog(['bash'], process.pid, 0.1)
+        watchdog.start()
+        assert process.wait(timeout=5) == -signal.SIGKILL
+        watchdog.stop()
+
+    def test_stop(self):
+        watchdog = CommandWatchdog(['sleep'], os.getpid(), 60)
+        watchdog.start()
+        assert watchdog.stop() is False
+        watchdog.timer.join()
+        # an expiry racing with stop does nothing
+        with patch('os.killpg') as mock_killpg:
+            watchdog._expire()
+            assert not mock_killpg.called
+        assert watchdog.expired is False
+
+    @patch('os.killpg')
+    def test_expire_stopped_in_grace_time(self, mock_killpg):
+        watchdog = CommandWatchdog(['sleep'], 4711, 60)
+        watchdog.stopped = Mock()
+        watchdog.stopped.is_set.side_effect = [False, True]
+        watchdog.stopped.wait.return_value = False
+        watchdog._expire()
+        mock_killpg.assert_called_once_with(4711, signal.SIGTERM)
+        assert watchdog.expired is True
+
+    @patch('os.killpg')
+    def test_kill_group_ignores_errors(self, mock_killpg):
+        mock_killpg.side_effect = ProcessLookupError
+        CommandWatchdog.kill_group(4711, signal.SIGTERM)
@@ -1,10 +1,16 @@
+import asyncio
 import os
+import sys
+import threading
+import time
+from subprocess import Popen
 
 from unittest.mock import patch, Mock
 from pytest import raises
 from collections import namedtuple
 
-from suse_migration_services.command import Command
+from suse_migration_services.command import Command, CommandOutputBuffer
+from suse_migration_services.command_deadline import CommandDeadline
 
 from suse_migration_services.exceptions import (
     DistMigrationCommandException,
@@ -14,15 +20,16 @@ from suse_migration_services.exceptions import (
 
 @patch('suse_migration_services.path.Path.which')
 class TestCommand(object):
-    @patch('subprocess.Popen')
-    def test_run_raises_error(self, mock_popen, mock_which):
-        mock_which.return_value = 'command'
-        mock_process = Mock()
-        mock_process.communicate = Mock(return_value=[str.encode('stdout'), str.encode('stderr')])
-        mock_process.returncode = 1
-        mock_popen.return_value = mock_process
+    def setup_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
+    def teardown_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
+    def test_run_raises_error(self, mock_which):
+        mock_which.return_value = 'bash'
         with raises(DistMigrationCommandException):
-            Command.run(['command', 'args'])
+            Command.run(['bash', '-c', 'echo stdout; echo stderr >&2; exit 1'])
 
     @patch('subprocess.Popen')
     def test_run_failure(self, mock_popen, mock_which):
@@ -36,21 +43,45 @@ class TestCommand(object):
         with raises(DistMigrationCommandNotFoundException):
             Command.run(['command', 'args'], {'HOME': '/root'})
 
-    @patch('subprocess.Popen')
-    def test_run_does_not_raise_error(self, mock_popen, mock_which):
-        mock_which.return_value = 'command'
-        mock_process = Mock()
-        mock_process.communicate = Mock(return_value=[str.encode('stdout'), str.encode('')])
-        mock_process.returncode = 1
-        mock_popen.return_value = mock_process
-        result = Command.run(['command', 'args'], os.environ, False)
+    def test_run_does_not_raise_error(self, mock_which):
+        mock_which.return_value = 'bash'
+        result = Command.run(['bash', '-c', 'printf stdout; exit 1'], os.environ, False)
         assert result.error == '(no output on stderr)'
         assert result.output == 'stdout'
-        mock_process.communicate = Mock(return_value=[str.encode(''), str.encode('stderr')])
-        result = Command.run(['command', 'args'], os.environ, False)
+        result = Command.run(['bash', '-c', 'printf stderr >&2; exit 1'], os.environ, False)
         assert result.error == 'stderr'
         assert result.output == '(no output on stdout)'
 
+    def test_run_killed_by_signal(self, mock_which):
+        mock_which.return_value = 'bash'
+        result = Command.run(['bash', '-c', 'kill -TERM $$'], raise_on_error=False)
+        assert result.returncode == -15
+
+    @patch('suse_migration_services.command.CommandCache')
+    @patch('subprocess.Popen')
+    def test_run_cached(self, mock_popen, mock_CommandCache, mock_which):
+        mock_which.return_value = 'bash'
+        mock_CommandCache.get.return_value = ('output', '', 0)
+        result = Command.run(['lsblk'], cache=True)
+        assert result.output == 'output'
+        assert not mock_popen.called
+        mock_CommandCache.get.return_value = None
+        mock_CommandCache.is_mutating.return_value = False
+        mock_popen.side_effect = Popen
+        result = Command.run(['bash', '-c', 'printf stdout'], cache=True)
+        assert result.output == 'stdout'
+        mock_CommandCache.store.assert_called_once_with(
+            ['bash', '-c', 'printf stdout'], 'stdout', '', 0
+        )
+
+    @patch('suse_migration_services.command.CommandCache')
+    def test_run_mutating(self, mock_CommandCache, mock_which):
+        mock_which.return_value = 'bash'
+        mock_CommandCache.is_mutating.return_value = True
+        Command.run(['bash', '-c', 'true'])
+        mock_CommandCache.invalidate.assert_called_once_with()
+        assert not mock_CommandCache.store.called
+
     def test_run_does_not_raise_error_if_command_not_found(self, mock_which):
         mock_which.return_value = None
         result = Command.run(['command', 'args'], os.environ, False)
@@ -58,16 +89,273 @@ class TestCommand(object):
         assert result.output is None
         assert result.returncode == -1
 
-    @patch('os.access')
-    @patch('os.path.exists')
     @patch('subprocess.Popen')
-    def test_run(self, mock_popen, mock_exists, mock_access, mock_which):
-        mock_exists.return_value = True
+    def test_run(self, mock_popen, mock_which):
+        mock_which.return_value = '/bin/bash'
+        mock_popen.side_effect = Popen
         command_run = namedtuple('command', ['output', 'error', 'returncode'])
         run_result = command_run(output='stdout', error='stderr', returncode=0)
-        mock_process = Mock()
-        mock_process.communicate = Mock(return_value=[str.encode('stdout'), str.encode('stderr')])
-        mock_process.returncode = 0
-        mock_popen.return_value = mock_process
-        mock_access.return_value = True
-        assert Command.run(['command', 'args']) == run_result
+        assert Command.run(['bash', '-c', 'printf stdout; printf stderr >&2']) == run_result
+        assert mock_popen.call_args.kwargs['executable'] == '/bin/bash'
+
+    @patch('suse_migration_services.command.CommandTrace.record')
+    def test_run_trace(self, mock_record, mock_which):
+        mock_which.return_value = 'bash'
+        Command.run(['bash', '-c', 'exit 2'], raise_on_error=False)
+        command, start_time, wall_time, returncode, rusage, io_counters = mock_record.call_args.args
+        assert command == ['bash', '-c', 'exit 2']
+        assert start_time > 0
+        assert wall_time >= 0
+        assert returncode == 2
+        assert rusage.ru_maxrss > 0
+        assert 'write_bytes' in io_counters
+        Command.run_stream(['bash', '-c', 'true'])
+        assert mock_record.call_args.args[3] == 0
+        assert mock_record.call_args.args[4].ru_maxrss > 0
+
+    def test_run_timeout(self, mock_which):
+        mock_which.return_value = 'bash'
+        start = time.monotonic()
+        with raises(DistMigrationCommandException) as issue:
+            # the background sleep holds the pipes open, it is
+            # stopped along with the rest of the process group
+            Command.run(['bash', '-c', 'sleep 10 & wait'], raise_on_error=False, timeout=0.2)
+        assert format(issue.value).startswith('bash: timed out after 0.')
+        assert time.monotonic() - start < 5
+
+    @patch.object(CommandDeadline, 'get_grace_time')
+    def test_run_timeout_ignoring_sigterm(self, mock_get_grace_time, mock_which):
+        mock_which.return_value = 'bash'
+        mock_get_grace_time.return_value = 0.2
+        with raises(DistMigrationCommandException) as issue:
+            Command.run(['bash', '-c', 'trap "" TERM; sleep 10'], timeout=0.2)
+        assert 'timed out' in format(issue.value)
+
+    def test_run_with_timeout(self, mock_which):
+        mock_which.return_value = 'bash'
+        assert Command.run(['bash', '-c', 'printf done'], timeout=10).output == 'done'
+
+    def test_run_many(self, mock_which):
+        mock_which.return_value = 'bash'
+        results = Command.run_many(
+            [
+                ['bash', '-c', 'sleep 0.2; echo 1'],
+                ['bash', '-c', 'echo 2'],
+                ['bash', '-c', 'exit 1'],
+            ],
+            raise_on_error=False,
+            max_workers=2,
+        )
+        assert [result.output for result in results] == ['1\n', '2\n', '(no output on stdout)']
+        assert [result.returncode for result in results] == [0, 0, 1]
+        assert Command.run_many([]) == []
+
+    def test_run_many_raises_error(self, mock_which):
+        mock_which.return_value = 'bash'
+        with raises(DistMigrationCommandException) as issue:
+            Command.run_many(
+                [['bash', '-c', 'exit 1'], ['bash', '-c', 'true'], ['bash', '-c', 'exit 2']]
+            )
+        assert format(issue.value).startswith(
+            "2 of 3 commands failed: ['bash', '-c', 'exit 1']: bash: stderr:"
+        )
+        assert "['bash', '-c', 'exit 2']: bash: stderr:" in format(issue.value)
+
+    def test_run_many_timeout(self, mock_which):
+        mock_which.return_value = 'bash'
+        with raises(DistMigrationCommandException) as issue:
+            Command.run_many(
+                [['bash', '-c', 'sleep 10'], ['bash', '-c', 'true']],
+                raise_on_error=False,
+                timeout=0.2,
+            )
+        assert format(issue.value) == (
+            "1 of 2 commands failed: ['bash', '-c', 'sleep 10']: bash: timed out after 0.2 seconds"
+        )
+
+    @patch.object(Command, '_can_run_async')
+    def test_run_many_threaded(self, mock_can_run_async, mock_which):
+        mock_which.return_value = 'bash'
+        mock_can_run_async.return_value = False
+        results = Command.run_many(
+            [['bash', '-c', 'echo 1'], ['bash', '-c', 'exit 1']], raise_on_error=False
+        )
+        assert [result.returncode for result in results] == [0, 1]
+        with raises(DistMigrationCommandException) as issue:
+            Command.run_many([['bash', '-c', 'true'], ['bash', '-c', 'exit 2']])
+        assert format(issue.value).startswith(
+            "1 of 2 commands failed: ['bash', '-c', 'exit 2']: bash: stderr:"
+        )
+
+    def test_can_run_async(self, mock_which):
+        results = []
+
+        def can_run_async():
+            results.append(Command._can_run_async())
+
+        with patch.object(sys, 'version_info', (3, 6, 15)):
+            can_run_async()
+            thread = threading.Thread(target=can_run_async)
+            thread.start()
+            thread.join()
+        thread = threading.Thread(target=can_run_async)
+        thread.start()
+        thread.join()
+        assert results == [True, False, True]
+
+    def test_run_async(self, mock_which):
+        mock_which.return_value = 'bash'
+        lines = []
+
+        async def run_probes():
+            return await asyncio.gather(
+                Command.run_async(
+                    ['bash', '-c', 'echo stdout-1; printf stderr >&2; printf stdout-2'],
+                    line_callback=lines.append,
+                ),
+                Command.run_async(
+                    ['bash', '-c', 'printf stderr >&2; exit 1'], raise_on_error=False
+                ),
+                Command.run_async(['bash', '-c', 'exit 1'], raise_on_error=False),
+            )
+
+        first, second, third = asyncio.run(run_probes())
+        assert first.output == 'stdout-1\nstdout-2'
+        assert first.error == 'stderr'
+        assert first.returncode == 0
+        assert lines == ['stdout-1', 'stdout-2']
+        assert second.output == '(no output on stdout)'
+        assert second.error == 'stderr'
+        assert second.returncode == 1
+        assert third.error == '(no output on stderr)'
+
+    def test_run_async_raises_error(self, mock_which):
+        mock_which.return_value = 'bash'
+        with raises(DistMigrationCommandException) as issue:
+            asyncio.run(Command.run_async(['bash', '-c', 'echo stdout; exit 1']))
+        assert format(issue.value) == 'bash: stderr: (no output on stderr), stdout: stdout\n'
+
+    def test_run_async_timeout(self, mock_which):
+        mock_which.return_value = 'bash'
+        with raises(DistMigrationCommandException) as issue:
+            asyncio.run(
+                Command.run_async(['bash', '-c', 'sleep 10'], raise_on_error=False, timeout=0.2)
+            )
+        assert format(issue.value) == 'bash: timed out after 0.2 seconds'
+
+    @patch.object(CommandDeadline, 'get_grace_time')
+    def test_run_async_timeout_ignoring_sigterm(self, mock_get_grace_time, mock_which):
+        mock_which.return_value = 'bash'
+        mock_get_grace_time.return_value = 0.2
+        with raises(DistMigrationCommandException) as issue:
+            asyncio.run(Command.run_async(['bash', '-c', 'trap "" TERM; sleep 10'], timeout=0.2))
+        assert 'timed out' in format(issue.value)
+
+    def test_run_async_command_not_found(self, mock_which):
+        mock_which.return_value = None
+        result = asyncio.run(Command.run_async(['command', 'args'], raise_on_error=False))
+        assert result.output is None
+        assert result.returncode == -1
+        with raises(DistMigrationCommandNotFoundException):
+            asyncio.run(Command.run_async(['command', 'args']))
+
+    @patch('asyncio.create_subprocess_exec')
+    def test_run_async_failure(self, mock_create_subprocess_exec, mock_which):
+        mock_which.return_value = 'command'
+        mock_create_subprocess_exec.side_effect = OSError('exec failed')
+        with raises(DistMigrationCommandException) as issue:
+            asyncio.run(Command.run_async(['command', 'args']))
+        assert format(issue.value) == 'command: OSError: exec failed'
+
+    @patch('suse_migration_services.command.CommandCache')
+    def test_run_async_mutating(self, mock_CommandCache, mock_which):
+        mock_which.return_value = 'bash'
+        mock_CommandCache.is_mutating.return_value = True
+        asyncio.run(Command.run_async(['bash', '-c', 'true']))
+        mock_CommandCache.invalidate.assert_called_once_with()
+
+    def test_run_stream(self, mock_which):
+        mock_which.return_value = 'bash'
+        lines = []
+        result = Command.run_stream(
+            ['bash', '-c', 'echo stdout-1; echo stderr >&2; printf stdout-2'],
+            line_callback=lines.append,
+        )
+        assert lines == ['stdout-1', 'stdout-2']
+        assert result.output == 'stdout-1\nstdout-2'
+        assert result.error == 'stderr'
+        assert result.returncode == 0
+
+    @patch('suse_migration_services.command.CommandCache')
+    def test_run_stream_mutating(self, mock_CommandCache, mock_which):
+        mock_which.return_value = 'bash'
+        mock_CommandCache.is_mutating.return_value = True
+        Command.run_stream(['bash', '-c', 'true'])
+        mock_CommandCache.invalidate.assert_called_once_with()
+
+    def test_run_stream_merge_stderr(self, mock_which):
+        mock_which.return_value = 'bash'
+        lines = []
+        result = Command.run_stream(
+            ['bash', '-c', 'echo stdout; echo stderr >&2'],
+            line_callback=lines.append,
+            merge_stderr=True,
+        )
+        assert lines == ['stdout', 'stderr']
+        assert result.error == ''
+
+    def test_run_stream_raises_error(self, mock_which):
+        mock_which.return_value = 'bash'
+        with raises(DistMigrationCommandException):
+            Command.run_stream(['bash', '-c', 'echo stdout; exit 1'])
+
+    def test_run_stream_does_not_raise_error(self, mock_which):
+        mock_which.return_value = 'bash'
+        result = Command.run_stream(['bash', '-c', 'exit 1'], raise_on_error=False)
+        assert result.output == '(no output on stdout)'
+        assert result.error == '(no output on stderr)'
+        assert result.returncode == 1
+
+    def test_run_stream_does_not_raise_error_if_command_not_found(self, mock_which):
+        mock_which.return_value = None
+        result = Command.run_stream(['command', 'args'], raise_on_error=False)
+        assert result.output is None
+        assert result.returncode == -1
+
+    def test_run_stream_line_callback_raises(self, mock_which):
+        mock_which.return_value = 'bash'
+        line_callback = Mock(side_effect=ValueError)
+        with raises(ValueError):
+            Command.run_stream(['bash', '-c', 'echo stdout; sleep 60'], line_callback=line_callback)
+        with raises(ValueError):
+            Command.run_stream(
+                ['bash', '-c', 'echo stdout; sleep 60'], line_callback=line_callback, timeout=60
+            )
+
+    def test_run_stream_timeout(self, mock_which):
+        mock_which.return_value = 'bash'
+        lines = []
+        with raises(DistMigrationCommandException) as issue:
+            Command.run_stream(
+                ['bash', '-c', 'echo stdout; sleep 10'], line_callback=lines.append, timeout=0.2
+            )
+        assert format(issue.value).startswith('bash: timed out after 0.')
+        assert lines == ['stdout']
+
+    @patch('subprocess.Popen')
+    def test_run_stream_failure(self, mock_popen, mock_which):
+        mock_which.return_value = 'command'
+        mock_popen.side_effect = OSError('Run failure')
+        with raises(DistMigrationCommandException):
+            Command.run_stream(['command', 'args'])
+
+
+class TestCommandOutputBuffer:
+    def test_get_text(self):
+        output = CommandOutputBuffer(head_lines=2, tail_lines=2)
+        for line in ['1', '2']:
+            output.append(line)
+        assert output.get_text() == '1\n2'
+        for line in ['3', '4', '5', '6']:
+            output.append(line)
+        assert output.get_text() == '1\n2\n[... 2 lines omitted ...]\n5\n6'
@@ -0,0 +1,106 @@
+import os
+import json
+import logging
+from unittest.mock import patch
+from collections import namedtuple
+
+from suse_migration_services.command_trace import CommandTrace
+
+rusage_type = namedtuple('rusage', ['ru_utime', 'ru_stime', 'ru_maxrss'])
+
+
+class TestCommandTrace(object):
+    def setup_method(self, cls):
+        self.trace = '../data/command-trace.jsonl'
+
+    @patch('sys.argv', ['/usr/bin/suse-migration-prepare'])
+    @patch.object(CommandTrace, 'get_trace_file')
+    def test_record(self, mock_get_trace_file, tmp_path):
+        trace_file = format(tmp_path / 'distro_migration.trace.jsonl')
+        mock_get_trace_file.return_value = trace_file
+        CommandTrace.record(
+            ['lsblk'],
+            100.0,
+            0.5,
+            0,
+            rusage_type(ru_utime=0.1234, ru_stime=0.2, ru_maxrss=4096),
+            {'read_bytes': 1, 'write_bytes': 2},
+        )
+        CommandTrace.record(['chroot', '/system-root', 'true'], 101.0, 0.1, 1)
+        with open(trace_file) as trace:
+            records = [json.loads(line) for line in trace]
+        assert records == [
+            {
+                'unit': 'suse-migration-prepare',
+                'command': ['lsblk'],
+                'start': 100.0,
+                'wall': 0.5,
+                'user': 0.123,
+                'sys': 0.2,
+                'max_rss_kb': 4096,
+                'read_bytes': 1,
+                'write_bytes': 2,
+                'returncode': 0,
+            },
+            {
+                'unit': 'suse-migration-prepare',
+                'command': ['chroot', '/system-root', 'true'],
+                'start': 101.0,
+                'wall': 0.1,
+                'user': None,
+                'sys': None,
+                'max_rss_kb': None,
+                'read_bytes': None,
+                'write_bytes': None,
+                'returncode': 1,
+            },
+        ]
+
+    @patch.object(CommandTrace, 'get_trace_file')
+    def test_record_no_trace(self, mock_get_trace_file, tmp_path):
+        mock_get_trace_file.return_value = None
+        CommandTrace.record(['lsblk'], 100.0, 0.5, 0)
+        mock_get_trace_file.return_value = format(tmp_path / 'missing' / 'trace.jsonl')
+        CommandTrace.record(['lsblk'], 100.0, 0.5, 0)
+        assert not os.path.exists(tmp_path / 'missing')
+
+    def test_read_io_counters(self):
+        assert 'write_bytes' in CommandTrace.read_io_counters(os.getpid())
+        assert CommandTrace.read_io_counters(-1) == {}
+
+    def test_get_trace_file(self, tmp_path):
+        logger = logging.getLogger('suse-migration')
+        assert CommandTrace.get_trace_file() is None
+        file_handler = logging.FileHandler(format(tmp_path / 'distro_migration.log'))
+        logger.addHandler(file_handler)
+        try:
+            assert CommandTrace.get_trace_file() == format(
+                tmp_path / 'distro_migration.trace.jsonl'
+            )
+        finally:
+            logger.removeHandler(file_handler)
+            file_handler.close()
+
+    def test_summarize(self):
+        assert CommandTrace.summarize(self.trace, top=2) == os.linesep.join(
+            [
+                'suse-migration: 3 commands in 1810.5s',
+                '  slowest:',
+                '    1800.0s (user 900.5s, sys 120.2s) zypper --non-interactive migration',
+                '    10.0s (user n/a, sys n/a) chroot /system-root rpm -q wicked',
+                '  heaviest:',
+                '    512000 KiB max RSS, 1024 bytes read, 4096000 bytes written'
+                ' zypper --non-interactive migration',
+                '    2048 KiB max RSS, 0 bytes read, 0 bytes written lsblk -p',
+                'suse-migration-prepare: 1 commands in 0.2s',
+                '  slowest:',
+                '    0.2s (user 0.1s, sys 0.0s) ip a',
+                '  heaviest:',
+                '    1024 KiB max RSS, 0 bytes read, 0 bytes written ip a',
+            ]
+        )
+
+    def test_summarize_no_trace(self):
+        with patch.object(CommandTrace, 'get_trace_file', return_value=None):
+            assert CommandTrace.summarize() == ''
+        assert CommandTrace.summarize('../data/no-such-trace.jsonl') == ''
@@ -0,0 +1,85 @@
+import os
+from unittest.mock import patch
+
+from suse_migration_services.device_aliases import DeviceAliases
+
+
+class TestDeviceAliases:
+    def setup_method(self, cls):
+        DeviceAliases.refresh()
+
+    def teardown_method(self, cls):
+        DeviceAliases.refresh()
+
+    def _create_aliases(self, tmp_path):
+        (tmp_path / 'sda').touch()
+        (tmp_path / 'sda1').touch()
+        disk_dir = tmp_path / 'disk'
+        for alias_type, name, node in [
+            ('by-uuid', 'bd604632', 'sda1'),
+            ('by-label', 'ROOT', 'sda1'),
+            ('by-id', 'wwn-0x5000-part1', 'sda1'),
+            ('by-id', 'ata-DISK-part1', 'sda1'),
+            ('by-id', 'ata-DISK', 'sda'),
+            ('by-path', 'pci-0000:00:1f.2-ata-1', 'sda'),
+        ]:
+            (disk_dir / alias_type).mkdir(parents=True, exist_ok=True)
+            os.symlink(os.path.join('..', '..', node), disk_dir / alias_type / name)
+        (disk_dir / 'by-id' / 'not-a-link').touch()
+        return format(disk_dir)
+
+    def test_lookup(self, tmp_path):
+        disk_dir = self._create_aliases(tmp_path)
+        node = format(tmp_path / 'sda1')
+        with patch.object(DeviceAliases, 'disk_dir', disk_dir):
+            assert DeviceAliases.get_node(disk_dir + '/by-uuid/bd604632') == node
+            assert DeviceAliases.get_node(disk_dir + '/by-uuid/unknown') is None
+            assert DeviceAliases.get_aliases(node) == [
+                disk_dir + '/by-id/ata-DISK-part1',
+                disk_dir + '/by-id/wwn-0x5000-part1',
+                disk_dir + '/by-label/ROOT',
+                disk_dir + '/by-uuid/bd604632',
+            ]
+            assert DeviceAliases.get_aliases(node, 'by-id') == [
+                disk_dir + '/by-id/ata-DISK-part1',
+                disk_dir + '/by-id/wwn-0x5000-part1',
+            ]
+            assert DeviceAliases.get_aliases(format(tmp_path / 'sdb')) == []
+            with patch('os.scandir') as mock_os_scandir:
+                DeviceAliases.get_aliases(node)
+                assert not mock_os_scandir.called
+
+    def test_get_aliases_resolves_node(self, tmp_path):
+        disk_dir = self._create_aliases(tmp_path)
+        (tmp_path / 'mapper').mkdir()
+        os.symlink('../sda', tmp_path / 'mapper' / 'disk')
+        with patch.object(DeviceAliases, 'disk_dir', disk_dir):
+            assert DeviceAliases.get_aliases(format(tmp_path / 'mapper' / 'disk'), 'by-id') == [
+                disk_dir + '/by-id/ata-DISK'
+            ]
+
+    def test_exists(self, tmp_path):
+        disk_dir = self._create_aliases(tmp_path)
+        with patch.object(DeviceAliases, 'disk_dir', disk_dir):
+            with patch('os.path.exists') as mock_os_path_exists:
+                mock_os_path_exists.return_value = False
+                assert DeviceAliases.exists(disk_dir + '/by-label/ROOT')
+                assert DeviceAliases.exists(format(tmp_path / 'sda'))
+                assert not mock_os_path_exists.called
+                assert not DeviceAliases.exists(disk_dir + '/by-label/DATA')
+                mock_os_path_exists.assert_called_once_with(disk_dir + '/by-label/DATA')
+
+    def test_refresh(self, tmp_path):
+        disk_dir = self._create_aliases(tmp_path)
+        alias = disk_dir + '/by-uuid/7f3e'
+        with patch.object(DeviceAliases, 'disk_dir', disk_dir):
+            assert DeviceAliases.get_node(alias) is None
+            os.symlink('../../sda', alias)
+            assert DeviceAliases.get_node(alias) is None
+            DeviceAliases.refresh()
+            assert DeviceAliases.get_node(alias) == format(tmp_path / 'sda')
+
+    def test_no_alias_dirs(self, tmp_path):
+        with patch.object(DeviceAliases, 'disk_dir', format(tmp_path / 'disk')):
+            assert DeviceAliases.get_aliases('/dev/sda') == []
+            assert DeviceAliases.get_node('/dev/disk/by-id/ata-DISK') is None
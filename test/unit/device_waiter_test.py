@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from suse_migration_services.device_waiter import DeviceWaiter
+
+
+class TestDeviceWaiter:
+    def setup_method(self, cls):
+        DeviceWaiter._syscalls.clear()
+
+    def teardown_method(self, cls):
+        DeviceWaiter._syscalls.clear()
+
+    def _create_later(self, path, delay=0.1):
+        def create():
+            time.sleep(delay)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w'):
+                pass
+
+        creator = threading.Thread(target=create)
+        creator.start()
+        return creator
+
+    def test_wait(self, tmp_path):
+        (tmp_path / 'sda1').touch()
+        late_device = format(tmp_path / 'disk' / 'by-uuid' / 'ID')
+        creator = self._create_later(late_device)
+        start_time = time.monotonic()
+        devices = list(
+            DeviceWaiter.wait(
+                [late_device, format(tmp_path / 'sda1'), format(tmp_path / 'sda1')], 10
+            )
+        )
+        creator.join()
+        assert devices == [format(tmp_path / 'sda1'), late_device]
+        # the device is provided once it appeared, not at the deadline
+        assert time.monotonic() - start_time < 5
+
+    def test_wait_timeout(self, tmp_path):
+        start_time = time.monotonic()
+        assert list(DeviceWaiter.wait([format(tmp_path / 'sdb')], 0.2)) == []
+        assert 0.2 <= time.monotonic() - start_time < 5
+        assert list(DeviceWaiter.wait([], 10)) == []
+
+    @patch('ctypes.CDLL')
+    def test_wait_without_inotify(self, mock_CDLL, tmp_path):
+        mock_CDLL.side_effect = OSError('no libc')
+        late_device = format(tmp_path / 'sdc')
+        creator = self._create_later(late_device)
+        with patch.object(DeviceWaiter, 'poll_interval', 0.05):
+            assert list(DeviceWaiter.wait([late_device], 10)) == [late_device]
+            assert list(DeviceWaiter.wait([format(tmp_path / 'sdd')], 0.1)) == []
+        creator.join()
+        mock_CDLL.assert_called_once_with(None, use_errno=True)
+
+    def test_inotify_init_failed(self):
+        DeviceWaiter._inotify_init()
+        with patch.dict(DeviceWaiter._syscalls, inotify_init1=lambda flags: -1):
+            assert DeviceWaiter._inotify_init() is None
+
+    def test_get_watch_dir(self, tmp_path):
+        assert DeviceWaiter._get_watch_dir(format(tmp_path / 'a' / 'b' / 'c')) == format(tmp_path)
+        assert DeviceWaiter._get_watch_dir('/dev/sda') == '/dev'
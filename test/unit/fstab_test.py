@@ -28,6 +28,16 @@ class TestFstab(object):
         with self._caplog.at_level(logging.WARNING):
             fstab.read('../data/fstab')
             assert 'Device path /dev/mynode not found and skipped' in self._caplog.text
+        assert fstab.get_missing_entries() == [
+            fstab.fstab_entry_type(
+                fstype='ext4',
+                mountpoint='/foo',
+                device='/dev/mynode',
+                options='defaults',
+                eligible_for_mount=True,
+            )
+        ]
+        assert self.fstab.get_missing_entries() == []
         assert fstab.get_devices() == [
             self.fstab.fstab_entry_type(
                 fstype='ext4',
@@ -112,6 +122,94 @@ class TestFstab(object):
             ),
         ]
 
+    def test_get_mount_levels(self):
+        assert [
+            [entry.mountpoint for entry in mount_level]
+            for mount_level in self.fstab.get_mount_levels()
+        ] == [['/'], ['/bar', '/foo', '/home', '/boot/efi'], ['/home/stack']]
+
+    def test_get_mount_levels_without_root(self):
+        fstab = Fstab()
+        for mountpoint in [
+            '/var/lib/docker',
+            '/srv/',
+            '/var',
+            '/usr/local',
+            '/var/lib/docker/btrfs',
+        ]:
+            fstab.add_entry('/dev/sda1', mountpoint)
+        assert [
+            [entry.mountpoint for entry in mount_level] for mount_level in fstab.get_mount_levels()
+        ] == [['/srv/', '/var', '/usr/local'], ['/var/lib/docker'], ['/var/lib/docker/btrfs']]
+
+    def test_get_devices_trailing_slash(self):
+        fstab = Fstab()
+        for mountpoint in ['/a/-x', '/a/', '/a//b/./c', '/a']:
+            fstab.add_entry('/dev/sda1', mountpoint)
+        fstab.add_entry('/dev/sda2', '/a/-x/')
+        assert [(entry.device, entry.mountpoint) for entry in fstab.get_devices()] == [
+            ('/dev/sda1', '/a'),
+            ('/dev/sda2', '/a/-x/'),
+            ('/dev/sda1', '/a//b/./c'),
+        ]
+
+    def test_get_umount_order(self):
+        assert [entry.mountpoint for entry in self.fstab.get_umount_order()] == [
+            '/home/stack',
+            '/boot/efi',
+            '/home',
+            '/foo',
+            '/bar',
+            '/',
+        ]
+
+    def test_get_parent(self):
+        assert self.fstab.get_parent('/home/stack').mountpoint == '/home'
+        assert self.fstab.get_parent('/home/stack/data/x').mountpoint == '/home/stack'
+        assert self.fstab.get_parent('/boot/efi').mountpoint == '/'
+        assert self.fstab.get_parent('/usr/lib').mountpoint == '/'
+        assert self.fstab.get_parent('/') is None
+        assert Fstab().get_parent('/home') is None
+
+    def test_get_children(self):
+        assert [entry.mountpoint for entry in self.fstab.get_children('/')] == [
+            '/bar',
+            '/foo',
+            '/home',
+            '/boot/efi',
+        ]
+        assert [entry.mountpoint for entry in self.fstab.get_children('/home/')] == ['/home/stack']
+        assert [entry.mountpoint for entry in self.fstab.get_children('/boot')] == ['/boot/efi']
+        assert self.fstab.get_children('/home/stack') == []
+        assert self.fstab.get_children('/usr') == []
+
+    def test_canonical_mount_list_cached(self):
+        fstab = Fstab()
+        fstab.add_entry('/dev/sda2', '/home')
+        devices = fstab.get_devices()
+        devices.append(None)
+        assert fstab._get_canonical_mount_list() is fstab._get_canonical_mount_list()
+        assert len(fstab.get_devices()) == 1
+        fstab.add_entry('/dev/sda1', '/')
+        assert [entry.mountpoint for entry in fstab.get_devices()] == ['/', '/home']
+
+    def test_large_fstab(self):
+        fstab = Fstab()
+        mountpoints = ['/srv/{0}/{1}'.format(index % 50, index) for index in range(5000)]
+        for mountpoint in reversed(mountpoints):
+            fstab.add_entry('/dev/sda1', mountpoint)
+        for index in range(50):
+            fstab.add_entry('/dev/sda1', '/srv/{0}'.format(index))
+        fstab.add_entry('/dev/sda1', '/')
+        mount_levels = fstab.get_mount_levels()
+        assert [len(mount_level) for mount_level in mount_levels] == [1, 50, 5000]
+        seen = set()
+        for entry in fstab.get_devices():
+            parent = fstab.get_parent(entry.mountpoint)
+            assert parent is None or parent.mountpoint in seen
+            seen.add(entry.mountpoint)
+        assert len(fstab.get_children('/srv/7')) == 100
+
     def test_add_entry(self):
         fstab = Fstab()
         fstab.add_entry('/dev/sda', '/foo')
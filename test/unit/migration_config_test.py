@@ -4,6 +4,7 @@ import io
 from copy import deepcopy
 from collections import namedtuple
 
+from suse_migration_services.command_deadline import CommandDeadline
 from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.suse_product import SUSEBaseProduct
 from suse_migration_services.defaults import Defaults
@@ -141,6 +142,34 @@ class TestMigrationConfig(object):
         assert self.config.get_migration_product() == 'SLES/15.3/x86_64'
         assert self.config.is_debug_requested() is True
 
+    def test_update_migration_config_file_reloads_timeouts(self, tmp_path):
+        config_file = tmp_path / 'migration-config.yml'
+        config_file.write_text('timeouts:\n  programs:\n    zypper: 3600\n')
+        custom_config_file = tmp_path / 'sle-migration-service.yml'
+        custom_config_file.write_text(
+            'timeouts:\n  devices: 90\n  programs:\n    zypper: 7200\n    rpm: 60\n'
+        )
+        CommandDeadline._timeouts.clear()
+        try:
+            with patch.object(
+                Defaults, 'get_migration_config_file', return_value=format(config_file)
+            ), patch.object(
+                Defaults,
+                'get_system_migration_custom_config_file',
+                return_value=format(custom_config_file),
+            ):
+                config = MigrationConfig()
+                # commands called before the config update, e.g lsblk
+                # of the LVM activation, read the image config limits
+                assert CommandDeadline.get_timeout(['zypper', 'dup']) == 3600
+                assert CommandDeadline.get_device_timeout() == 30
+                config.update_migration_config_file()
+                assert CommandDeadline.get_timeout(['zypper', 'dup']) == 7200
+                assert CommandDeadline.get_timeout(['rpm', '-qa']) == 60
+                assert CommandDeadline.get_device_timeout() == 90
+        finally:
+            CommandDeadline._timeouts.clear()
+
     def test_is_zypper_migration_plugin_requested(self):
         assert self.config.is_zypper_migration_plugin_requested() is True
 
@@ -153,6 +182,49 @@ class TestMigrationConfig(object):
     def test_is_pre_checks_fix_requested(self):
         assert self.config.is_pre_checks_fix_requested() is True
 
+    def test_is_progress_report_requested(self):
+        assert self.config.is_progress_report_requested() is False
+
+    @patch.object(Defaults, 'get_migration_config_file')
+    def test_get_timeouts(self, mock_get_migration_config_file):
+        assert self.config.get_timeouts() == {}
+        mock_get_migration_config_file.return_value = '../data/migration-config-timeouts.yml'
+        config = MigrationConfig()
+        assert config.get_timeouts() == {
+            'command': 3600,
+            'unit': 14400,
+            'programs': {'nm-online': 120},
+        }
+
+    @patch.object(Defaults, 'get_migration_config_file')
+    def test_get_mount_option_overlay(self, mock_get_migration_config_file):
+        assert self.config.get_mount_option_overlay() == {}
+        mock_get_migration_config_file.return_value = '../data/migration-config-performance.yml'
+        config = MigrationConfig()
+        assert config.get_mount_option_overlay() == {
+            'ext4': 'noatime,lazytime,commit=60',
+            'xfs': 'noatime',
+            'btrfs': 'noatime,lazytime,commit=60',
+            'vfat': '',
+        }
+
+    @patch.object(MigrationConfig, '_write_config_file')
+    @patch.object(Defaults, 'get_system_migration_custom_config_file')
+    @patch.object(Defaults, 'get_migration_config_file')
+    def test_get_mount_option_overlay_merged(
+        self, mock_get_migration_config_file, mock_get_custom_config_file, mock_write_config_file
+    ):
+        mock_get_migration_config_file.return_value = '../data/migration-config-performance.yml'
+        mock_get_custom_config_file.return_value = '../data/custom-migration-config-performance.yml'
+        config = MigrationConfig()
+        config.update_migration_config_file()
+        assert config.get_mount_option_overlay() == {
+            'ext4': 'noatime,lazytime,commit=120',
+            'xfs': 'noatime',
+            'btrfs': 'noatime,lazytime,commit=60',
+            'vfat': '',
+        }
+
     @patch('yaml.dump')
     def test_write_config_file(self, mock_yaml_dump):
         with patch('builtins.open', create=True) as mock_open:
@@ -393,6 +465,19 @@ class TestMigrationConfig(object):
             'key5': 'dictB.key5',
         }
 
+        # sections nested three levels deep e.g timeouts.programs
+        nested = {'timeouts': {'unit': 600, 'programs': {'zypper': 3600, 'rpm': 60}}}
+        MigrationConfig._merge_config_dicts(
+            nested, {'timeouts': {'devices': 60, 'programs': {'zypper': 7200, 'lsblk': 10}}}
+        )
+        assert nested == {
+            'timeouts': {
+                'unit': 600,
+                'devices': 60,
+                'programs': {'zypper': 7200, 'rpm': 60, 'lsblk': 10},
+            }
+        }
+
         many_recursions = {'foo': {'bar': {'foo': {'bar': 'foo'}}}}
         many_recursions_copy = deepcopy(many_recursions)
 
@@ -0,0 +1,255 @@
+import errno
+import os
+from unittest.mock import patch, call, Mock
+from pytest import raises
+
+from suse_migration_services.mount_backend import (
+    MountBackend,
+    MS_BIND,
+    MS_NOATIME,
+    MS_NOSUID,
+    MS_RDONLY,
+    MS_REMOUNT,
+    MNT_DETACH,
+)
+from suse_migration_services.exceptions import DistMigrationCommandException
+
+
+class TestMountBackend:
+    def setup_method(self, cls):
+        MountBackend._syscalls.clear()
+        self.syscalls = {'mount': Mock(return_value=0), 'umount2': Mock(return_value=0)}
+
+    def teardown_method(self, cls):
+        MountBackend._syscalls.clear()
+
+    def test_get_syscalls(self):
+        syscalls = MountBackend._get_syscalls()
+        assert sorted(syscalls) == ['mount', 'umount2']
+        assert MountBackend._get_syscalls() is syscalls
+
+    @patch('ctypes.CDLL')
+    def test_get_syscalls_not_available(self, mock_CDLL):
+        mock_CDLL.side_effect = OSError('no libc')
+        assert MountBackend._get_syscalls() == {}
+        assert MountBackend._get_syscalls() == {}
+        mock_CDLL.assert_called_once_with(None, use_errno=True)
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('os.path.exists')
+    def test_mount(self, mock_os_path_exists, mock_invalidate):
+        mock_os_path_exists.return_value = False
+        MountBackend._syscalls.update(self.syscalls)
+        MountBackend.mount(
+            '/dev/sda1', '/system-root/home', 'ext4', 'defaults,noatime,ro,data=ordered'
+        )
+        self.syscalls['mount'].assert_called_once_with(
+            b'/dev/sda1', b'/system-root/home', b'ext4', MS_NOATIME | MS_RDONLY, b'data=ordered'
+        )
+        mock_invalidate.assert_called_once_with()
+        MountBackend.mount('proc', '/system-root/proc', 'proc')
+        assert self.syscalls['mount'].call_args == call(
+            b'proc', b'/system-root/proc', b'proc', 0, None
+        )
+        assert mock_os_path_exists.call_args_list[-2:] == [
+            call('/sbin/mount.proc'),
+            call('/usr/sbin/mount.proc'),
+        ]
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('ctypes.get_errno')
+    @patch('os.path.exists')
+    def test_mount_raises(self, mock_os_path_exists, mock_get_errno, mock_invalidate):
+        mock_os_path_exists.return_value = False
+        mock_get_errno.return_value = errno.ENOENT
+        self.syscalls['mount'].return_value = -1
+        MountBackend._syscalls.update(self.syscalls)
+        with raises(DistMigrationCommandException) as issue:
+            MountBackend.mount('/dev/sda1', '/system-root/home', 'ext4')
+        assert format(issue.value) == (
+            "mount: [Errno 2] No such file or directory: '/system-root/home'"
+        )
+        mock_invalidate.assert_called_once_with()
+
+    @patch('suse_migration_services.command.Command.run')
+    @patch('os.path.exists')
+    def test_mount_by_mount_program(self, mock_os_path_exists, mock_Command_run):
+        mock_os_path_exists.return_value = False
+        MountBackend._syscalls.update(self.syscalls)
+        MountBackend.mount('UUID=abc', '/system-root')
+        MountBackend.mount('/dev/sda1', '/system-root', 'ext4', 'loop')
+        assert mock_Command_run.call_args_list == [
+            call(['mount', 'UUID=abc', '/system-root']),
+            call(['mount', '-t', 'ext4', '-o', 'loop', '/dev/sda1', '/system-root']),
+        ]
+        assert not self.syscalls['mount'].called
+
+    @patch('os.path.exists')
+    def test_is_native(self, mock_os_path_exists):
+        mock_os_path_exists.return_value = False
+        MountBackend._syscalls['mount'] = None
+        assert not MountBackend.is_native('/dev/sda1', 'ext4')
+        MountBackend._syscalls.update(self.syscalls)
+        assert MountBackend.is_native('/dev/sda1', 'ext4')
+        assert MountBackend.is_native('/dev/disk/by-path/pci-0000:00:1f.2-part1', 'xfs')
+        assert MountBackend.is_native('tmpfs', 'tmpfs', 'mode=0755,x-systemd.automount')
+        assert not MountBackend.is_native('LABEL=foo', 'ext4')
+        assert not MountBackend.is_native('server:/export', 'nfs')
+        assert not MountBackend.is_native('/dev/sda1', None)
+        assert not MountBackend.is_native('/dev/sda1', 'auto')
+        assert not MountBackend.is_native('/dev/sda1', 'ext4,xfs')
+        assert not MountBackend.is_native('/dev/sda1', 'ext4', 'bind')
+        assert not MountBackend.is_native('/dev/sda1', 'ext4', 'X-mount.mkdir')
+        assert not MountBackend.is_native('/image', 'iso9660', 'loop=/dev/loop0')
+        mock_os_path_exists.return_value = True
+        assert not MountBackend.is_native('//server/share', 'cifs')
+
+    def test_get_mount_command(self):
+        assert MountBackend.get_mount_command('/dev/sda1', '/mnt') == ['mount', '/dev/sda1', '/mnt']
+        assert MountBackend.get_mount_command('/dev/sda1', '/mnt', 'xfs', 'ro') == [
+            'mount',
+            '-t',
+            'xfs',
+            '-o',
+            'ro',
+            '/dev/sda1',
+            '/mnt',
+        ]
+
+    def test_parse_options(self):
+        assert MountBackend._parse_options(None) == (0, None)
+        assert MountBackend._parse_options('defaults,nofail,comment=x,subvol=@/home,compress') == (
+            0,
+            'subvol=@/home,compress',
+        )
+        assert MountBackend._parse_options('ro,nosuid,noatime,suid,rw') == (MS_NOATIME, None)
+        assert MountBackend._parse_options('user') is None
+        for option in ('nouser', 'nousers', 'noowner', 'nogroup'):
+            assert MountBackend._parse_options('ro,{0}'.format(option)) == (MS_RDONLY, None)
+        for option in (
+            'shared',
+            'rshared',
+            'slave',
+            'rslave',
+            'private',
+            'rprivate',
+            'unbindable',
+            'runbindable',
+        ):
+            assert MountBackend._parse_options('ro,{0}'.format(option)) is None
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('os.statvfs')
+    def test_bind(self, mock_os_statvfs, mock_invalidate):
+        mock_os_statvfs.return_value = Mock(f_flag=os.ST_NOSUID)
+        MountBackend._syscalls.update(self.syscalls)
+        MountBackend.bind('/system-root/etc/zypp', '/etc/zypp')
+        MountBackend.bind('/etc/resolv.conf', '/run/resolv.conf', read_only=True)
+        assert self.syscalls['mount'].call_args_list == [
+            call(b'/system-root/etc/zypp', b'/etc/zypp', None, MS_BIND, None),
+            call(b'/etc/resolv.conf', b'/run/resolv.conf', None, MS_BIND, None),
+            call(
+                None, b'/run/resolv.conf', None, MS_NOSUID | MS_REMOUNT | MS_BIND | MS_RDONLY, None
+            ),
+        ]
+        mock_os_statvfs.assert_called_once_with('/run/resolv.conf')
+
+    @patch('suse_migration_services.command.Command.run')
+    @patch('ctypes.CDLL')
+    def test_bind_by_mount_program(self, mock_CDLL, mock_Command_run):
+        mock_CDLL.side_effect = OSError
+        MountBackend.bind('/etc/resolv.conf', '/run/resolv.conf', read_only=True)
+        mock_Command_run.assert_called_once_with(
+            ['mount', '--bind', '-o', 'ro', '/etc/resolv.conf', '/run/resolv.conf']
+        )
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('os.statvfs')
+    def test_remount(self, mock_os_statvfs, mock_invalidate):
+        mock_os_statvfs.return_value = Mock(f_flag=os.ST_RDONLY | os.ST_NOSUID)
+        MountBackend._syscalls.update(self.syscalls)
+        MountBackend.remount('/run/initramfs/isoscan', 'rw')
+        self.syscalls['mount'].assert_called_once_with(
+            None, b'/run/initramfs/isoscan', None, MS_NOSUID | MS_REMOUNT, None
+        )
+        mock_os_statvfs.side_effect = OSError
+        MountBackend.remount('/run/initramfs/isoscan', 'ro')
+        assert self.syscalls['mount'].call_args == call(
+            None, b'/run/initramfs/isoscan', None, MS_RDONLY | MS_REMOUNT, None
+        )
+
+    @patch('suse_migration_services.command.Command.run')
+    def test_remount_by_mount_program(self, mock_Command_run):
+        MountBackend._syscalls.update(self.syscalls)
+        MountBackend.remount('/system-root', 'rw,compress=zstd')
+        MountBackend.remount('/system-root', 'rw,bind')
+        MountBackend.remount('/system-root', 'rprivate')
+        assert mock_Command_run.call_args_list == [
+            call(['mount', '-o', 'remount,rw,compress=zstd', '/system-root']),
+            call(['mount', '-o', 'remount,rw,bind', '/system-root']),
+            call(['mount', '-o', 'remount,rprivate', '/system-root']),
+        ]
+        assert not self.syscalls['mount'].called
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('ctypes.get_errno')
+    def test_umount(self, mock_get_errno, mock_invalidate):
+        mock_get_errno.return_value = errno.EBUSY
+        MountBackend._syscalls.update(self.syscalls)
+        assert MountBackend.umount('/system-root/home', lazy=True) is True
+        self.syscalls['umount2'].assert_called_once_with(b'/system-root/home', MNT_DETACH)
+        self.syscalls['umount2'].return_value = -1
+        assert MountBackend.umount('/system-root', raise_on_error=False) is False
+        assert self.syscalls['umount2'].call_args == call(b'/system-root', 0)
+        with raises(DistMigrationCommandException) as issue:
+            MountBackend.umount('/system-root')
+        assert format(issue.value) == "umount: [Errno 16] Device or resource busy: '/system-root'"
+
+    @patch('suse_migration_services.mount_backend.CommandCache.invalidate')
+    @patch('ctypes.get_errno')
+    def test_umount_unless_busy(self, mock_get_errno, mock_invalidate):
+        MountBackend._syscalls.update(self.syscalls)
+        assert MountBackend.umount_unless_busy('/system-root/home') is True
+        self.syscalls['umount2'].assert_called_once_with(b'/system-root/home', 0)
+        self.syscalls['umount2'].return_value = -1
+        mock_get_errno.return_value = errno.EBUSY
+        with patch('suse_migration_services.mount_backend.log') as mock_log:
+            assert MountBackend.umount_unless_busy('/system-root') is False
+            mock_log.info.assert_called_with(
+                "umount: [Errno 16] Device or resource busy: '/system-root'"
+            )
+            assert not mock_log.error.called
+        mock_get_errno.return_value = errno.EINVAL
+        with raises(DistMigrationCommandException) as issue:
+            MountBackend.umount_unless_busy('/system-root/tmp')
+        assert format(issue.value) == "umount: [Errno 22] Invalid argument: '/system-root/tmp'"
+
+    @patch('suse_migration_services.command.Command.run')
+    @patch('ctypes.CDLL')
+    def test_umount_unless_busy_by_umount_program(self, mock_CDLL, mock_Command_run):
+        mock_CDLL.side_effect = OSError
+        mock_Command_run.return_value = Mock(returncode=0)
+        assert MountBackend.umount_unless_busy('/system-root') is True
+        mock_Command_run.assert_called_once_with(['umount', '/system-root'], raise_on_error=False)
+        mock_Command_run.return_value = Mock(
+            returncode=32, error='umount: /system-root: target is busy.\n'
+        )
+        assert MountBackend.umount_unless_busy('/system-root') is False
+        mock_Command_run.return_value = Mock(
+            returncode=32, error='umount: /system-root: not mounted.', output=''
+        )
+        with raises(DistMigrationCommandException) as issue:
+            MountBackend.umount_unless_busy('/system-root')
+        assert format(issue.value) == (
+            'umount: stderr: umount: /system-root: not mounted., stdout: '
+        )
+
+    @patch('suse_migration_services.command.Command.run')
+    @patch('ctypes.CDLL')
+    def test_umount_by_umount_program(self, mock_CDLL, mock_Command_run):
+        mock_CDLL.side_effect = OSError
+        mock_Command_run.return_value = Mock(returncode=32)
+        assert MountBackend.umount('/system-root', lazy=True, raise_on_error=False) is False
+        mock_Command_run.assert_called_once_with(
+            ['umount', '--lazy', '/system-root'], raise_on_error=False
+        )
@@ -0,0 +1,110 @@
+import select
+from unittest.mock import patch, Mock
+
+from suse_migration_services.mount_info import MountInfo
+
+
+class TestMountInfo:
+    def setup_method(self, cls):
+        MountInfo.refresh()
+        self.mountinfo_file = patch.object(MountInfo, 'mountinfo_file', '../data/mountinfo')
+        self.mountinfo_file.start()
+
+    def teardown_method(self, cls):
+        self.mountinfo_file.stop()
+        MountInfo.refresh()
+
+    def test_is_mounted(self):
+        assert MountInfo.is_mounted('/system-root')
+        assert MountInfo.is_mounted('/system-root/home/')
+        assert MountInfo.is_mounted('/system-root/home/my data')
+        assert MountInfo.is_mounted('/run/resolv.conf')
+        assert not MountInfo.is_mounted('/system-root/var')
+
+    def test_get_mount(self):
+        mount = MountInfo.get_mount('/system-root/home')
+        assert mount.mount_id == 41
+        assert mount.parent_id == 40
+        assert mount.major_minor == '8:3'
+        assert mount.root == '/@/home'
+        assert mount.options == 'rw,relatime'
+        assert mount.fstype == 'btrfs'
+        assert mount.super_options == 'rw,space_cache,subvolid=264,subvol=/@/home'
+        # the topmost of the stacked mounts is visible
+        assert MountInfo.get_mount('/system-root').fstype == 'tmpfs'
+        assert MountInfo.get_mount('/system-root/var') is None
+
+    def test_get_source(self):
+        assert MountInfo.get_source('/system-root/boot/efi') == '/dev/sda1'
+        assert MountInfo.get_source('/system-root/var') is None
+
+    def test_get_mounts_by_source(self):
+        assert [mount.mountpoint for mount in MountInfo.get_mounts_by_source('/dev/sda3')] == [
+            '/system-root',
+            '/system-root/home',
+        ]
+        # bind mounts share the source of the bound filesystem
+        assert [mount.root for mount in MountInfo.get_mounts_by_source('/dev/vda1')] == [
+            '/',
+            '/etc/resolv.conf',
+        ]
+        assert MountInfo.get_mounts_by_source('/dev/sdb1') == []
+
+    def test_get_submounts(self):
+        assert [mount.mountpoint for mount in MountInfo.get_submounts('/system-root')] == [
+            '/system-root/home',
+            '/system-root/boot/efi',
+            '/system-root/proc',
+            '/system-root/home/my data',
+            '/system-root/tmp',
+        ]
+        assert MountInfo.get_submounts('/system-root/boot/efi') == []
+        assert MountInfo.get_submounts('/system-root/var') == []
+
+    def test_get_umount_levels(self):
+        levels = MountInfo.get_umount_levels(
+            ['/system-root/home', '/system-root/', '/system-root/boot/efi', '/system-root/var']
+        )
+        assert [[mount.mount_id for mount in level] for level in levels] == [
+            [42, 45, 43, 47],
+            [46, 41],
+            [40],
+        ]
+        assert [[mount.mountpoint for mount in level] for level in levels][1] == [
+            '/system-root',
+            '/system-root/home',
+        ]
+        assert MountInfo.get_umount_levels(['/system-root/var']) == []
+
+    def test_parse_skips_invalid_lines(self):
+        snapshot = MountInfo._parse('garbage\n50 22 0:50 / /mnt rw - tmpfs tmpfs\n')
+        assert list(snapshot['by_id']) == [50]
+        assert snapshot['by_id'][50].super_options == ''
+
+    @patch('select.poll')
+    def test_snapshot_read_on_change(self, mock_poll):
+        poller = Mock()
+        poller.poll.return_value = []
+        mock_poll.return_value = poller
+        with patch.object(MountInfo, '_parse', wraps=MountInfo._parse) as mock_parse:
+            MountInfo.is_mounted('/system-root')
+            MountInfo.is_mounted('/system-root/home')
+            assert mock_parse.call_count == 1
+            poller.poll.return_value = [(3, select.POLLPRI | select.POLLERR)]
+            MountInfo.is_mounted('/system-root')
+            assert mock_parse.call_count == 2
+            MountInfo.refresh()
+            poller.poll.return_value = []
+            MountInfo.is_mounted('/system-root')
+            assert mock_parse.call_count == 3
+        poller.register.assert_called_with(
+            MountInfo._state['file'], select.POLLPRI | select.POLLERR
+        )
+        poller.poll.assert_called_with(0)
+
+    def test_snapshot_of_running_system(self):
+        self.mountinfo_file.stop()
+        MountInfo.refresh()
+        assert MountInfo.is_mounted('/')
+        assert MountInfo.is_mounted('/proc')
+        self.mountinfo_file.start()
@@ -0,0 +1,74 @@
+import json
+from unittest.mock import patch
+
+from suse_migration_services.mount_ledger import MountLedger
+
+
+class TestMountLedger:
+    def setup_method(self, cls):
+        self.ledger = MountLedger('ledger.jsonl')
+
+    @patch('suse_migration_services.mount_ledger.Defaults.get_system_mount_ledger_file')
+    def test_default_ledger_file(self, mock_get_system_mount_ledger_file):
+        mock_get_system_mount_ledger_file.return_value = '/etc/system-root.mounts.jsonl'
+        assert MountLedger().filename == '/etc/system-root.mounts.jsonl'
+
+    @patch('time.time')
+    @patch('os.fsync')
+    def test_sync(self, mock_os_fsync, mock_time, tmp_path):
+        mock_time.return_value = 1700000000.12345
+        ledger_file = format(tmp_path / 'ledger.jsonl')
+        ledger = MountLedger(ledger_file)
+        ledger.sync()
+        assert not mock_os_fsync.called
+        ledger.add_entry('/dev/sda2', '/system-root/', 'ext4', eligible_for_mount=False)
+        ledger.add_entry('proc', '/system-root/proc')
+        ledger.sync()
+        assert ledger.pending == []
+        ledger.add_entry('/system-root/etc/zypp', '/etc/zypp')
+        ledger.sync()
+        assert mock_os_fsync.call_count == 2
+        with open(ledger_file) as ledger_data:
+            records = [json.loads(line) for line in ledger_data]
+        assert records[0] == {
+            'unit': records[0]['unit'],
+            'time': 1700000000.123,
+            'device': '/dev/sda2',
+            'mountpoint': '/system-root/',
+            'fstype': 'ext4',
+            'options': None,
+            'eligible_for_mount': False,
+        }
+        assert [record['mountpoint'] for record in records] == [
+            '/system-root/',
+            '/system-root/proc',
+            '/etc/zypp',
+        ]
+
+    @patch('os.fsync')
+    def test_get_fstab(self, mock_os_fsync, tmp_path):
+        ledger_file = format(tmp_path / 'ledger.jsonl')
+        ledger = MountLedger(ledger_file)
+        ledger.add_entry('/dev/sda3', '/system-root/home', 'xfs', 'noatime')
+        ledger.add_entry('/dev/sda2', '/system-root/', 'ext4')
+        ledger.sync()
+        with open(ledger_file, 'a') as ledger_data:
+            ledger_data.write('{"device": "/dev/sda4", "mountpo')
+        ledger = MountLedger(ledger_file)
+        ledger.add_entry('/system-root/etc/zypp', '/etc/zypp')
+        fstab = ledger.get_fstab()
+        assert ledger.get_fstab() is fstab
+        assert [(entry.device, entry.mountpoint) for entry in fstab.get_devices()] == [
+            ('/dev/sda2', '/system-root/'),
+            ('/system-root/etc/zypp', '/etc/zypp'),
+            ('/dev/sda3', '/system-root/home'),
+        ]
+        assert fstab.get_devices()[2].options == 'noatime'
+        # records added later are part of the view, a later record
+        # for the same mountpoint supersedes the earlier one
+        ledger.add_entry('/dev/sda5', '/system-root/home', 'ext4')
+        assert [entry.device for entry in ledger.get_fstab().get_devices()][2] == '/dev/sda5'
+
+    def test_get_fstab_without_ledger(self, tmp_path):
+        ledger = MountLedger(format(tmp_path / 'ledger.jsonl'))
+        assert ledger.get_fstab().get_devices() == []
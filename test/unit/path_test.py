@@ -1,22 +1,85 @@
 from unittest.mock import patch
+from pytest import raises
 import os
 
 from suse_migration_services.path import Path
+from suse_migration_services.exceptions import DistMigrationCommandException
 
 
 @patch('suse_migration_services.command.Command.run')
 class TestPath(object):
-    def test_create(self, mock_command):
-        Path.create('foo')
-        mock_command.assert_called_once_with(['mkdir', '-p', 'foo'])
+    def setup_method(self, cls):
+        Path.which_cache_clear()
 
-    def test_wipe(self, mock_command):
-        Path.wipe('foo')
-        mock_command.assert_called_once_with(['rm', '-r', '-f', 'foo'])
+    def test_create(self, mock_command, tmp_path):
+        path = tmp_path / 'foo' / 'bar'
+        Path.create(format(path))
+        Path.create(format(path))
+        assert path.is_dir()
 
-    def test_remove(self, mock_command):
-        Path.remove('foo')
-        mock_command.assert_called_once_with(['rmdir', 'foo'])
+    def test_create_raises(self, mock_command, tmp_path):
+        (tmp_path / 'foo').touch()
+        with raises(DistMigrationCommandException) as issue:
+            Path.create(format(tmp_path / 'foo'))
+        assert format(issue.value).startswith('mkdir: ')
+
+    def test_wipe(self, mock_command, tmp_path):
+        path = tmp_path / 'foo'
+        (path / 'bar').mkdir(parents=True)
+        (path / 'bar' / 'file').touch()
+        Path.wipe(format(path))
+        assert not path.exists()
+        # wiping a file, a symlink or a non existing path is ok
+        (tmp_path / 'file').touch()
+        (tmp_path / 'link').symlink_to(tmp_path)
+        for name in ('file', 'link', 'foo'):
+            Path.wipe(format(tmp_path / name))
+        assert tmp_path.exists()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_remove(self, mock_command, tmp_path):
+        (tmp_path / 'foo').mkdir()
+        Path.remove(format(tmp_path / 'foo'))
+        assert not (tmp_path / 'foo').exists()
+        with raises(DistMigrationCommandException) as issue:
+            Path.remove(format(tmp_path / 'foo'))
+        assert format(issue.value).startswith('rmdir: ')
+
+    def test_touch(self, mock_command, tmp_path):
+        filename = tmp_path / 'foo'
+        Path.touch(format(filename))
+        assert filename.read_text() == ''
+        filename.write_text('data')
+        os.utime(filename, (0, 0))
+        Path.touch(format(filename))
+        assert filename.read_text() == 'data'
+        assert filename.stat().st_mtime > 0
+
+    def test_read(self, mock_command, tmp_path):
+        filename = tmp_path / 'foo'
+        filename.write_text('data')
+        assert Path.read(format(filename)) == 'data'
+        with raises(DistMigrationCommandException) as issue:
+            Path.read(format(tmp_path / 'bar'))
+        assert format(issue.value).startswith('cat: ')
+
+    @patch('subprocess.Popen')
+    def test_file_operations_do_not_call_programs(self, mock_Popen, mock_command, tmp_path):
+        # each of these operations used to fork one coreutils
+        # program, all of them are native now
+        path = format(tmp_path / 'foo')
+        filename = os.sep.join([path, 'file'])
+        operations = [
+            (Path.create, path),
+            (Path.touch, filename),
+            (Path.read, filename),
+            (Path.wipe, filename),
+            (Path.remove, path),
+        ]
+        for operation, argument in operations:
+            operation(argument)
+        assert mock_command.call_count == 0
+        assert mock_Popen.call_count == 0
 
     @patch('os.access')
     @patch('os.environ.get')
@@ -26,6 +89,7 @@ class TestPath(object):
         mock_exists.return_value = True
         assert Path.which('some-file') == '/usr/local/bin/some-file'
         mock_exists.return_value = False
+        Path.which_cache_clear()
         assert Path.which('some-file') is None
         mock_env.return_value = None
         mock_exists.return_value = True
@@ -55,3 +119,38 @@ class TestPath(object):
         mock_exists.return_value = True
         mock_access.return_value = False
         assert Path.which('file', access_mode=os.X_OK) is None
+
+    def test_which_cached(self, mock_Command, tmp_path):
+        first_bin = tmp_path / 'first'
+        second_bin = tmp_path / 'second'
+        first_bin.mkdir()
+        second_bin.mkdir()
+        program = second_bin / 'program'
+        program.touch(mode=0o755)
+        custom_env = {'PATH': '{0}:{1}'.format(first_bin, second_bin)}
+        assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) == format(program)
+        with patch('os.path.join') as mock_join:
+            with patch('os.path.exists') as mock_exists:
+                assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) == (
+                    format(program)
+                )
+            assert not mock_join.called
+            assert not mock_exists.called
+        # a change of the directory of the cached program causes a new lookup
+        program.unlink()
+        os.utime(second_bin, ns=(1, 1))
+        assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) is None
+        program.touch(mode=0o755)
+        os.utime(second_bin, ns=(2, 2))
+        assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) == format(program)
+        # a program added earlier in PATH shadows the cached location
+        shadowing_program = first_bin / 'program'
+        shadowing_program.touch(mode=0o755)
+        os.utime(first_bin, ns=(3, 3))
+        assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) == format(
+            shadowing_program
+        )
+        # a cached location whose directory is gone is looked up again
+        shadowing_program.unlink()
+        first_bin.rmdir()
+        assert Path.which('program', custom_env=custom_env, access_mode=os.X_OK) == format(program)
@@ -1,10 +1,12 @@
 import io
 import argparse
+import hashlib
+import json
 import logging
 import os
 import subprocess
 from unittest.mock import patch, call, Mock, MagicMock, mock_open
-from pytest import fixture
+from pytest import fixture, raises
 
 from suse_migration_services.command import Command
 from suse_migration_services.fstab import Fstab
@@ -19,6 +21,8 @@ import suse_migration_services.prechecks.cpu_arch as check_cpu_arch
 import suse_migration_services.prechecks.sshd as check_sshd
 import suse_migration_services.prechecks.xfs as check_xfs
 import suse_migration_services.prechecks.pre_checks as check_pre_checks
+from suse_migration_services.prechecks.cache import PreCheckCache
+from suse_migration_services.prechecks.runner import PreCheckRunner
 from suse_migration_services.exceptions import DistMigrationCommandException
 from suse_migration_services.defaults import Defaults
 from suse_migration_services.migration_target import MigrationTarget
@@ -40,7 +44,10 @@ class TestPreChecks:
     @patch('suse_migration_services.prechecks.cpu_arch.cpu_arch')
     @patch('suse_migration_services.prechecks.sshd.root_login')
     @patch.dict(os.environ, {"SUSE_MIGRATION_PRE_CHECKS_MODE": "foo"}, clear=True)
-    @patch('argparse.ArgumentParser.parse_args', return_value=argparse.Namespace(fix=False))
+    @patch(
+        'argparse.ArgumentParser.parse_args',
+        return_value=argparse.Namespace(fix=False, report=None, no_cache=True),
+    )
     def test_main(
         self,
         mock_arg_parse,
@@ -67,7 +74,10 @@ class TestPreChecks:
     @patch.dict(
         os.environ, {"SUSE_MIGRATION_PRE_CHECKS_MODE": "migration_system_iso_image"}, clear=True
     )
-    @patch('argparse.ArgumentParser.parse_args', return_value=argparse.Namespace(fix=True))
+    @patch(
+        'argparse.ArgumentParser.parse_args',
+        return_value=argparse.Namespace(fix=True, report=None, no_cache=True),
+    )
     def test_main_with_fix_and_migration_system_mode(
         self,
         mock_arg_parse,
@@ -89,15 +99,67 @@ class TestPreChecks:
             assert "fix: True" in self._caplog.text
             assert "Using migration_system mode" in self._caplog.text
 
+    @patch('suse_migration_services.prechecks.pre_checks.get_pre_checks')
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('argparse.ArgumentParser.parse_args')
+    def test_main_report(
+        self, mock_arg_parse, mock_get_pre_checks, mock_os_geteuid, mock_log, tmp_path
+    ):
+        mock_os_geteuid.return_value = 0
+        mock_arg_parse.return_value = argparse.Namespace(
+            fix=False, report=format(tmp_path / 'report.json'), no_cache=False
+        )
+        pre_checks = mock_get_pre_checks.return_value
+        pre_checks.run.side_effect = Exception('check failed')
+        with raises(Exception):
+            check_pre_checks.main()
+        mock_get_pre_checks.assert_called_once_with(False, False, True)
+        pre_checks.write_report.assert_called_once_with(format(tmp_path / 'report.json'))
+
+    def test_get_pre_checks(self, mock_os_geteuid, mock_log):
+        pre_checks = check_pre_checks.get_pre_checks(fix=True, migration_system=True)
+        assert list(pre_checks.checks) == [
+            'kernels',
+            'cpu_arch',
+            'repos',
+            'fs',
+            'xfs',
+            'lsm',
+            'scc',
+            'ha',
+            'wicked2nm',
+            'sshd',
+        ]
+        assert pre_checks.checks['lsm'].requires == ('kernels',)
+        # checks using rpm or zypper don't run concurrently with kernels --fix
+        for name in ('cpu_arch', 'ha', 'wicked2nm', 'sshd'):
+            assert pre_checks.checks[name].requires == ('kernels',)
+        assert pre_checks.checks['repos'].requires == ('kernels', 'cpu_arch')
+        assert pre_checks.checks['kernels'].call.keywords == {
+            'fix': True,
+            'migration_system': True,
+        }
+        assert pre_checks.cache.context == {'fix': True, 'migration_system': True}
+        assert pre_checks.checks['fs'].inputs == [
+            '/etc/migration-config.yml',
+            '/migration-image/*-*Migration.*.iso',
+            '/system-root/etc/fstab',
+            '/system-root/etc/crypttab',
+        ]
+        assert '/system-root/var/lib/rpm/*' in pre_checks.checks['lsm'].inputs
+        pre_checks = check_pre_checks.get_pre_checks(use_cache=False)
+        assert pre_checks.cache is None
+        assert '/etc/fstab' in pre_checks.checks['xfs'].inputs
+
     @patch('os.listdir')
     @patch('os.path.exists')
     @patch('configparser.RawConfigParser.items')
-    @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.command.Command.run_async')
     @patch('suse_migration_services.prechecks.fs.Fstab')
     def test_fs_and_repos(
         self,
         mock_fstab,
-        mock_command_run,
+        mock_command_run_async,
         mock_configparser_items,
         mock_os_exists,
         mock_os_listdir,
@@ -108,7 +170,7 @@ class TestPreChecks:
         Test fs and repo modules
         """
 
-        def luks(device):
+        def luks(device, custom_env=None, raise_on_error=True, timeout=None):
             command = Mock()
             command.returncode = 0
             command.output = 'ext4'
@@ -121,7 +183,7 @@ class TestPreChecks:
         fstab_mock.read.return_value = fstab.read('../data/fstab')
         fstab_mock.get_devices.return_value = fstab.get_devices()
         mock_fstab.return_value = fstab_mock
-        mock_command_run.side_effect = luks
+        mock_command_run_async.side_effect = luks
         mock_os_exists.return_value = True
         mock_os_listdir.return_value = ['no_remote.repo', 'super_repo.repo', 'another.repo']
         repo_no_foo = 'hd:/?device=/dev/disk/by-uuid/bd604632-663b-4d4c-b5b0-8d8686267ea2'
@@ -168,12 +230,12 @@ class TestPreChecks:
     @patch('os.listdir')
     @patch('os.path.exists')
     @patch('configparser.RawConfigParser.items')
-    @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.command.Command.run_async')
     @patch('suse_migration_services.prechecks.fs.Fstab')
     def test_fs_and_repos_with_migration_system(
         self,
         mock_fstab,
-        mock_command_run,
+        mock_command_run_async,
         mock_configparser_items,
         mock_os_exists,
         mock_os_listdir,
@@ -184,7 +246,7 @@ class TestPreChecks:
         Test fs and repo modules
         """
 
-        def luks(device):
+        def luks(device, custom_env=None, raise_on_error=True, timeout=None):
             command = Mock()
             command.returncode = 0
             command.output = 'ext4'
@@ -197,7 +259,7 @@ class TestPreChecks:
         fstab_mock.read.return_value = fstab.read('../data/fstab')
         fstab_mock.get_devices.return_value = fstab.get_devices()
         mock_fstab.return_value = fstab_mock
-        mock_command_run.side_effect = luks
+        mock_command_run_async.side_effect = luks
         mock_os_exists.return_value = True
         mock_os_listdir.return_value = ['no_remote.repo', 'super_repo.repo', 'another.repo']
         repo_no_foo = 'hd:/?device=/dev/disk/by-uuid/bd604632-663b-4d4c-b5b0-8d8686267ea2'
@@ -529,7 +591,10 @@ class TestPreChecks:
     @patch.dict(
         os.environ, {"SUSE_MIGRATION_PRE_CHECKS_MODE": "migration_system_iso_image"}, clear=True
     )
-    @patch('argparse.ArgumentParser.parse_args', return_value=argparse.Namespace(fix=True))
+    @patch(
+        'argparse.ArgumentParser.parse_args',
+        return_value=argparse.Namespace(fix=True, report=None, no_cache=True),
+    )
     def test_pre_checks_false(
         self,
         mock_argparse,
@@ -555,51 +620,89 @@ class TestPreChecks:
             check_pre_checks.main()
             assert info_message in self._caplog.text
 
-    @patch('os.path.exists')
     @patch.object(Command, 'run')
-    @patch('builtins.open', new_callable=mock_open, read_data='Y')
-    @patch('suse_migration_services.prechecks.lsm._apparmor_primitive_check')
+    @patch('suse_migration_services.prechecks.lsm._apparmor_enabled')
     @patch('shutil.which')
     @patch.object(MigrationTarget, 'get_migration_target')
     def test_check_lsm_migration(
         self,
         mock_get_migration_target,
         mock_shutil_which,
-        mock_apparmor_primitive_check,
-        mock_open,
+        mock_apparmor_enabled,
         mock_Command_run,
-        mock_os_path_exists,
         mock_os_geteuid,
         mock_log,
+        tmp_path,
     ):
         mock_get_migration_target.return_value = {'version': '16.0'}
         mock_shutil_which.return_value = True
-        mock_os_path_exists.return_value = True
-
+        mock_apparmor_enabled.return_value = True
+        profile_dir = tmp_path / 'apparmor.d'
+        (profile_dir / 'abstractions').mkdir(parents=True)
+        (profile_dir / 'usr.sbin.nscd').write_text('profile nscd {}')
+        (profile_dir / 'abstractions' / 'base').write_text('abi <abi/4.0>,')
+        (profile_dir / 'usr.bin.updatedb').write_text('profile updatedb {}')
+        (profile_dir / 'usr.sbin.libvirtd').write_text('profile libvirtd { modified }')
+        (profile_dir / 'usr.sbin.colord').write_text('profile colord {}')
+        sha256 = hashlib.sha256(b'abi <abi/4.0>,').hexdigest()
+        md5 = hashlib.md5(b'profile updatedb {}').hexdigest()
+        query_lines = [
+            # modified profile of the standard profiles
+            'apparmor-profiles\t8\t{0}\t0\t{1}/usr.sbin.nscd'.format(sha256, profile_dir),
+            'apparmor-profiles\t8\t{0}\t0\t{1}/abstractions/base'.format(sha256, profile_dir),
+            'apparmor-profiles\t8\t\t0\t{0}/abstractions'.format(profile_dir),
+            # files outside of the profile directory are not verified
+            'apparmor-profiles\t8\t{0}\t0\t/usr/share/apparmor/extra-profiles/x'.format(sha256),
+            'package dnsdist is not installed',
+            # ghost files are not verified
+            'colord\t8\t{0}\t64\t{1}/usr.sbin.colord'.format(sha256, profile_dir),
+            # missing files are not reported as modified
+            'haproxy\t8\t{0}\t0\t{1}/usr.sbin.haproxy'.format(sha256, profile_dir),
+            'mlocate\t(none)\t{0}\t0\t{1}/usr.bin.updatedb'.format(md5, profile_dir),
+            'libvirt-daemon\t1\t{0}\t0\t{1}/usr.sbin.libvirtd'.format(md5, profile_dir),
+        ]
         aa_status_retval = Mock()
-        aa_status_retval.output = '{"version": "2", "profiles": {"/usr/bin/lessopen.sh": "enforce", "apache2": "enforce", "apache2//DEFAULT_URI": "enforce", "apache2//HANDLING_UNTRUSTED_INPUT": "enforce", "apache2//phpsysinfo": "enforce", "avahi-daemon": "enforce", "dnsmasq": "enforce", "dnsmasq//libvirt_leaseshelper": "enforce", "docker-default": "enforce", "dovecot": "enforce", "dovecot-anvil": "enforce", "dovecot-auth": "enforce", "dovecot-config": "enforce", "dovecot-deliver": "enforce", "dovecot-dict": "enforce", "dovecot-director": "enforce", "dovecot-doveadm-server": "enforce", "dovecot-dovecot-auth": "enforce", "dovecot-dovecot-lda": "enforce", "dovecot-dovecot-lda//sendmail": "enforce", "dovecot-imap": "enforce", "dovecot-imap-login": "enforce", "dovecot-lmtp": "enforce", "dovecot-log": "enforce", "dovecot-managesieve": "enforce", "dovecot-managesieve-login": "enforce", "dovecot-pop3": "enforce", "dovecot-pop3-login": "enforce", "dovecot-replicator": "enforce", "dovecot-script-login": "enforce", "dovecot-ssl-params": "enforce", "dovecot-stats": "enforce", "identd": "enforce", "klogd": "enforce", "lsb_release": "enforce", "mdnsd": "enforce", "nmbd": "enforce", "nscd": "enforce", "ntpd": "enforce", "nvidia_modprobe": "enforce", "nvidia_modprobe//kmod": "enforce", "php-fpm": "enforce", "ping": "enforce", "samba-bgqd": "enforce", "samba-dcerpcd": "enforce", "samba-rpcd": "enforce", "samba-rpcd-classic": "enforce", "samba-rpcd-spoolss": "enforce", "smbd": "enforce", "smbldap-useradd": "enforce", "smbldap-useradd///etc/init.d/nscd": "enforce", "syslog-ng": "enforce", "syslogd": "enforce", "traceroute": "enforce", "unix-chkpwd": "enforce", "winbindd": "enforce", "zgrep": "enforce", "zgrep//helper": "enforce", "zgrep//sed": "enforce"}, "processes": {"/usr/sbin/nscd": [{"profile": "nscd", "pid": "783", "status": "enforce"}]}}'
-
-        rpm_verify_retval = Mock()
-        rpm_verify_retval.output = 'S.5....T.  c /some/path\nS.5....T.  c /etc/apparmor.d/some_file'
+        aa_status_retval.output = json.dumps(
+            {'version': '2', 'profiles': {'profile{0}'.format(i): 'enforce' for i in range(60)}}
+        )
+        rpm_query_retval = Mock()
+        rpm_query_retval.output = '\n'.join(query_lines)
 
-        def command_run_retval(array, raise_on_error=False):
+        def command_run_retval(array, custom_env=None, raise_on_error=False, timeout=None):
             if array[0] == 'aa-status':
                 return aa_status_retval
             elif array[0] == 'rpm':
-                return rpm_verify_retval
+                return rpm_query_retval
 
         mock_Command_run.side_effect = command_run_retval
-        mock_apparmor_primitive_check.return_value = False
-        with self._caplog.at_level(logging.ERROR):
-            check_lsm.check_lsm(migration_system=False)
-            assert 'Modified AppArmor profiles found' in self._caplog.text
-            assert (
-                'please verify changes to the files from: "rpm -V apparmor-profiles"'
-                in self._caplog.text
-            )
-            assert 'Non-default AppArmor setup detected' in self._caplog.text
-            assert 'please review the details above' in self._caplog.text
-        mock_Command_run.assert_called()
+        with patch.object(check_lsm, 'APPARMOR_PROFILE_DIR', format(profile_dir)):
+            with self._caplog.at_level(logging.ERROR):
+                check_lsm.check_lsm(migration_system=False)
+                assert 'Modified AppArmor profiles found' in self._caplog.text
+                assert (
+                    'please verify changes to the files from: "rpm -V apparmor-profiles"'
+                    in self._caplog.text
+                )
+                assert (
+                    'please verify changes to profiles from "{0}": "rpm -V libvirt-daemon"'.format(
+                        profile_dir
+                    )
+                    in self._caplog.text
+                )
+                assert 'Non-default AppArmor setup detected' in self._caplog.text
+                assert 'please review the details above' in self._caplog.text
+        # all packages are verified by one rpm query
+        rpm_query = mock_Command_run.call_args_list[1][0][0]
+        assert rpm_query[:3] == ['rpm', '-q', '--qf']
+        assert rpm_query[4:] == ['apparmor-profiles'] + check_lsm.ADDITIONAL_AA_PROFILES
+        assert mock_Command_run.call_count == 2
+
+    def test_get_file_digest(self, mock_os_geteuid, mock_log, tmp_path):
+        (tmp_path / 'empty').write_text('')
+        assert check_lsm._get_file_digest(format(tmp_path / 'empty'), 'sha256') == (
+            hashlib.sha256(b'').hexdigest()
+        )
+        assert check_lsm._get_file_digest(format(tmp_path / 'missing'), 'sha256') is None
 
     @patch.object(Command, 'run')
     @patch('suse_migration_services.prechecks.lsm._apparmor_enabled')
@@ -624,31 +727,42 @@ class TestPreChecks:
             assert 'Skipping LSM checks' in self._caplog.text
 
     @patch('os.path.exists')
-    @patch.object(Command, 'run')
     @patch('shutil.which')
     @patch.object(MigrationTarget, 'get_migration_target')
     def test_check_lsm_migration_simple(
         self,
         mock_get_migration_target,
         mock_shutil_which,
-        mock_Command_run,
         mock_os_path_exists,
         mock_os_geteuid,
         mock_log,
+        tmp_path,
     ):
         mock_get_migration_target.return_value = {'version': '16.0'}
         mock_shutil_which.return_value = False
-        find_retval = Mock()
-        find_retval.output = Mock()
-        find_retval.output.count = Mock()
-        find_retval.output.count.return_value = 300
-
-        mock_Command_run.return_value = find_retval
-
-        with patch('builtins.open', new_callable=mock_open, read_data='Y'):
-            with self._caplog.at_level(logging.INFO):
-                check_lsm.check_lsm(migration_system=False)
-                assert 'please install "apparmor-parser" as aa-status' in self._caplog.text
+        (tmp_path / 'local').mkdir()
+        (tmp_path / 'local' / 'usr.sbin.nscd').write_text('')
+        (tmp_path / 'usr.sbin.nscd').write_text('')
+        # find prints the directory, local, and both files
+        assert check_lsm._count_files(format(tmp_path)) == 4
+        assert check_lsm._count_files(format(tmp_path / 'missing')) == 0
+        # an unreadable directory is printed but not its entries
+        scandir = os.scandir
+
+        def unreadable_local(path):
+            if path.endswith('local'):
+                raise PermissionError('Permission denied')
+            return scandir(path)
+
+        with patch('os.scandir', side_effect=unreadable_local):
+            assert check_lsm._count_files(format(tmp_path)) == 3
+
+        with patch.object(check_lsm, 'APPARMOR_PROFILE_DIR', format(tmp_path)):
+            with patch.object(check_lsm, 'DEFAULT_ETC_FILE_COUNT', 3):
+                with patch('builtins.open', new_callable=mock_open, read_data='Y'):
+                    with self._caplog.at_level(logging.INFO):
+                        check_lsm.check_lsm(migration_system=False)
+                        assert 'please install "apparmor-parser" as aa-status' in self._caplog.text
 
     @patch('suse_migration_services.prechecks.lsm._apparmor_enabled')
     @patch.object(MigrationTarget, 'get_migration_target')
@@ -1257,3 +1371,174 @@ class TestPreChecks:
             check_cpu_arch.power10_version()
             assert 'Could not detect POWER generation' in self._caplog.text
         mock_file.assert_called_once_with('/proc/cpuinfo', 'r')
+
+
+class TestPreCheckRunner:
+    def setup_method(self, cls):
+        self.runner = PreCheckRunner()
+
+    def test_register_unknown_requirement(self):
+        with raises(ValueError):
+            self.runner.register('lsm', 'LSM migration', Mock(), requires=['kernels'])
+
+    @patch('time.monotonic')
+    def test_run(self, mock_monotonic, tmp_path, caplog):
+        log = logging.getLogger(Defaults.get_migration_log_name())
+        mock_monotonic.return_value = 10
+        calls = []
+
+        def kernels():
+            calls.append('kernels')
+            log.warning('Please remove all kernels')
+
+        def lsm():
+            calls.append('lsm')
+            log.error('SELinux is not supported')
+
+        def repos():
+            calls.append('repos')
+            log.info('Nothing found')
+
+        self.runner.register('kernels', 'kernels', kernels)
+        self.runner.register('repos', 'local private repos', repos)
+        self.runner.register('lsm', 'LSM migration', lsm, requires=['kernels'])
+        self.runner.register('scc', 'registration server', Mock(side_effect=OSError('offline')))
+        with caplog.at_level(logging.INFO):
+            with raises(OSError):
+                self.runner.run()
+            assert '--> Checking LSM migration...' in caplog.text
+            assert 'Done: lsm in 0.00s' in caplog.text
+            assert 'Check scc failed: offline' in caplog.text
+            assert 'Pre-checks finished in 0.00s, 0.00s of check runtime' in caplog.text
+        assert calls.index('kernels') < calls.index('lsm')
+        report = self.runner.get_report()
+        assert report['duration'] == 0
+        assert [check['name'] for check in report['checks']] == ['kernels', 'repos', 'lsm', 'scc']
+        assert report['checks'][0] == {
+            'name': 'kernels',
+            'description': 'kernels',
+            'requires': [],
+            'status': 'warning',
+            'start': 0,
+            'duration': 0,
+            'findings': [{'level': 'WARNING', 'message': 'Please remove all kernels'}],
+            'exception': None,
+            'cached': False,
+        }
+        assert [check['status'] for check in report['checks']] == [
+            'warning',
+            'passed',
+            'error',
+            'failed',
+        ]
+        assert report['checks'][2]['requires'] == ['kernels']
+        assert report['checks'][3]['exception'] == 'OSError: offline'
+        report_file = format(tmp_path / 'report.json')
+        self.runner.write_report(report_file)
+        with open(report_file) as report_data:
+            assert json.load(report_data) == report
+
+    def test_run_base_exception(self):
+        dependent_check = Mock()
+        self.runner.register('kernels', 'kernels', Mock(side_effect=SystemExit(1)))
+        self.runner.register('lsm', 'LSM migration', dependent_check, requires=['kernels'])
+        with raises(SystemExit):
+            self.runner.run()
+        dependent_check.assert_called_once_with()
+        assert self.runner.get_report()['checks'][0]['status'] == 'failed'
+
+    def test_get_report_without_run(self):
+        self.runner.register('repos', 'local private repos', Mock())
+        assert self.runner.get_report() == {'duration': 0, 'checks': []}
+
+    def test_run_cached(self, tmp_path, caplog):
+        log = logging.getLogger(Defaults.get_migration_log_name())
+        inputs = [format(tmp_path / 'zypp.conf')]
+        cache = PreCheckCache(format(tmp_path / 'cache' / 'pre-checks.json'))
+        kernels = Mock(side_effect=lambda: log.warning('Please remove all kernels'))
+        scc = Mock(side_effect=OSError('offline'))
+        self.runner = PreCheckRunner(cache=cache)
+        self.runner.register('kernels', 'kernels', kernels, inputs=inputs)
+        self.runner.register('scc', 'registration server', scc, inputs=inputs)
+        self.runner.register('repos', 'local private repos', Mock())
+        with raises(OSError):
+            self.runner.run()
+        # a second run with the same inputs replays the findings
+        self.runner = PreCheckRunner(cache=PreCheckCache(cache.filename))
+        self.runner.register('kernels', 'kernels', kernels, inputs=inputs)
+        self.runner.register('scc', 'registration server', scc, inputs=inputs)
+        caplog.clear()
+        with caplog.at_level(logging.INFO):
+            with raises(OSError):
+                self.runner.run()
+            assert '--> Checking kernels... inputs unchanged, cached' in caplog.text
+            assert 'Please remove all kernels' in caplog.text
+        assert kernels.call_count == 1
+        # failed checks are not cached
+        assert scc.call_count == 2
+        report = self.runner.get_report()
+        assert report['checks'][0]['cached'] is True
+        assert report['checks'][0]['status'] == 'warning'
+        assert report['checks'][1]['cached'] is False
+
+
+class TestPreCheckCache:
+    def setup_method(self, cls):
+        self.cache = PreCheckCache('pre-checks.json', context={'fix': False})
+
+    @patch.object(Defaults, 'get_pre_checks_cache_file')
+    def test_default_cache_file(self, mock_get_pre_checks_cache_file):
+        mock_get_pre_checks_cache_file.return_value = '/var/cache/suse-migration/pre-checks.json'
+        cache = PreCheckCache()
+        assert cache.filename == '/var/cache/suse-migration/pre-checks.json'
+        assert cache.context == {}
+
+    def test_get_fingerprint(self, tmp_path):
+        (tmp_path / 'repos.d').mkdir()
+        (tmp_path / 'repos.d' / 'a.repo').write_text('[a]')
+        inputs = [format(tmp_path / 'repos.d' / '*'), format(tmp_path / 'fstab')]
+        fingerprint = self.cache.get_fingerprint('repos', inputs)
+        assert self.cache.get_fingerprint('repos', inputs) == fingerprint
+        assert self.cache.get_fingerprint('fs', inputs) != fingerprint
+        assert (
+            PreCheckCache('pre-checks.json', {'fix': True}).get_fingerprint('repos', inputs)
+            != fingerprint
+        )
+        # added, changed and removed files change the fingerprint
+        (tmp_path / 'repos.d' / 'b.repo').write_text('[b]')
+        added = self.cache.get_fingerprint('repos', inputs)
+        assert added != fingerprint
+        (tmp_path / 'fstab').write_text('/dev/sda1 / ext4 defaults 0 0')
+        assert self.cache.get_fingerprint('repos', inputs) != added
+        (tmp_path / 'fstab').unlink()
+        (tmp_path / 'repos.d' / 'b.repo').unlink()
+        assert self.cache.get_fingerprint('repos', inputs) == fingerprint
+
+    @patch('builtins.open')
+    def test_get_fingerprint_without_boot_id(self, mock_open):
+        mock_open.side_effect = OSError('no proc')
+        assert self.cache.get_fingerprint('repos', [])
+
+    def test_get_and_store(self, tmp_path):
+        cache_file = format(tmp_path / 'pre-checks.json')
+        cache = PreCheckCache(cache_file)
+        assert cache.get('repos', 'abc') is None
+        cache.sync()
+        assert not os.path.exists(cache_file)
+        cache.store('repos', 'abc', [{'level': 'ERROR', 'message': 'No repositories'}])
+        cache.sync()
+        cache = PreCheckCache(cache_file)
+        assert cache.get('repos', 'abc') == [{'level': 'ERROR', 'message': 'No repositories'}]
+        assert cache.get('repos', 'def') is None
+        with open(cache_file, 'w') as cache_data:
+            cache_data.write('{"repos": ')
+        assert PreCheckCache(cache_file).get('repos', 'abc') is None
+
+    @patch('os.replace')
+    def test_sync_failed(self, mock_os_replace, tmp_path, caplog):
+        mock_os_replace.side_effect = OSError('read-only')
+        cache = PreCheckCache(format(tmp_path / 'pre-checks.json'))
+        cache.store('repos', 'abc', [])
+        cache.sync()
+        assert 'Failed to write pre-checks cache: read-only' in caplog.text
+        assert os.listdir(format(tmp_path)) == []
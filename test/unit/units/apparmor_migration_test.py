@@ -7,6 +7,7 @@ from suse_migration_services.exceptions import DistMigrationAppArmorMigrationExc
 from suse_migration_services.drop_components import DropComponents
 
 
+@patch('suse_migration_services.units.apparmor_migration.ChrootExecutor')
 @patch('suse_migration_services.logger.Logger.setup')
 class TestAppArmorMigration(object):
     @patch('suse_migration_services.zypper.Zypper.install')
@@ -18,6 +19,7 @@ class TestAppArmorMigration(object):
         mock_get_grub_default_file,
         mock_Zypper_install,
         mock_logger_setup,
+        mock_ChrootExecutor,
     ):
         mock_package_installed.return_value = True
         test_data = NamedTemporaryFile()
@@ -41,9 +43,10 @@ class TestAppArmorMigration(object):
                 chroot='/system-root',
             ),
         ]
+        mock_ChrootExecutor.assert_called_once_with('/system-root')
 
     @patch('fileinput.input')
-    def test_main_raises(self, mock_fileinput, mock_logger_setup):
+    def test_main_raises(self, mock_fileinput, mock_logger_setup, mock_ChrootExecutor):
         mock_fileinput.side_effect = Exception('error')
         with raises(DistMigrationAppArmorMigrationException):
             main()
@@ -13,7 +13,9 @@ class TestMigrationBtrfsSnapshotPost(object):
         mock_Command_run.return_value.returncode = 0
         mock_Command_run.return_value.output = 'ext4'
         main()
-        mock_Command_run.assert_called_once_with(['stat', '-f', '-c', '%T', '/system-root'])
+        mock_Command_run.assert_called_once_with(
+            ['stat', '-f', '-c', '%T', '/system-root'], cache=True
+        )
 
     @patch('suse_migration_services.command.Command.run')
     def test_main(self, mock_Command_run, mock_logger_setup):
@@ -36,7 +38,7 @@ class TestMigrationBtrfsSnapshotPost(object):
             file_handle.read.return_value = b'42'
             main()
         assert mock_Command_run.call_args_list == [
-            call(['stat', '-f', '-c', '%T', '/system-root']),
+            call(['stat', '-f', '-c', '%T', '/system-root'], cache=True),
             call(
                 [
                     'chroot',
@@ -13,7 +13,9 @@ class TestMigrationBtrfsSnapshotPre(object):
         mock_Command_run.return_value.returncode = 0
         mock_Command_run.return_value.output = 'ext4'
         main()
-        mock_Command_run.assert_called_once_with(['stat', '-f', '-c', '%T', '/system-root'])
+        mock_Command_run.assert_called_once_with(
+            ['stat', '-f', '-c', '%T', '/system-root'], cache=True
+        )
 
     @patch('suse_migration_services.command.Command.run')
     @patch('os.path.isfile')
@@ -37,7 +39,7 @@ class TestMigrationBtrfsSnapshotPre(object):
             file_handle.read.return_value = '42'
             main()
             assert mock_Command_run.call_args_list == [
-                call(['stat', '-f', '-c', '%T', '/system-root']),
+                call(['stat', '-f', '-c', '%T', '/system-root'], cache=True),
                 call(
                     ['chroot', '/system-root', 'snapper', '--no-dbus', 'get-config'],
                     raise_on_error=False,
@@ -86,7 +88,7 @@ class TestMigrationBtrfsSnapshotPre(object):
         with patch('builtins.open', create=True):
             main()
             assert mock_Command_run.call_args_list == [
-                call(['stat', '-f', '-c', '%T', '/system-root']),
+                call(['stat', '-f', '-c', '%T', '/system-root'], cache=True),
                 call(
                     ['chroot', '/system-root', 'snapper', '--no-dbus', 'get-config'],
                     raise_on_error=False,
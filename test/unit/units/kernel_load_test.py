@@ -94,8 +94,10 @@ class TestKernelLoad(object):
     @patch('shutil.copy')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.kernel_load.KernelKexec._get_cmdline')
+    @patch('suse_migration_services.path.Path.create')
     def test_main_raises_on_kernel_load(
         self,
+        mock_Path_create,
         mock_get_cmdline,
         mock_Command_run,
         mock_shutil_copy,
@@ -109,12 +111,12 @@ class TestKernelLoad(object):
         )
         mock_get_cmdline.return_value = cmd_line
         mock_get_migration_config_file.return_value = '../data/migration-config-soft-reboot.yml'
-        mock_Command_run.side_effect = [None, Exception('error')]
+        mock_Command_run.side_effect = [Exception('error')]
         with self._caplog.at_level(logging.ERROR):
             with raises(DistMigrationKernelRebootException):
                 main()
+        mock_Path_create.assert_called_once_with('/var/tmp/kexec')
         assert mock_Command_run.call_args_list == [
-            call(['mkdir', '-p', '/var/tmp/kexec']),
             call(
                 [
                     'kexec',
@@ -133,8 +135,10 @@ class TestKernelLoad(object):
     @patch('shutil.copy')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.kernel_load.KernelKexec._get_cmdline')
+    @patch('suse_migration_services.path.Path.create')
     def test_main(
         self,
+        mock_Path_create,
         mock_get_cmdline,
         mock_Command_run,
         mock_shutil_copy,
@@ -149,8 +153,8 @@ class TestKernelLoad(object):
         mock_get_cmdline.return_value = cmd_line
         mock_get_migration_config_file.return_value = '../data/migration-config-soft-reboot.yml'
         main()
+        mock_Path_create.assert_called_once_with('/var/tmp/kexec')
         assert mock_Command_run.call_args_list == [
-            call(['mkdir', '-p', '/var/tmp/kexec']),
             call(
                 [
                     'kexec',
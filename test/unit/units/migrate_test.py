@@ -1,5 +1,5 @@
 import io
-from unittest.mock import patch, Mock, MagicMock, call
+from unittest.mock import patch, Mock, MagicMock, call, ANY
 from pytest import raises
 
 from suse_migration_services.units.migrate import MigrateSystem, main
@@ -67,10 +67,13 @@ class TestMigration(object):
                 call('1\n'),
             ]
         mock_Zypper_run.reset_mock()
-        mock_Zypper_run.side_effect = None
-        zypper_call = Mock()
-        zypper_call.output = 'No migration available'
-        mock_Zypper_run.return_value = zypper_call
+
+        def zypper_run(args, line_callback, event_callback):
+            line_callback('Upgrade path lookup')
+            line_callback('No migration available.')
+            return Mock()
+
+        mock_Zypper_run.side_effect = zypper_run
         with patch('builtins.open', create=True) as mock_open:
             with raises(DistMigrationZypperException):
                 main()
@@ -149,7 +152,9 @@ class TestMigration(object):
                 'SLES/15/x86_64',
                 '--root',
                 '/system-root',
-            ]
+            ],
+            line_callback=ANY,
+            event_callback=None,
         )
 
     @patch('suse_migration_services.units.migrate.MigrateSystem.is_single_rpmtrans_requested')
@@ -192,7 +197,9 @@ class TestMigration(object):
                 'SLES/15/x86_64',
                 '--root',
                 '/system-root',
-            ]
+            ],
+            line_callback=ANY,
+            event_callback=None,
         )
 
     @patch('suse_migration_services.units.migrate.MigrateSystem.is_single_rpmtrans_requested')
@@ -235,7 +242,9 @@ class TestMigration(object):
                 'SLES/15/x86_64',
                 '--root',
                 '/system-root',
-            ]
+            ],
+            line_callback=ANY,
+            event_callback=None,
         )
 
     @patch('suse_migration_services.units.migrate.MigrateSystem.is_single_rpmtrans_requested')
@@ -275,6 +284,7 @@ class TestMigration(object):
                 '--allow-downgrade',
             ],
             raise_on_error=False,
+            event_callback=None,
         )
         zypper_call.raise_if_failed.assert_called_once()
 
@@ -313,6 +323,32 @@ class TestMigration(object):
             ]
         )
 
+    @patch('suse_migration_services.units.migrate.MigrateSystem.is_single_rpmtrans_requested')
+    @patch('suse_migration_services.logger.Logger.setup')
+    @patch('suse_migration_services.zypper.Zypper.run')
+    @patch('suse_migration_services.units.migrate.MigrationConfig')
+    @patch('suse_migration_services.units.migrate.ZypperProgressReport')
+    def test_main_zypper_dup_report_progress(
+        self,
+        mock_ZypperProgressReport,
+        mock_MigrationConfig,
+        mock_Zypper_run,
+        mock_logger_setup,
+        mock_is_single_rpmtrans_requested,
+    ):
+        migration_config = Mock()
+        migration_config.get_preserve_info.return_value = None
+        migration_config.is_zypper_migration_plugin_requested.return_value = False
+        migration_config.is_progress_report_requested.return_value = True
+        mock_MigrationConfig.return_value = migration_config
+        mock_is_single_rpmtrans_requested.return_value = '0'
+        with patch('builtins.open', create=True):
+            main()
+        assert (
+            mock_Zypper_run.call_args.kwargs['event_callback']
+            == mock_ZypperProgressReport.return_value.report
+        )
+
     @patch('builtins.open', new_callable=MagicMock)
     @patch('suse_migration_services.logger.Logger.setup')
     def test_is_single_rpmtrans_requested(self, mock_logger_setup, mock_open):
@@ -1,4 +1,6 @@
 import io
+import json
+import logging
 from unittest.mock import patch, call, Mock, MagicMock
 from pytest import raises
 from collections import namedtuple
@@ -6,6 +8,7 @@ from collections import namedtuple
 from suse_migration_services.units.mount_system import MountSystem, main
 from suse_migration_services.migration_config import MigrationConfig
 from suse_migration_services.fstab import Fstab
+from suse_migration_services.mount_backend import MountBackend
 from suse_migration_services.exceptions import (
     DistMigrationSystemNotFoundException,
     DistMigrationSystemMountException,
@@ -40,12 +43,16 @@ class TestMountSystem:
     @patch('suse_migration_services.units.mount_system.MountSystem.mount_system')
     @patch('suse_migration_services.units.mount_system.MountSystem.read_system_fstab')
     @patch('suse_migration_services.units.mount_system.MountSystem.activate_lvm')
-    @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.units.mount_system.MountBackend')
+    @patch('suse_migration_services.units.mount_system.MountSystem.log_lvm_activation')
     @patch.object(MigrationConfig, 'update_migration_config_file')
+    @patch.object(MigrationConfig, 'get_mount_option_overlay')
     def test_main_perform(
         self,
+        mock_get_mount_option_overlay,
         mock_update_migration_config_file,
-        mock_Command_run,
+        mock_log_lvm_activation,
+        mock_MountBackend,
         mock_activate_lvm,
         mock_read_system_fstab,
         mock_mount_system,
@@ -59,30 +66,128 @@ class TestMountSystem:
             return False
 
         mock_is_mounted.side_effect = _is_mounted
-        main()
-        mock_Command_run.assert_called_once_with(
-            ['mount', '-o', 'remount,rw', '/run/initramfs/isoscan']
-        )
+        mock_get_mount_option_overlay.return_value = {'ext4': 'noatime'}
+        mount_system = MountSystem()
+        mount_system.perform()
+        assert mount_system.mount_option_overlay == {'ext4': 'noatime'}
+        mock_MountBackend.remount.assert_called_once_with('/run/initramfs/isoscan', 'rw')
         mock_mount_system.assert_called_once_with(mock_read_system_fstab.return_value)
         mock_update_migration_config_file.assert_called_once_with()
         mock_activate_lvm.assert_called_once_with()
-
-    @patch('suse_migration_services.command.Command.run')
-    def test_get_uuid(self, mock_Command_run):
-        self.mount_os.get_uuid('some')
-        mock_Command_run.assert_called_once_with(
-            ['blkid', 'some', '-s', 'UUID', '-o', 'value'], raise_on_error=False
-        )
+        mock_log_lvm_activation.assert_called_once_with()
 
     @patch('suse_migration_services.command.Command.run')
     def test_activate_lvm(self, mock_Command_run):
         command_run = namedtuple('command', ['output', 'error', 'returncode'])
-        mock_Command_run.return_value = command_run(output='/dev/sda4 lvm', error='', returncode=0)
+        mock_Command_run.side_effect = [
+            command_run(
+                output=self._lsblk_json(['/dev/sda4', 'lvm', None]), error='', returncode=0
+            ),
+            command_run(output='  system\n  san-vg01\n', error='', returncode=0),
+        ]
         self.mount_os.activate_lvm()
         assert mock_Command_run.call_args_list == [
-            call(['lsblk', '-p', '-n', '-r', '-o', 'NAME,TYPE']),
-            call(['vgchange', '-a', 'y']),
+            call(
+                ['lsblk', '--json', '--list', '-p', '-o', 'NAME,TYPE,UUID,WWN,MOUNTPOINTS'],
+                cache=True,
+            ),
+            call(['vgs', '--noheadings', '-o', 'vg_name']),
         ]
+        assert self.mount_os.volume_groups == ['system', 'san-vg01']
+        assert self.mount_os.inactive_volume_groups == ['system', 'san-vg01']
+        mock_Command_run.reset_mock()
+        mock_Command_run.side_effect = None
+        mock_Command_run.return_value = command_run(
+            output=self._lsblk_json(['/dev/sda4', 'part', None]), error='', returncode=0
+        )
+        self.setup()
+        self.mount_os.activate_lvm()
+        assert len(mock_Command_run.call_args_list) == 1
+        assert self.mount_os.volume_groups == []
+
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.mount_system.DeviceAliases.refresh')
+    def test_activate_volume_groups(self, mock_DeviceAliases_refresh, mock_Command_run_many):
+        self.mount_os.volume_groups = ['system', 'data', 'san']
+        self.mount_os.inactive_volume_groups = ['system', 'data', 'san']
+        self.mount_os.activate_volume_groups(['data', 'system', 'unknown'])
+        mock_Command_run_many.assert_called_once_with(
+            [['vgchange', '-a', 'y', 'data'], ['vgchange', '-a', 'y', 'system']]
+        )
+        mock_DeviceAliases_refresh.assert_called_once_with()
+        assert self.mount_os.inactive_volume_groups == ['san']
+        self.mount_os.activate_volume_groups(['data'])
+        assert mock_Command_run_many.call_count == 1
+
+    @patch('suse_migration_services.units.mount_system.MountSystem.activate_volume_groups')
+    @patch('suse_migration_services.units.mount_system.DeviceAliases.exists')
+    def test_activate_fstab_volume_groups(
+        self, mock_DeviceAliases_exists, mock_activate_volume_groups, tmp_path
+    ):
+        fstab_file = tmp_path / 'fstab'
+        fstab_file.write_text(
+            '# comment\n'
+            '\n'
+            '/dev/system/root / xfs defaults 0 0\n'
+            '/dev/mapper/data--vg-home /home xfs defaults 0 0\n'
+            '/dev/mapper/san-swap swap swap defaults 0 0\n'
+            'UUID=FCF7-B051 /boot/efi vfat defaults 0 0\n'
+            'tmpfs /tmp tmpfs defaults 0 0\n'
+            'proc /proc proc defaults 0 0\n'
+            'server:/export /srv/nfs nfs defaults 0 0\n'
+            '//server/share /srv/cifs cifs defaults 0 0\n'
+        )
+        # nothing to activate
+        self.mount_os.activate_fstab_volume_groups(format(fstab_file))
+        assert not mock_activate_volume_groups.called
+        self.mount_os.volume_groups = ['system', 'data-vg', 'san']
+        self.mount_os.inactive_volume_groups = ['system', 'data-vg', 'san']
+        mock_DeviceAliases_exists.return_value = True
+        self.mount_os.activate_fstab_volume_groups(format(fstab_file))
+        mock_activate_volume_groups.assert_called_once_with(['system', 'data-vg'])
+        # only block devices are looked up
+        assert mock_DeviceAliases_exists.call_args_list == [call('/dev/disk/by-uuid/FCF7-B051')]
+        # devices which are no block devices never cause a fallback
+        non_block_fstab_file = tmp_path / 'fstab.non_block'
+        non_block_fstab_file.write_text(
+            '/dev/system/root / xfs defaults 0 0\n'
+            'tmpfs /tmp tmpfs defaults 0 0\n'
+            'server:/export /srv/nfs nfs defaults 0 0\n'
+        )
+        mock_DeviceAliases_exists.return_value = False
+        self.mount_os.activate_fstab_volume_groups(format(non_block_fstab_file))
+        assert mock_activate_volume_groups.call_args == call(['system'])
+        # a device not found might be on any inactive volume group
+        mock_DeviceAliases_exists.return_value = False
+        self.mount_os.activate_fstab_volume_groups(format(fstab_file))
+        assert mock_activate_volume_groups.call_args == call(['system', 'data-vg', 'san'])
+
+    def test_get_volume_group(self):
+        self.mount_os.volume_groups = ['system', 'data-vg']
+        assert self.mount_os.get_volume_group('/dev/system/root') == 'system'
+        assert self.mount_os.get_volume_group('/dev/mapper/system-root') == 'system'
+        assert self.mount_os.get_volume_group('/dev/mapper/data--vg-my--lv') == 'data-vg'
+        assert self.mount_os.get_volume_group('/dev/mapper/3600a0b80') is None
+        assert self.mount_os.get_volume_group('/dev/mapper/mpatha-part1') is None
+        assert self.mount_os.get_volume_group('/dev/disk/by-uuid/FCF7-B051') is None
+        assert self.mount_os.get_volume_group('/dev/sda1') is None
+
+    def test_log_lvm_activation(self, caplog):
+        with caplog.at_level(logging.INFO):
+            self.mount_os.log_lvm_activation()
+            assert 'LVM' not in caplog.text
+            self.mount_os.volume_groups = ['system', 'data', 'san01', 'san02']
+            self.mount_os.inactive_volume_groups = ['system', 'data', 'san01', 'san02']
+            self.mount_os.log_lvm_activation()
+            assert 'Activated 0 of 4 LVM volume group(s) in 0.0s' in caplog.text
+            assert 'saved' not in caplog.text
+            self.mount_os.inactive_volume_groups = ['san01', 'san02']
+            self.mount_os.lvm_activation_time = 0.5
+            self.mount_os.log_lvm_activation()
+            assert (
+                'Activated 2 of 4 LVM volume group(s) in 0.5s, '
+                'leaving 2 inactive saved about 0.5s'
+            ) in caplog.text
 
     @patch('suse_migration_services.command.Command.run')
     def test_get_target_root_no_match_found(self, mock_Command_run):
@@ -93,25 +198,79 @@ class TestMountSystem:
             with raises(DistMigrationSystemMountException):
                 self.mount_os.get_target_root()
 
+    @patch('suse_migration_services.command.Command.run_many')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.mount_system.MountSystem.get_uuid')
-    def test_get_target_root_match_found(self, mock_get_uuid, mock_Command_run):
-        mock_get_uuid.return_value = 'UUID'
+    def test_get_target_root_match_found(self, mock_Command_run, mock_Command_run_many):
         command_run = namedtuple('command', ['output', 'error', 'returncode'])
-        mock_Command_run.return_value = command_run(output='/dev/sda4 lvm', error='', returncode=0)
+        mock_Command_run.return_value = command_run(
+            output=self._lsblk_json(['/dev/sda', 'disk', None], ['/dev/sda4', 'lvm', 'UUID']),
+            error='',
+            returncode=0,
+        )
         with patch('builtins.open', create=True) as mock_open:
             mock_open.return_value = MagicMock(spec=io.IOBase)
             file_handle = mock_open.return_value.__enter__.return_value
             file_handle.read.return_value = 'migration_target=UUID'
             assert self.mount_os.get_target_root() == '/dev/sda4'
+        mock_Command_run.assert_called_once_with(
+            ['lsblk', '--json', '--list', '-p', '-o', 'NAME,TYPE,UUID,WWN,MOUNTPOINTS'],
+            cache=True,
+        )
+        assert not mock_Command_run_many.called
 
+    @patch('suse_migration_services.command.Command.run_many')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.mount_system.MountSystem.get_uuid')
-    def test_get_target_root_match_no_multipath_root(self, mock_get_uuid, mock_Command_run):
-        mock_get_uuid.return_value = 'UUID'
+    def test_find_target_root_not_found(self, mock_Command_run, mock_Command_run_many):
         command_run = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run(
-            output='/dev/sda4 lvm\n/dev/mapper/WWN-part2 part', error='', returncode=0
+            output=self._lsblk_json(['/dev/sda4', 'part', 'OTHER']), error='', returncode=0
+        )
+        assert self.mount_os.find_target_root('UUID') is None
+
+    @patch('suse_migration_services.units.mount_system.MountSystem.activate_volume_groups')
+    @patch('suse_migration_services.units.mount_system.MountSystem.find_target_root')
+    def test_get_target_root_on_inactive_volume_group(
+        self, mock_find_target_root, mock_activate_volume_groups
+    ):
+        def activate_volume_groups(volume_groups):
+            for volume_group in volume_groups:
+                self.mount_os.inactive_volume_groups.remove(volume_group)
+
+        volume_groups = ['vg{0}'.format(count) for count in range(10)]
+        self.mount_os.inactive_volume_groups = list(volume_groups)
+        mock_activate_volume_groups.side_effect = activate_volume_groups
+        mock_find_target_root.side_effect = [None, None, '/dev/mapper/vg5-root']
+        with patch('builtins.open', create=True) as mock_open:
+            mock_open.return_value = MagicMock(spec=io.IOBase)
+            file_handle = mock_open.return_value.__enter__.return_value
+            file_handle.read.return_value = 'migration_target=UUID'
+            assert self.mount_os.get_target_root() == '/dev/mapper/vg5-root'
+        assert mock_activate_volume_groups.call_args_list == [
+            call(volume_groups[:4]),
+            call(volume_groups[4:8]),
+        ]
+        assert mock_find_target_root.call_args_list == [call('UUID', None)] * 3
+        assert self.mount_os.inactive_volume_groups == volume_groups[8:]
+        # not found on any volume group
+        mock_find_target_root.side_effect = None
+        mock_find_target_root.return_value = None
+        with patch('builtins.open', create=True) as mock_open:
+            mock_open.return_value = MagicMock(spec=io.IOBase)
+            file_handle = mock_open.return_value.__enter__.return_value
+            file_handle.read.return_value = 'migration_target=UUID'
+            with raises(DistMigrationSystemMountException):
+                self.mount_os.get_target_root()
+        assert mock_activate_volume_groups.call_args == call(volume_groups[8:])
+
+    @patch('suse_migration_services.command.Command.run')
+    def test_get_target_root_match_no_multipath_root(self, mock_Command_run):
+        command_run = namedtuple('command', ['output', 'error', 'returncode'])
+        mock_Command_run.return_value = command_run(
+            output=self._lsblk_json(
+                ['/dev/sda4', 'lvm', 'UUID'], ['/dev/mapper/WWN-part2', 'part', 'UUID']
+            ),
+            error='',
+            returncode=0,
         )
         with patch('builtins.open', create=True) as mock_open:
             mock_open.return_value = MagicMock(spec=io.IOBase)
@@ -119,36 +278,67 @@ class TestMountSystem:
             file_handle.read.return_value = 'migration_target=UUID'
             assert self.mount_os.get_target_root() == '/dev/sda4'
 
+    @patch('suse_migration_services.units.mount_system.DeviceAliases')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.mount_system.MountSystem.get_uuid')
-    def test_get_target_root_match_multipath_root(self, mock_get_uuid, mock_Command_run):
-        mock_get_uuid.return_value = 'UUID'
+    def test_get_target_root_match_multipath_root(self, mock_Command_run, mock_DeviceAliases):
+        mock_DeviceAliases.get_aliases.return_value = ['/dev/disk/by-id/lvm-pv-uuid-WWN']
         command_run = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run(
-            output='/dev/sda4 lvm\n/dev/mapper/WWN-part2 part', error='', returncode=0
+            output=self._lsblk_json(
+                ['/dev/sda4', 'lvm', 'UUID'], ['/dev/mapper/WWN-part2', 'part', 'UUID']
+            ),
+            error='',
+            returncode=0,
         )
         with patch('builtins.open', create=True) as mock_open:
             mock_open.return_value = MagicMock(spec=io.IOBase)
             file_handle = mock_open.return_value.__enter__.return_value
             file_handle.read.return_value = 'migration_target=UUID multipath_wwn=WWN'
             assert self.mount_os.get_target_root() == '/dev/mapper/WWN-part2'
+        mock_DeviceAliases.get_aliases.assert_called_once_with('/dev/sda4', 'by-id')
+
+    @patch('suse_migration_services.units.mount_system.DeviceAliases')
+    def test_is_multipath_device(self, mock_DeviceAliases):
+        mock_DeviceAliases.get_aliases.return_value = [
+            '/dev/disk/by-id/dm-name-mpatha-part2',
+            '/dev/disk/by-id/dm-uuid-part2-mpath-3600a0b80',
+        ]
+        assert self.mount_os.is_multipath_device('/dev/mapper/3600a0b80-part2', '3600a0b80')
+        assert not mock_DeviceAliases.get_aliases.called
+        assert self.mount_os.is_multipath_device('/dev/mapper/mpatha-part2', '3600a0b80')
+        mock_DeviceAliases.get_aliases.assert_called_once_with('/dev/mapper/mpatha-part2', 'by-id')
+        mock_DeviceAliases.get_aliases.return_value = ['/dev/disk/by-id/wwn-0x3600a0b80-part2']
+        assert not self.mount_os.is_multipath_device('/dev/sda2', '3600a0b80')
+
+    def _lsblk_json(self, *devices):
+        return json.dumps(
+            {
+                'blockdevices': [
+                    {'name': name, 'type': block_type, 'uuid': uuid, 'wwn': None}
+                    for name, block_type, uuid in devices
+                ]
+            }
+        )
 
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('os.path.ismount')
-    def test_is_mounted(self, mock_os_path_ismount, mock_Logger_setup):
-        self.mount_os.is_mounted('some')
-        mock_os_path_ismount.assert_called_once_with('some')
+    @patch('suse_migration_services.units.mount_system.MountInfo.is_mounted')
+    def test_is_mounted(self, mock_MountInfo_is_mounted, mock_Logger_setup):
+        mock_MountInfo_is_mounted.return_value = True
+        assert self.mount_os.is_mounted('some') is True
+        mock_MountInfo_is_mounted.assert_called_once_with('some')
 
     @patch('suse_migration_services.logger.Logger.setup')
     @patch('suse_migration_services.units.mount_system.MountSystem.get_target_root')
-    @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.units.mount_system.MountBackend')
     @patch('suse_migration_services.units.mount_system.Fstab')
+    @patch('suse_migration_services.units.mount_system.MountSystem.activate_fstab_volume_groups')
     @patch('os.path.isfile')
     def test_read_system_fstab(
         self,
         mock_os_path_isfile,
+        mock_activate_fstab_volume_groups,
         mock_Fstab,
-        mock_Command_run,
+        mock_MountBackend,
         mock_get_target_root,
         mock_Logger_setup,
     ):
@@ -157,45 +347,322 @@ class TestMountSystem:
         # fstab file found
         mock_os_path_isfile.return_value = True
         assert self.mount_os.read_system_fstab() == fstab
-        mock_Command_run.assert_called_once_with(
-            ['mount', mock_get_target_root.return_value, 'some']
-        )
+        mock_activate_fstab_volume_groups.assert_called_once_with('some/etc/fstab')
+        mock_MountBackend.mount.assert_called_once_with(mock_get_target_root.return_value, 'some')
         # fstab file not found
         mock_os_path_isfile.return_value = False
-        mock_Command_run.reset_mock()
+        mock_MountBackend.reset_mock()
         with raises(DistMigrationSystemNotFoundException):
             self.mount_os.read_system_fstab()
-        assert mock_Command_run.call_args_list == [
-            call(['mount', mock_get_target_root.return_value, 'some']),
-            call(['umount', 'some'], raise_on_error=False),
-        ]
+        mock_MountBackend.mount.assert_called_once_with(mock_get_target_root.return_value, 'some')
+        mock_MountBackend.umount.assert_called_once_with('some', raise_on_error=False)
 
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.mount_system.Fstab')
+    @patch('suse_migration_services.mount_backend.MountBackend._syscall')
+    @patch('suse_migration_services.mount_backend.MountBackend._get_syscalls')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.mount_system.MountLedger')
     @patch('os.makedirs')
     @patch('os.path.exists')
     def test_mount_system(
-        self, mock_os_path_exists, mock_os_makedirs, mock_Fstab, mock_Command_run, mock_Logger_setup
+        self,
+        mock_os_path_exists,
+        mock_os_makedirs,
+        mock_MountLedger,
+        mock_Command_run_many,
+        mock_get_syscalls,
+        mock_syscall,
+        mock_Logger_setup,
     ):
+        def exists(path):
+            # only vfat comes with a mount helper
+            return not path.startswith(('/sbin/mount.', '/usr/sbin/mount.')) or path.endswith(
+                '.vfat'
+            )
+
+        mock_get_syscalls.return_value = {'mount': Mock(), 'umount2': Mock()}
         mock_os_path_exists.return_value = True
         fstab = Fstab()
         fstab_mock = Mock()
         fstab_mock.read.return_value = fstab.read('../data/fstab')
-        fstab_mock.get_devices.return_value = fstab.get_devices()
+        fstab_mock.get_mount_levels.return_value = fstab.get_mount_levels()
+        fstab_mock.get_missing_entries.return_value = fstab.get_missing_entries()
+        system_mount = Mock()
+        mock_MountLedger.return_value = system_mount
+        mock_os_path_exists.side_effect = exists
 
         self.mount_os.mount_system(fstab_mock)
-        assert mock_Command_run.call_args_list == [
-            call(['mount', '-o', 'defaults', '/dev/disk/by-partuuid/3c8bd108-01', 'some/bar']),
-            call(['mount', '-o', 'defaults', '/dev/mynode', 'some/foo']),
-            call(['mount', '-o', 'defaults', '/dev/disk/by-label/foo', 'some/home']),
-            call(['mount', '-o', 'defaults', '/dev/disk/by-uuid/FCF7-B051', 'some/boot/efi']),
-            call(['mount', '-o', 'defaults', '/dev/homeboy', 'some/home/stack']),
-            call(['mount', '-t', 'devtmpfs', 'devtmpfs', 'some/dev']),
-            call(['mount', '-t', 'proc', 'proc', 'some/proc']),
-            call(['mount', '-t', 'sysfs', 'sysfs', 'some/sys']),
-            call(['mount', '-t', 'tmpfs', 'tmpfs', 'some/run']),
+        assert mock_Command_run_many.call_args_list == [
+            call([]),
+            call(
+                [
+                    [
+                        'mount',
+                        '-t',
+                        'vfat',
+                        '-o',
+                        'defaults',
+                        '/dev/disk/by-uuid/FCF7-B051',
+                        'some/boot/efi',
+                    ]
+                ]
+            ),
+            call([]),
+        ]
+        assert mock_syscall.call_args_list == [
+            call(
+                [
+                    'mount',
+                    '-t',
+                    'ext4',
+                    '-o',
+                    'defaults',
+                    '/dev/disk/by-partuuid/3c8bd108-01',
+                    'some/bar',
+                ],
+                'mount',
+                '/dev/disk/by-partuuid/3c8bd108-01',
+                'some/bar',
+                'ext4',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'ext4', '-o', 'defaults', '/dev/mynode', 'some/foo'],
+                'mount',
+                '/dev/mynode',
+                'some/foo',
+                'ext4',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'ext4', '-o', 'defaults', '/dev/disk/by-label/foo', 'some/home'],
+                'mount',
+                '/dev/disk/by-label/foo',
+                'some/home',
+                'ext4',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'ext4', '-o', 'defaults', '/dev/homeboy', 'some/home/stack'],
+                'mount',
+                '/dev/homeboy',
+                'some/home/stack',
+                'ext4',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'devtmpfs', 'devtmpfs', 'some/dev'],
+                'mount',
+                'devtmpfs',
+                'some/dev',
+                'devtmpfs',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'proc', 'proc', 'some/proc'],
+                'mount',
+                'proc',
+                'some/proc',
+                'proc',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'sysfs', 'sysfs', 'some/sys'],
+                'mount',
+                'sysfs',
+                'some/sys',
+                'sysfs',
+                0,
+                None,
+            ),
+            call(
+                ['mount', '-t', 'tmpfs', 'tmpfs', 'some/run'],
+                'mount',
+                'tmpfs',
+                'some/run',
+                'tmpfs',
+                0,
+                None,
+            ),
         ]
-        mock_Command_run.side_effect = Exception
+        assert system_mount.add_entry.call_args_list[:2] == [
+            call(
+                '/dev/disk/by-uuid/bd604632-663b-4d4c-b5b0-8d8686267ea2',
+                'some/',
+                'ext4',
+                '',
+                eligible_for_mount=False,
+            ),
+            call(
+                '/dev/disk/by-partuuid/3c8bd108-01',
+                'some/bar',
+                'ext4',
+                'defaults',
+                eligible_for_mount=True,
+            ),
+        ]
+        system_mount.sync.assert_called_once_with()
+        mock_Command_run_many.side_effect = Exception
         with raises(DistMigrationSystemMountException):
             self.mount_os.mount_system(fstab_mock)
+
+    @patch('suse_migration_services.logger.Logger.setup')
+    @patch('suse_migration_services.units.mount_system.CommandDeadline.get_device_timeout')
+    @patch('suse_migration_services.units.mount_system.DeviceWaiter.wait')
+    @patch('suse_migration_services.units.mount_system.MountBackend')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.mount_system.MountLedger')
+    def test_mount_system_late_devices(
+        self,
+        mock_MountLedger,
+        mock_Command_run_many,
+        mock_MountBackend,
+        mock_DeviceWaiter_wait,
+        mock_get_device_timeout,
+        mock_Logger_setup,
+        caplog,
+    ):
+        available = set()
+
+        def exists(path):
+            if path in ('/dev/mynode', '/dev/disk/by-label/foo'):
+                return path in available
+            return True
+
+        def wait(devices, timeout):
+            # the device of /home/stack shows up before the one of /home
+            yield '/dev/homeboy'
+            available.add('/dev/disk/by-label/foo')
+            yield '/dev/disk/by-label/foo'
+
+        mock_MountBackend.is_native.return_value = True
+        mock_get_device_timeout.return_value = 30
+        mock_DeviceWaiter_wait.side_effect = wait
+        system_mount = mock_MountLedger.return_value
+        with patch('os.path.exists', side_effect=exists):
+            fstab = Fstab()
+            fstab.read('../data/fstab')
+            with caplog.at_level(logging.INFO):
+                self.mount_os.mount_system(fstab)
+                assert 'Waiting for device(s): /dev/mynode, /dev/disk/by-label/foo, ' in caplog.text
+                assert (
+                    'Skipped /foo, device /dev/mynode or its parent mount not available'
+                    in caplog.text
+                )
+        mock_DeviceWaiter_wait.assert_called_once_with(
+            ['/dev/mynode', '/dev/disk/by-label/foo', '/dev/homeboy'], 30
+        )
+        mount_calls = mock_MountBackend.mount.call_args_list
+        assert mount_calls[:2] == [
+            call('/dev/disk/by-partuuid/3c8bd108-01', 'some/bar', 'ext4', 'defaults'),
+            call('/dev/disk/by-uuid/FCF7-B051', 'some/boot/efi', 'vfat', 'defaults'),
+        ]
+        assert mount_calls[2:4] == [
+            call('/dev/disk/by-label/foo', 'some/home', 'ext4', 'defaults'),
+            call('/dev/homeboy', 'some/home/stack', 'ext4', 'defaults'),
+        ]
+        assert call('/dev/homeboy', 'some/home/stack', 'ext4', 'defaults') in (
+            system_mount.add_entry.call_args_list
+        )
+        assert 'some/foo' not in [mount_call[0][1] for mount_call in mount_calls]
+
+    @patch('suse_migration_services.logger.Logger.setup')
+    @patch('suse_migration_services.units.mount_system.DeviceWaiter.wait')
+    @patch('suse_migration_services.units.mount_system.MountBackend')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.mount_system.MountLedger')
+    def test_mount_system_late_devices_not_required(
+        self,
+        mock_MountLedger,
+        mock_Command_run_many,
+        mock_MountBackend,
+        mock_DeviceWaiter_wait,
+        mock_Logger_setup,
+        tmp_path,
+    ):
+        fstab_file = tmp_path / 'fstab'
+        fstab_file.write_text(
+            '/dev/sda2 / ext4 defaults 0 0\n'
+            '/dev/sdb1 /backup ext4 defaults,nofail 0 0\n'
+            '/dev/sdc1 /media/usb vfat noauto,user 0 0\n'
+        )
+        mock_MountBackend.is_native.return_value = True
+
+        def exists(path):
+            return path not in ('/dev/sdb1', '/dev/sdc1')
+
+        with patch('os.path.exists', side_effect=exists):
+            fstab = Fstab()
+            fstab.read(format(fstab_file))
+            self.mount_os.mount_system(fstab)
+        assert [entry.mountpoint for entry in fstab.get_missing_entries()] == [
+            '/backup',
+            '/media/usb',
+        ]
+        assert not mock_DeviceWaiter_wait.called
+
+    def test_get_mount_options(self):
+        assert self.mount_os.get_mount_options('ext4', 'defaults') == 'defaults'
+        self.mount_os.mount_option_overlay = {
+            'ext4': 'noatime,lazytime,commit=60',
+            'vfat': '',
+        }
+        assert (
+            self.mount_os.get_mount_options('ext4', 'defaults,commit=5,noatime')
+            == 'defaults,noatime,lazytime,commit=60'
+        )
+        assert self.mount_os.get_mount_options('ext4', None) == 'noatime,lazytime,commit=60'
+        assert self.mount_os.get_mount_options('vfat', 'defaults') == 'defaults'
+
+    @patch('suse_migration_services.units.mount_system.MountBackend')
+    def test_remount_root(self, mock_MountBackend, caplog):
+        mock_MountBackend.vfs_options = MountBackend.vfs_options
+        self.mount_os.remount_root('ext4')
+        assert not mock_MountBackend.remount.called
+        self.mount_os.mount_option_overlay = {'ext4': 'noatime,lazytime'}
+        self.mount_os.remount_root('ext4')
+        mock_MountBackend.remount.assert_called_once_with('some', 'noatime,lazytime')
+        mock_MountBackend.remount.side_effect = Exception('busy')
+        self.mount_os.remount_root('ext4')
+        assert 'Mount option overlay not applied to some: busy' in caplog.text
+
+    @patch('suse_migration_services.units.mount_system.MountBackend.remount')
+    def test_remount_root_vfs_options_only(self, mock_MountBackend_remount):
+        self.mount_os.mount_option_overlay = {
+            'xfs': 'noatime,lazytime,logbufs=8',
+            'ext3': 'commit=60',
+        }
+        self.mount_os.remount_root('xfs')
+        mock_MountBackend_remount.assert_called_once_with('some', 'noatime,lazytime')
+        self.mount_os.remount_root('ext3')
+        assert mock_MountBackend_remount.call_count == 1
+
+    @patch('suse_migration_services.units.mount_system.MountBackend')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.mount_system.MountLedger')
+    def test_mount_system_mount_option_overlay(
+        self, mock_MountLedger, mock_Command_run_many, mock_MountBackend
+    ):
+        mock_MountBackend.is_native.return_value = True
+        mock_MountBackend.vfs_options = MountBackend.vfs_options
+        self.mount_os.mount_option_overlay = {'ext4': 'noatime,lazytime'}
+        fstab = Fstab()
+        fstab.add_entry('/dev/sda2', '/', 'ext4', eligible_for_mount=False)
+        fstab.add_entry('/dev/sda3', '/home', 'ext4', 'defaults')
+        fstab.add_entry('/dev/sda1', '/boot/efi', 'vfat', 'defaults')
+        self.mount_os.mount_system(fstab)
+        mock_MountBackend.remount.assert_called_once_with('some', 'noatime,lazytime')
+        assert mock_MountBackend.mount.call_args_list[:2] == [
+            call('/dev/sda3', 'some/home', 'ext4', 'defaults,noatime,lazytime'),
+            call('/dev/sda1', 'some/boot/efi', 'vfat', 'defaults'),
+        ]
+        # the ledger keeps the options of the system to migrate
+        assert call('/dev/sda3', 'some/home', 'ext4', 'defaults', eligible_for_mount=True) in (
+            mock_MountLedger.return_value.add_entry.call_args_list
+        )
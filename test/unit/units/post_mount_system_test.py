@@ -28,8 +28,10 @@ class TestPostMountSystem(object):
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.defaults.Defaults.get_system_root_path')
     @patch('shutil.copy')
+    @patch('suse_migration_services.path.Path.create')
     def test_main(
         self,
+        mock_Path_create,
         mock_shutil_copy,
         mock_get_system_root_path,
         mock_Command_run,
@@ -61,9 +63,11 @@ class TestPostMountSystem(object):
             call('../data/etc/sysconfig/proxy', '/etc/sysconfig'),
             call('../data/etc/sysctl.conf', '/etc'),
         ]
+        assert mock_Path_create.call_args_list == [
+            call('/etc/udev/rules.d'),
+            call('/etc/sysconfig'),
+        ]
         assert mock_Command_run.call_args_list == [
-            call(['mkdir', '-p', '/etc/udev/rules.d']),
-            call(['mkdir', '-p', '/etc/sysconfig']),
             call(['udevadm', 'control', '--reload']),
             call(['udevadm', 'trigger', '--type=subsystems', '--action=add']),
             call(['udevadm', 'trigger', '--type=devices', '--action=add']),
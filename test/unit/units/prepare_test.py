@@ -9,7 +9,6 @@ from pytest import raises
 from suse_migration_services.units.prepare import main, PrepareMigration
 
 from suse_migration_services.suse_connect import SUSEConnect
-from suse_migration_services.fstab import Fstab
 from suse_migration_services.exceptions import DistMigrationZypperMetaDataException
 
 
@@ -27,7 +26,7 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch(
         'suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_client_file_location'
@@ -36,33 +35,32 @@ class TestSetupPrepare:
     @patch('os.listdir')
     @patch('builtins.open')
     @patch('os.path.exists')
+    @patch('suse_migration_services.units.prepare.SetupHostNetwork')
+    @patch('suse_migration_services.units.prepare.MountBackend')
     def test_main_raises_on_zypp_bind(
         self,
+        mock_MountBackend,
+        mock_SetupHostNetwork,
         mock_os_path_exists,
         mock_open,
         mock_os_listdir,
         mock_shutil_copy,
         mock_get_regionsrv_client_file_location,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
         mock_os_listdir.return_value = None
         mock_os_path_exists.return_value = True
-        mock_Command_run.side_effect = [
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
-            Exception,
-        ]
+        mock_MountBackend.bind.side_effect = Exception
         with raises(DistMigrationZypperMetaDataException):
             main()
+        mock_MountBackend.bind.assert_called_once_with('/system-root/etc/zypp', '/etc/zypp')
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_certs_path')
     @patch(
@@ -79,7 +77,7 @@ class TestSetupPrepare:
         mock_get_regionsrv_client_file_location,
         mock_get_regionsrv_certs_path,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -104,20 +102,24 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch(
         'suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_client_file_location'
     )
     @patch('shutil.copy')
     @patch('os.listdir')
+    @patch('suse_migration_services.units.prepare.SetupHostNetwork')
+    @patch('suse_migration_services.units.prepare.MountBackend')
     def test_main_raises_on_regionsrv_client_file_exists(
         self,
+        mock_MountBackend,
+        mock_SetupHostNetwork,
         mock_os_listdir,
         mock_shutil_copy,
         mock_get_regionsrv_client_file_location,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -136,7 +138,7 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch(
         'suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_client_file_location'
@@ -145,32 +147,31 @@ class TestSetupPrepare:
     @patch('os.listdir')
     @patch('builtins.open')
     @patch('os.path.exists')
+    @patch('suse_migration_services.units.prepare.SetupHostNetwork')
+    @patch('suse_migration_services.units.prepare.MountBackend')
     def test_main_raises_and_umount_file_system(
         self,
+        mock_MountBackend,
+        mock_SetupHostNetwork,
         mock_os_path_exists,
         mock_open_hosts_file,
         mock_os_listdir,
         mock_shutil_copy,
         mock_get_regionsrv_client_file_location,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
-        fstab = Fstab()
-        fstab_mock = Mock()
-        fstab_mock.read.return_value = fstab.read('../data/bind-mounted.fstab')
-        fstab_mock.get_devices.return_value = fstab.get_devices()
-        fstab_mock.export.side_effect = Exception
-        mock_Fstab.return_value = fstab_mock
+        system_mount = Mock()
+        system_mount.sync.side_effect = Exception
+        mock_MountLedger.return_value = system_mount
         mock_os_path_exists.return_value = True
         with raises(DistMigrationZypperMetaDataException):
             main()
             assert mock_Command_run.call_args_list == [
                 call(['ip', 'a'], raise_on_error=False),
                 call(['ip', 'r'], raise_on_error=False),
-                call(['cat', '/etc/resolv.conf'], raise_on_error=False),
-                call(['cat', '/proc/net/bonding/bond*'], raise_on_error=False),
                 call(['umount', '/system-root/sys'], raise_on_error=False),
                 call(['umount', '/system-root/proc'], raise_on_error=False),
                 call(['umount', '/system-root/dev'], raise_on_error=False),
@@ -178,7 +179,7 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_certs_path')
     @patch('os.path.isfile')
@@ -191,8 +192,12 @@ class TestSetupPrepare:
     @patch('os.path.islink')
     @patch('os.readlink')
     @patch('os.path.exists')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.prepare.MountBackend')
     def test_main(
         self,
+        mock_MountBackend,
+        mock_Command_run_many,
         mock_os_path_exists,
         mock_readlink,
         mock_os_path_islink,
@@ -205,7 +210,7 @@ class TestSetupPrepare:
         mock_is_file,
         mock_get_regionsrv_certs_path,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -230,26 +235,24 @@ class TestSetupPrepare:
         migration_config = Mock()
         migration_config.is_zypper_migration_plugin_requested.return_value = True
         mock_MigrationConfig.return_value = migration_config
-        fstab = Mock()
-        mock_Fstab.return_value = fstab
+        system_mount = Mock()
+        mock_MountLedger.return_value = system_mount
         mock_os_listdir.side_effect = [['foo', 'bar'], ['foo', 'bar'], ['fooSMT'], ['fooSMT']]
         mock_os_path_islink.side_effect = [False, False, False, True]
         mock_os_path_exists.side_effect = exists_side_effect
         mock_is_registered.return_value = True
         mock_Command_run.side_effect = [
-            MagicMock(),
-            MagicMock(),
-            Exception('no zypper log'),
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
             MagicMock(),
             MagicMock(),
             MagicMock(),
         ]
+        mock_MountBackend.bind.side_effect = [
+            Exception('no zypper log'),
+            None,
+            None,
+            None,
+            None,
+        ]
         mock_shutil_copy.side_effect = [
             MagicMock(),
             MagicMock(),
@@ -282,49 +285,33 @@ class TestSetupPrepare:
         assert mock_Command_run.call_args_list == [
             call(['update-ca-certificates']),
             call(['update-ca-certificates']),
-            call(['mount', '--bind', '/system-root/var/log/zypper.log', '/var/log/zypper.log']),
-            call(['ip', 'a'], raise_on_error=False),
-            call(['ip', 'r'], raise_on_error=False),
-            call(['cat', '/etc/resolv.conf'], raise_on_error=False),
-            call(['cat', '/proc/net/bonding/bond*'], raise_on_error=False),
-            call(['mount', '--bind', '/system-root/etc/zypp', '/etc/zypp']),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/usr/lib/zypp/plugins/services',
-                    '/usr/lib/zypp/plugins/services',
-                ]
-            ),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/var/cache/cloudregister',
-                    '/var/cache/cloudregister',
-                ]
-            ),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/var/lib/regionService/certs',
-                    '/var/lib/regionService/certs',
-                ]
-            ),
             call(['/usr/sbin/updatesmtcache']),
         ]
-        fstab.read.assert_called_once_with('/etc/system-root.fstab')
-        assert fstab.add_entry.call_args_list == [
+        assert mock_MountBackend.bind.call_args_list == [
+            call('/system-root/var/log/zypper.log', '/var/log/zypper.log'),
             call('/system-root/etc/zypp', '/etc/zypp'),
             call('/system-root/usr/lib/zypp/plugins/services', '/usr/lib/zypp/plugins/services'),
+            call('/system-root/var/cache/cloudregister', '/var/cache/cloudregister'),
+            call('/system-root/var/lib/regionService/certs', '/var/lib/regionService/certs'),
         ]
-        fstab.export.assert_called_once_with('/etc/system-root.fstab')
-        mock_Command_run.assert_any_call(['cat', '/proc/net/bonding/bond*'], raise_on_error=False)
+        assert system_mount.add_entry.call_args_list == [
+            call('/system-root/etc/zypp', '/etc/zypp'),
+            call('/system-root/usr/lib/zypp/plugins/services', '/usr/lib/zypp/plugins/services'),
+            call('/system-root/var/cache/cloudregister', '/var/cache/cloudregister'),
+            call('/system-root/var/lib/regionService/certs', '/var/lib/regionService/certs'),
+        ]
+        system_mount.sync.assert_called_once_with()
+        mock_Command_run_many.assert_called_once_with(
+            [
+                ['ip', 'a'],
+                ['ip', 'r'],
+            ],
+            raise_on_error=False,
+        )
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_certs_path')
     @patch(
@@ -336,8 +323,12 @@ class TestSetupPrepare:
     @patch('shutil.copy')
     @patch('os.listdir')
     @patch('os.path.exists')
+    @patch('suse_migration_services.units.prepare.SetupHostNetwork')
+    @patch('suse_migration_services.units.prepare.MountBackend')
     def test_main_no_registered_instance(
         self,
+        mock_MountBackend,
+        mock_SetupHostNetwork,
         mock_os_path_exists,
         mock_os_listdir,
         mock_shutil_copy,
@@ -347,15 +338,15 @@ class TestSetupPrepare:
         mock_get_regionsrv_client_file_location,
         mock_get_regionsrv_certs_path,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
         migration_config = Mock()
         migration_config.is_zypper_migration_plugin_requested.return_value = True
         mock_MigrationConfig.return_value = migration_config
-        fstab = Mock()
-        mock_Fstab.return_value = fstab
+        system_mount = Mock()
+        mock_MountLedger.return_value = system_mount
         # need to override the get_regionsrv_certs_path() call to avoid
         # introducing a additional open() call
         mock_get_regionsrv_certs_path.return_value = '/var/lib/regionService/certs'
@@ -367,36 +358,35 @@ class TestSetupPrepare:
                 main()
 
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch(
         'suse_migration_services.units.prepare.PrepareMigration.get_regionsrv_client_file_location'
     )
     @patch('os.path.exists')
-    @patch('glob.iglob')
-    @patch('os.path.islink')
-    @patch('os.path.realpath')
+    @patch('suse_migration_services.units.prepare.DeviceAliases')
+    @patch('suse_migration_services.units.prepare.MountInfo')
     def test_update_regionsrv_setup(
         self,
-        mock_os_path_realpath,
-        mock_os_path_islink,
-        mock_glob_iglob,
+        mock_MountInfo,
+        mock_DeviceAliases,
         mock_os_path_exists,
         mock_get_regionsrv_client_file_location,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
     ):
-        # test with volume based block device returned from findmnt
-        mock_glob_iglob.return_value = ['/dev/disk/by-id/1234-5678']
-        mock_os_path_islink.return_value = True
-        mock_os_path_realpath.return_value = '/dev/sda'
+        # test with partition based root mount
+        mock_MountInfo.get_source.return_value = '/dev/sda3'
+        mock_DeviceAliases.get_aliases.return_value = [
+            '/dev/disk/by-id/1234-5678',
+            '/dev/disk/by-id/wwn-0x1234',
+        ]
         mock_command_return_values = [
             Mock(output='/dev/sda3 part\n/dev/sda disk'),
-            Mock(output='/dev/sda3[/@/.snapshots/1/snapshot]\n'),
         ]
 
-        def command_returns(arg):
+        def command_returns(arg, cache=False):
             return mock_command_return_values.pop()
 
         mock_Command_run.side_effect = command_returns
@@ -408,19 +398,12 @@ class TestSetupPrepare:
 
         self.prepare.update_regionsrv_setup()
 
+        mock_MountInfo.get_source.assert_called_once_with('/system-root')
         assert mock_Command_run.call_args_list == [
             call(
-                [
-                    'findmnt',
-                    '--first',
-                    '--noheadings',
-                    '--output',
-                    'SOURCE',
-                    '--mountpoint',
-                    '/system-root',
-                ]
+                ['lsblk', '-p', '-n', '-r', '-s', '-o', 'NAME,TYPE', '/dev/sda3'],
+                cache=True,
             ),
-            call(['lsblk', '-p', '-n', '-r', '-s', '-o', 'NAME,TYPE', '/dev/sda3']),
         ]
         regionsrv_setup = ConfigParser()
         regionsrv_setup.read(tmp_regionserverclnt.name)
@@ -430,11 +413,12 @@ class TestSetupPrepare:
             '--billingTag --attestedData --signature --xml --device /dev/disk/by-id/1234-5678'
         )
 
-        # test with standard block device returned from findmnt
-        mock_os_path_realpath.return_value = '/dev/sdb'
+        mock_DeviceAliases.get_aliases.assert_called_once_with('/dev/sda', 'by-id')
+
+        # test with another root disk
+        mock_MountInfo.get_source.return_value = '/dev/sdb7'
         mock_command_return_values = [
             Mock(output='/dev/sdb7 part\n/dev/sdb disk'),
-            Mock(output='dev/sdb7\n'),
         ]
         shutil.copy('../data/regionserverclnt-azure.cfg', tmp_regionserverclnt.name)
         self.prepare.update_regionsrv_setup()
@@ -446,10 +430,24 @@ class TestSetupPrepare:
             == '/usr/bin/azuremetadata --api latest --subscriptionId '
             '--billingTag --attestedData --signature --xml --device /dev/disk/by-id/1234-5678'
         )
+        assert mock_DeviceAliases.get_aliases.call_args == call('/dev/sdb', 'by-id')
+
+        # test without by-id device
+        mock_DeviceAliases.get_aliases.return_value = []
+        mock_command_return_values = [
+            Mock(output='/dev/sdb7 part\n/dev/sdb disk'),
+        ]
+        assert self.prepare.get_root_disk_device() is None
+
+        # test without root mount
+        mock_MountInfo.get_source.return_value = None
+        mock_Command_run.reset_mock()
+        assert self.prepare.get_root_disk_device() is None
+        assert not mock_Command_run.called
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch('os.listdir')
     @patch('os.path.isdir')
@@ -460,7 +458,7 @@ class TestSetupPrepare:
         mock_path_isdir,
         mock_os_listdir,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -470,7 +468,7 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     @patch('os.path.isdir')
     @patch('os.path.exists')
@@ -479,7 +477,7 @@ class TestSetupPrepare:
         mock_os_path_exists,
         mock_path_isdir,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -489,12 +487,12 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     def test_get_regionsrv_certs_path_certlocation(
         self,
         mock_Command_run,
-        mock_Fstab,
+        mock_MountLedger,
         mock_logger_setup,
         mock_update_regionsrv_setup,
     ):
@@ -525,10 +523,10 @@ class TestSetupPrepare:
 
     @patch('suse_migration_services.units.prepare.PrepareMigration.update_regionsrv_setup')
     @patch('suse_migration_services.logger.Logger.setup')
-    @patch('suse_migration_services.units.prepare.Fstab')
+    @patch('suse_migration_services.units.prepare.MountLedger')
     @patch('suse_migration_services.command.Command.run')
     def test_report_if_regionsrv_certs_not_found(
-        self, mock_Command_run, mock_Fstab, mock_logger_setup, mock_update_regionsrv_setup
+        self, mock_Command_run, mock_MountLedger, mock_logger_setup, mock_update_regionsrv_setup
     ):
         tmp_certs_dir = mkdtemp()
 
@@ -4,6 +4,8 @@ from pytest import fixture
 from suse_migration_services.units.reboot import main
 from suse_migration_services.fstab import Fstab
 from suse_migration_services.defaults import Defaults
+from suse_migration_services.mount_info import MountInfo
+from suse_migration_services.exceptions import DistMigrationCommandException
 
 
 class TestKernelReboot(object):
@@ -16,8 +18,10 @@ class TestKernelReboot(object):
     @patch('suse_migration_services.logger.Logger.setup')
     @patch.object(Defaults, 'get_migration_config_file')
     @patch('suse_migration_services.units.reboot.MigrationConfig')
+    @patch('suse_migration_services.units.reboot.CommandTrace.summarize')
     def test_main_skip_reboot_due_to_debug_file_set(
         self,
+        mock_CommandTrace_summarize,
         mock_MigrationConfig,
         mock_config_file,
         mock_logger_setup,
@@ -27,19 +31,28 @@ class TestKernelReboot(object):
         config = Mock()
         config.is_debug_requested.return_value = True
         mock_MigrationConfig.return_value = config
+        mock_CommandTrace_summarize.return_value = 'suse-migration: 1 commands in 0.1s'
         with self._caplog.at_level(logging.INFO):
             main()
             assert 'Reboot skipped due to debug flag set' in self._caplog.text
+            assert 'suse-migration: 1 commands in 0.1s' in self._caplog.text
 
     @patch('os.path.exists')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.logger.Logger.setup')
     @patch.object(Defaults, 'get_migration_config_file')
     @patch.object(Defaults, 'get_system_migration_custom_config_file')
-    @patch('suse_migration_services.units.reboot.Fstab')
+    @patch('suse_migration_services.units.reboot.MountBackend')
+    @patch('suse_migration_services.units.reboot.MountLedger')
+    @patch.object(MountInfo, 'mountinfo_file', '../data/mountinfo')
+    @patch('suse_migration_services.units.reboot.MigrationConfig.get_mount_option_overlay')
+    @patch('os.sync')
     def test_main_kexec_reboot(
         self,
-        mock_Fstab,
+        mock_os_sync,
+        mock_get_mount_option_overlay,
+        mock_MountLedger,
+        mock_MountBackend,
         mock_get_system_migration_custom_config_file,
         mock_get_migration_config_file,
         mock_logger_setup,
@@ -56,29 +69,69 @@ class TestKernelReboot(object):
         fstab_mock = Mock()
         fstab_mock.read.return_value = fstab.read('../data/system-root.fstab')
         fstab_mock.get_devices.return_value = fstab.get_devices()
-        mock_Fstab.return_value = fstab_mock
+        mock_MountLedger.return_value.get_fstab.return_value = fstab_mock
         mock_get_migration_config_file.return_value = '../data/migration-config.yml'
         mock_get_system_migration_custom_config_file.return_value = (
             '../data/migration-config-soft-reboot.yml'
         )
-        main()
+
+        def umount_unless_busy(mountpoint):
+            if mountpoint == '/system-root/tmp':
+                raise DistMigrationCommandException(
+                    "umount: [Errno 22] Invalid argument: '/system-root/tmp'"
+                )
+            return mountpoint != '/system-root/home'
+
+        mock_MountBackend.umount_unless_busy.side_effect = umount_unless_busy
+        mock_get_mount_option_overlay.return_value = {'ext4': 'noatime,lazytime'}
+        MountInfo.refresh()
+        with self._caplog.at_level(logging.INFO):
+            main()
+            mock_os_sync.assert_called_once_with()
+            assert 'Umounted /system-root/boot/efi in' in self._caplog.text
+            assert 'Umounted /system-root/home (busy, lazily detached) in' in self._caplog.text
+            assert 'Busy mounts lazily detached: /system-root/home' in self._caplog.text
+            assert (
+                'Umount of /system-root/tmp failed: '
+                "umount: [Errno 22] Invalid argument: '/system-root/tmp'" in self._caplog.text
+            )
+            assert 'Failed to umount: /system-root/tmp' in self._caplog.text
+            assert 'Umounted /system-root/tmp' not in self._caplog.text
+        MountInfo.refresh()
         assert mock_Command_run.call_args_list == [
             call(['systemctl', 'stop', 'suse-migration-console-log'], raise_on_error=False),
-            call(['umount', '--lazy', '/system-root/boot/efi'], raise_on_error=False),
-            call(['umount', '--lazy', '/system-root/home'], raise_on_error=False),
-            call(['umount', '--lazy', '/system-root/'], raise_on_error=False),
             call(['systemctl', 'kexec']),
         ]
+        umount_calls = mock_MountBackend.umount_unless_busy.call_args_list
+        # leaves first, the mounts of one level in any order
+        assert sorted(umount_calls[:4], key=str) == [
+            call('/system-root/boot/efi'),
+            call('/system-root/home/my data'),
+            call('/system-root/proc'),
+            call('/system-root/tmp'),
+        ]
+        assert sorted(umount_calls[4:6], key=str) == [
+            call('/system-root'),
+            call('/system-root/home'),
+        ]
+        assert umount_calls[6:] == [call('/system-root')]
+        # only the busy mountpoint is lazily detached
+        assert mock_MountBackend.umount.call_args_list == [
+            call('/system-root/home', lazy=True, raise_on_error=False)
+        ]
 
     @patch('os.path.exists')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.logger.Logger.setup')
     @patch.object(Defaults, 'get_migration_config_file')
     @patch.object(Defaults, 'get_system_migration_custom_config_file')
-    @patch('suse_migration_services.units.reboot.Fstab')
+    @patch('suse_migration_services.units.reboot.MountBackend')
+    @patch('suse_migration_services.units.reboot.MountLedger')
+    @patch.object(MountInfo, 'mountinfo_file', '../data/mountinfo')
     def test_main_force_reboot(
         self,
-        mock_Fstab,
+        mock_MountLedger,
+        mock_MountBackend,
         mock_get_system_migration_custom_config_file,
         mock_get_migration_config_file,
         mock_logger_setup,
@@ -95,11 +148,8 @@ class TestKernelReboot(object):
         fstab_mock = Mock()
         fstab_mock.read.return_value = fstab.read('../data/system-root.fstab')
         fstab_mock.get_devices.return_value = fstab.get_devices()
-        mock_Fstab.return_value = fstab_mock
+        mock_MountLedger.return_value.get_fstab.return_value = fstab_mock
         mock_Command_run.side_effect = [
-            MagicMock(),
-            MagicMock(),
-            MagicMock(),
             MagicMock(),
             Exception,
             None,
@@ -108,14 +158,14 @@ class TestKernelReboot(object):
         mock_get_system_migration_custom_config_file.return_value = (
             '../data/migration-config-hard-reboot.yml'
         )
+        MountInfo.refresh()
         with self._caplog.at_level(logging.WARNING):
             main()
+            MountInfo.refresh()
             assert mock_Command_run.call_args_list == [
                 call(['systemctl', 'stop', 'suse-migration-console-log'], raise_on_error=False),
-                call(['umount', '--lazy', '/system-root/boot/efi'], raise_on_error=False),
-                call(['umount', '--lazy', '/system-root/home'], raise_on_error=False),
-                call(['umount', '--lazy', '/system-root/'], raise_on_error=False),
                 call(['systemctl', 'reboot']),
                 call(['systemctl', '--force', 'reboot']),
             ]
             assert 'Reboot system: [Force Reboot]' in self._caplog.text
+            assert mock_MountBackend.umount_unless_busy.call_args_list[-1] == call('/system-root')
@@ -28,15 +28,17 @@ class TestRegenInitrd:
     @patch('os.path.exists')
     @patch.object(Defaults, 'get_migration_config_file')
     @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.units.regenerate_initrd.MountBackend')
     def test_main_raises_on_regenerate_initrd(
         self,
+        mock_MountBackend,
         mock_Command_run,
         mock_get_migration_config_file,
         mock_os_path_exists,
         mock_logger_setup,
     ):
         mock_get_migration_config_file.return_value = '../data/migration-config-initrd.yml'
-        mock_Command_run.side_effect = [None, None, None, Exception('error')]
+        mock_Command_run.side_effect = Exception('error')
         with self._caplog.at_level(logging.ERROR):
             with raises(DistMigrationCommandException):
                 main()
@@ -59,16 +61,16 @@ class TestRegenInitrd:
     @patch('suse_migration_services.logger.Logger.setup')
     @patch('os.path.exists')
     @patch.object(Defaults, 'get_migration_config_file')
-    @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.units.regenerate_initrd.MountBackend')
     def test_dracut_bind_mounts_raises_on_regen_initrd(
         self,
-        mock_Command_run,
+        mock_MountBackend,
         mock_get_migration_config_file,
         mock_os_path_exists,
         mock_logger_setup,
     ):
         mock_get_migration_config_file.return_value = '../data/migration-config-initrd.yml'
-        mock_Command_run.side_effect = [Exception('error'), Exception('error'), Exception('error')]
+        mock_MountBackend.bind.side_effect = Exception('error')
         with self._caplog.at_level(logging.ERROR):
             with raises(DistMigrationCommandException):
                 self.dracut._dracut_bind_mounts()
@@ -77,8 +79,10 @@ class TestRegenInitrd:
     @patch('os.path.exists')
     @patch.object(Defaults, 'get_migration_config_file')
     @patch('suse_migration_services.command.Command.run')
+    @patch('suse_migration_services.units.regenerate_initrd.MountBackend')
     def test_main(
         self,
+        mock_MountBackend,
         mock_Command_run,
         mock_get_migration_config_file,
         mock_os_path_exists,
@@ -86,31 +90,12 @@ class TestRegenInitrd:
     ):
         mock_get_migration_config_file.return_value = '../data/migration-config-initrd.yml'
         main()
+        assert mock_MountBackend.bind.call_args_list == [
+            call('/dev', '/system-root/dev'),
+            call('/proc', '/system-root/proc'),
+            call('/sys', '/system-root/sys'),
+        ]
         assert mock_Command_run.call_args_list == [
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/dev',
-                    '/system-root/dev',
-                ]
-            ),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/proc',
-                    '/system-root/proc',
-                ]
-            ),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/sys',
-                    '/system-root/sys',
-                ]
-            ),
             call(
                 [
                     'bash',
@@ -2,7 +2,11 @@ from unittest.mock import patch, call, Mock
 from pytest import raises
 
 from suse_migration_services.units.setup_host_network import main, container, SetupHostNetwork
-from suse_migration_services.exceptions import DistMigrationHostNetworkException
+from suse_migration_services.exceptions import (
+    DistMigrationCommandException,
+    DistMigrationHostNetworkException,
+)
+from suse_migration_services.command_deadline import CommandDeadline
 from suse_migration_services.defaults import Defaults
 
 
@@ -14,27 +18,38 @@ class TestSetupHostNetwork:
 
     @patch('suse_migration_services.logger.Logger.setup')
     def setup_method(self, cls, mock_Logger_setup):
+        CommandDeadline._timeouts.clear()
         self.setup()
 
+    def teardown_method(self, cls):
+        CommandDeadline._timeouts.clear()
+
     @patch('suse_migration_services.logger.Logger.setup')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.setup_host_network.Fstab')
+    @patch('suse_migration_services.units.setup_host_network.MountLedger')
     @patch('os.path.exists')
     @patch('shutil.copy')
+    @patch('suse_migration_services.units.setup_host_network.MountBackend')
     def test_main_raises_on_host_network_activation(
-        self, mock_shutil_copy, mock_os_path_exists, mock_Fstab, mock_Command_run, mock_logger_setup
+        self,
+        mock_MountBackend,
+        mock_shutil_copy,
+        mock_os_path_exists,
+        mock_MountLedger,
+        mock_Command_run,
+        mock_logger_setup,
     ):
         mock_os_path_exists.return_value = True
-        mock_Command_run.side_effect = Exception
+        mock_MountBackend.bind.side_effect = Exception
         with raises(DistMigrationHostNetworkException):
             self.host_network.perform(container=False)
         assert not mock_shutil_copy.called
 
+    @patch('suse_migration_services.units.setup_host_network.MountBackend')
     @patch('suse_migration_services.units.setup_host_network.Path')
     @patch('suse_migration_services.units.setup_host_network.MigrationConfig')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.setup_host_network.Fstab')
-    @patch('os.makedirs')
+    @patch('suse_migration_services.units.setup_host_network.MountLedger')
     @patch('os.path.exists')
     @patch('shutil.copy')
     @patch('glob.glob')
@@ -47,14 +62,14 @@ class TestSetupHostNetwork:
         mock_glob,
         mock_shutil_copy,
         mock_os_path_exists,
-        mock_os_mkdirs,
-        mock_Fstab,
+        mock_MountLedger,
         mock_Command_run,
         mock_MigrationConfig,
         mock_Path,
+        mock_MountBackend,
     ):
-        fstab = Mock()
-        mock_Fstab.return_value = fstab
+        system_mount = Mock()
+        mock_MountLedger.return_value = system_mount
         mock_glob.return_value = [
             '/system-root/etc/sysconfig/network/ifcfg-eth0',
             '/system-root/etc/sysconfig/network/dhcp',
@@ -69,63 +84,48 @@ class TestSetupHostNetwork:
             call('/system-root/etc/sysconfig/network/dhcp', '/etc/sysconfig/network'),
         ]
         assert mock_Command_run.call_args_list == [
-            call(['mount', '--bind', '/system-root/etc/NetworkManager', '/etc/NetworkManager']),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/usr/lib/NetworkManager',
-                    '/usr/lib/NetworkManager',
-                ]
-            ),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
+            call(['systemctl', 'stop', 'NetworkManager']),
+        ]
+        assert mock_MountBackend.bind.call_args_list == [
+            call('/system-root/etc/NetworkManager', '/etc/NetworkManager'),
+            call('/system-root/usr/lib/NetworkManager', '/usr/lib/NetworkManager'),
             call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/etc/sysconfig/network/providers',
-                    '/etc/sysconfig/network/providers',
-                ]
+                '/system-root/etc/sysconfig/network/providers', '/etc/sysconfig/network/providers'
             ),
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
-            call(['systemctl', 'stop', 'NetworkManager']),
-            call(['touch', '/system-root/run/NetworkManager/resolv.conf']),
             call(
-                [
-                    'mount',
-                    '--bind',
-                    '-o',
-                    'ro',
-                    '/etc/resolv.conf',
-                    '/system-root/run/NetworkManager/resolv.conf',
-                ]
+                '/etc/resolv.conf',
+                '/system-root/run/NetworkManager/resolv.conf',
+                read_only=True,
             ),
-            call(['touch', '/system-root/run/netconfig/resolv.conf']),
             call(
-                [
-                    'mount',
-                    '--bind',
-                    '-o',
-                    'ro',
-                    '/etc/resolv.conf',
-                    '/system-root/run/netconfig/resolv.conf',
-                ]
+                '/etc/resolv.conf',
+                '/system-root/run/netconfig/resolv.conf',
+                read_only=True,
             ),
         ]
-        fstab.read.assert_called_once_with('/etc/system-root.fstab')
-        assert fstab.add_entry.call_args_list == [
+        assert mock_Path.create.call_args_list[-2:] == [
+            call('/system-root/run/NetworkManager'),
+            call('/system-root/run/netconfig'),
+        ]
+        assert mock_Path.touch.call_args_list == [
+            call('/system-root/run/NetworkManager/resolv.conf'),
+            call('/system-root/run/netconfig/resolv.conf'),
+        ]
+        assert system_mount.add_entry.call_args_list == [
             call('/system-root/etc/NetworkManager', '/etc/NetworkManager'),
             call('/system-root/usr/lib/NetworkManager', '/usr/lib/NetworkManager'),
             call(
                 '/system-root/etc/sysconfig/network/providers', '/etc/sysconfig/network/providers'
             ),
         ]
-        fstab.export.assert_called_once_with('/etc/system-root.fstab')
+        system_mount.sync.assert_called_once_with()
 
+    @patch('suse_migration_services.units.setup_host_network.MountBackend')
     @patch('suse_migration_services.units.setup_host_network.Path')
     @patch('suse_migration_services.units.setup_host_network.MigrationConfig')
     @patch('suse_migration_services.command.Command.run')
-    @patch('suse_migration_services.units.setup_host_network.Fstab')
-    @patch('os.makedirs')
+    @patch('suse_migration_services.units.setup_host_network.MountLedger')
     @patch('os.path.exists')
     @patch('shutil.copy')
     @patch('glob.glob')
@@ -138,14 +138,14 @@ class TestSetupHostNetwork:
         mock_glob,
         mock_shutil_copy,
         mock_os_path_exists,
-        mock_os_mkdirs,
-        mock_Fstab,
+        mock_MountLedger,
         mock_Command_run,
         mock_MigrationConfig,
         mock_Path,
+        mock_MountBackend,
     ):
-        fstab = Mock()
-        mock_Fstab.return_value = fstab
+        system_mount = Mock()
+        mock_MountLedger.return_value = system_mount
         mock_glob.return_value = [
             '/system-root/etc/sysconfig/network/ifcfg-eth0',
             '/system-root/etc/sysconfig/network/dhcp',
@@ -160,58 +160,43 @@ class TestSetupHostNetwork:
             call('/system-root/etc/sysconfig/network/dhcp', '/etc/sysconfig/network'),
         ]
         assert mock_Command_run.call_args_list == [
-            call(['mount', '--bind', '/system-root/etc/NetworkManager', '/etc/NetworkManager']),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/usr/lib/NetworkManager',
-                    '/usr/lib/NetworkManager',
-                ]
-            ),
-            call(
-                [
-                    'mount',
-                    '--bind',
-                    '/system-root/etc/sysconfig/network/providers',
-                    '/etc/sysconfig/network/providers',
-                ]
-            ),
             call(['systemctl', 'restart', 'network']),
             call(['nm-online', '-q']),
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
-            call(['touch', '/system-root/run/NetworkManager/resolv.conf']),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
+        ]
+        assert mock_MountBackend.bind.call_args_list == [
+            call('/system-root/etc/NetworkManager', '/etc/NetworkManager'),
+            call('/system-root/usr/lib/NetworkManager', '/usr/lib/NetworkManager'),
             call(
-                [
-                    'mount',
-                    '--bind',
-                    '-o',
-                    'ro',
-                    '/etc/resolv.conf',
-                    '/system-root/run/NetworkManager/resolv.conf',
-                ]
+                '/system-root/etc/sysconfig/network/providers', '/etc/sysconfig/network/providers'
             ),
-            call(['touch', '/system-root/run/netconfig/resolv.conf']),
             call(
-                [
-                    'mount',
-                    '--bind',
-                    '-o',
-                    'ro',
-                    '/etc/resolv.conf',
-                    '/system-root/run/netconfig/resolv.conf',
-                ]
+                '/etc/resolv.conf',
+                '/system-root/run/NetworkManager/resolv.conf',
+                read_only=True,
+            ),
+            call(
+                '/etc/resolv.conf',
+                '/system-root/run/netconfig/resolv.conf',
+                read_only=True,
             ),
         ]
-        fstab.read.assert_called_once_with('/etc/system-root.fstab')
-        assert fstab.add_entry.call_args_list == [
+        assert mock_Path.create.call_args_list[-2:] == [
+            call('/system-root/run/NetworkManager'),
+            call('/system-root/run/netconfig'),
+        ]
+        assert mock_Path.touch.call_args_list == [
+            call('/system-root/run/NetworkManager/resolv.conf'),
+            call('/system-root/run/netconfig/resolv.conf'),
+        ]
+        assert system_mount.add_entry.call_args_list == [
             call('/system-root/etc/NetworkManager', '/etc/NetworkManager'),
             call('/system-root/usr/lib/NetworkManager', '/usr/lib/NetworkManager'),
             call(
                 '/system-root/etc/sysconfig/network/providers', '/etc/sysconfig/network/providers'
             ),
         ]
-        fstab.export.assert_called_once_with('/etc/system-root.fstab')
+        system_mount.sync.assert_called_once_with()
 
     @patch('os.path.exists')
     @patch('suse_migration_services.command.Command.run')
@@ -228,9 +213,11 @@ class TestSetupHostNetwork:
 
         self.host_network.wicked2nm_migrate(activate_connections=False)
         assert mock_Command_run.call_args_list == [
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
             call(
-                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'], raise_on_error=False
+                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'],
+                raise_on_error=False,
+                cache=True,
             ),
             call(
                 [
@@ -259,9 +246,11 @@ class TestSetupHostNetwork:
 
         self.host_network.wicked2nm_migrate()
         assert mock_Command_run.call_args_list == [
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
             call(
-                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'], raise_on_error=False
+                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'],
+                raise_on_error=False,
+                cache=True,
             ),
             call(
                 [
@@ -309,9 +298,11 @@ class TestSetupHostNetwork:
 
         self.host_network.wicked2nm_migrate()
         assert mock_Command_run.call_args_list == [
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
             call(
-                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'], raise_on_error=False
+                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'],
+                raise_on_error=False,
+                cache=True,
             ),
         ]
 
@@ -330,9 +321,11 @@ class TestSetupHostNetwork:
 
         self.host_network.wicked2nm_migrate()
         assert mock_Command_run.call_args_list == [
-            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False),
+            call(['rpm', '--query', '--quiet', 'wicked2nm'], raise_on_error=False, cache=True),
             call(
-                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'], raise_on_error=False
+                ['rpm', '--query', '--quiet', 'NetworkManager-config-server'],
+                raise_on_error=False,
+                cache=True,
             ),
             call(
                 [
@@ -349,18 +342,24 @@ class TestSetupHostNetwork:
         ]
 
     @patch('suse_migration_services.logger.Logger.setup')
+    @patch('suse_migration_services.command.Command.run_many')
     @patch('suse_migration_services.command.Command.run')
     @patch('suse_migration_services.units.setup_host_network.MigrationConfig')
     @patch('os.path.exists')
     def test_wicked2nm_migrate_failure(
-        self, mock_os_path_exists, mock_MigrationConfig, mock_Command_run, mock_logger_setup
+        self,
+        mock_os_path_exists,
+        mock_MigrationConfig,
+        mock_Command_run,
+        mock_Command_run_many,
+        mock_logger_setup,
     ):
         mock_os_path_exists.return_value = True
         migration_config = Mock()
         migration_config.get_network_info.return_value = False
         mock_MigrationConfig.return_value = migration_config
 
-        def mock_Command_side_effect(command, custom_env=None, raise_on_error=True):
+        def mock_Command_side_effect(command, custom_env=None, raise_on_error=True, cache=False):
             if 'wicked2nm' in command and 'migrate' in command:
                 raise Exception
             return Mock(self, returncode=0, output="")
@@ -384,6 +383,38 @@ class TestSetupHostNetwork:
             in mock_Command_run.call_args_list
         )
 
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.units.setup_host_network.Path.read')
+    @patch('glob.glob')
+    @patch('os.path.exists')
+    def test_log_network_details(
+        self, mock_os_path_exists, mock_glob, mock_Path_read, mock_Command_run_many
+    ):
+        mock_os_path_exists.return_value = True
+        mock_Command_run_many.return_value = [Mock(output='eth0'), Mock(output='default')]
+        mock_glob.return_value = ['/proc/net/bonding/bond1', '/proc/net/bonding/bond0']
+        mock_Path_read.side_effect = [
+            'nameserver 127.0.0.1',
+            DistMigrationCommandException('cat: gone'),
+            'bond0 details',
+        ]
+        self.host_network.log = Mock()
+        self.host_network.log_network_details()
+        mock_Command_run_many.assert_called_once_with(
+            [['ip', 'a'], ['ip', 'r']], raise_on_error=False
+        )
+        assert mock_Path_read.call_args_list == [
+            call('/etc/resolv.conf'),
+            call('/proc/net/bonding/bond0'),
+            call('/proc/net/bonding/bond1'),
+        ]
+        assert self.host_network.log.info.call_args_list == [
+            call('All Network Interfaces \neth0'),
+            call('Routing Tables \ndefault'),
+            call('DNS Resolver \nnameserver 127.0.0.1'),
+            call('Network Bonding \ncat: gone\nbond0 details'),
+        ]
+
     @patch('suse_migration_services.units.setup_host_network.SetupHostNetwork')
     def test_main(self, mock_SetupHostNetwork):
         host_network = Mock()
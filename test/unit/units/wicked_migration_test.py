@@ -6,6 +6,7 @@ from suse_migration_services.units.wicked_migration import main
 from suse_migration_services.exceptions import DistMigrationWickedMigrationException
 
 
+@patch('suse_migration_services.units.wicked_migration.ChrootExecutor')
 class TestMigrationWicked:
     @patch('suse_migration_services.units.wicked_migration.ResolvConf.setup_target_root')
     @patch.object(DropComponents, 'drop_package')
@@ -19,8 +20,12 @@ class TestMigrationWicked:
     @patch('os.path.lexists')
     @patch('os.path.exists')
     @patch('os.path.islink')
+    @patch('suse_migration_services.command.Command.run_many')
+    @patch('suse_migration_services.path.Path.create')
     def test_main(
         self,
+        mock_Path_create,
+        mock_Command_run_many,
         mock_os_path_islink,
         mock_os_path_exists,
         mock_os_path_lexists,
@@ -33,6 +38,7 @@ class TestMigrationWicked:
         mock_drop_path,
         mock_drop_package,
         mock_resolv_conf_setup_target_root,
+        mock_ChrootExecutor,
     ):
         def package_installed(name):
             if name.startswith('NetworkManager'):
@@ -64,17 +70,21 @@ class TestMigrationWicked:
                 ]
             ),
             call(['systemctl', '--root', '/system-root', 'mask', 'wicked.service']),
-            call(['mkdir', '-p', '/system-root/etc/NetworkManager/system-connections']),
-            call(
+            call(['cp', '-a', '/system-root/etc/resolv.conf', '/tmp/resolv.conf.backup']),
+            call(['cp', '-a', '/tmp/resolv.conf.backup', '/system-root/etc/resolv.conf']),
+        ]
+        mock_Path_create.assert_called_once_with(
+            '/system-root/etc/NetworkManager/system-connections'
+        )
+        mock_Command_run_many.assert_called_once_with(
+            [
                 [
                     'cp',
                     '/etc/NetworkManager/system-connections/some.nmconnection',
                     '/system-root/etc/NetworkManager/system-connections',
                 ]
-            ),
-            call(['cp', '-a', '/system-root/etc/resolv.conf', '/tmp/resolv.conf.backup']),
-            call(['cp', '-a', '/tmp/resolv.conf.backup', '/system-root/etc/resolv.conf']),
-        ]
+            ]
+        )
         mock_resolv_conf_setup_target_root.assert_called_once()
         assert mock_drop_package.call_args_list == [
             call('wicked'),
@@ -84,13 +94,19 @@ class TestMigrationWicked:
         ]
         mock_drop_path.assert_called_once_with('/etc/sysconfig/network/')
         mock_drop_perform.assert_called_once_with()
+        mock_ChrootExecutor.assert_called_once_with('/system-root')
 
     @patch('suse_migration_services.logger.Logger.setup')
     @patch('suse_migration_services.command.Command.run')
     @patch('os.path.exists')
     @patch('os.path.islink')
     def test_main_raises(
-        self, mock_os_path_islink, mock_os_path_exists, mock_Command_run, mock_logger_setup
+        self,
+        mock_os_path_islink,
+        mock_os_path_exists,
+        mock_Command_run,
+        mock_logger_setup,
+        mock_ChrootExecutor,
     ):
         mock_os_path_exists.return_value = True
         mock_Command_run.side_effect = Exception
@@ -100,7 +116,9 @@ class TestMigrationWicked:
     @patch('suse_migration_services.logger.Logger.setup')
     @patch('suse_migration_services.command.Command.run')
     @patch('os.path.islink')
-    def test_main_skip(self, mock_os_path_islink, mock_Command_run, mock_logger_setup):
+    def test_main_skip(
+        self, mock_os_path_islink, mock_Command_run, mock_logger_setup, mock_ChrootExecutor
+    ):
         mock_os_path_islink.return_value = False
         main()
         assert not mock_Command_run.called
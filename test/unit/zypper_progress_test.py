@@ -0,0 +1,168 @@
+from unittest.mock import patch, Mock, call
+
+from suse_migration_services.zypper_progress import (
+    ZypperProgress,
+    ZypperProgressReport,
+    download_event_type,
+    install_event_type,
+    scriptlet_event_type,
+    progress_event_type,
+    message_event_type,
+)
+
+
+class TestZypperProgress(object):
+    def setup_method(self, cls):
+        self.events = []
+        self.progress = ZypperProgress(self.events.append)
+
+    def feed(self, lines):
+        for line in lines:
+            self.progress.feed(line)
+
+    def test_message(self):
+        self.feed(
+            [
+                "<?xml version='1.0'?>",
+                '<stream>',
+                '<message type="warning">multi',
+                'line</message>',
+                'Upgrade path lookup',
+                '</stream>',
+            ]
+        )
+        assert self.events == [
+            message_event_type(type='warning', text='multi\nline'),
+            message_event_type(type='text', text='Upgrade path lookup'),
+        ]
+        assert self.progress.depth == 0
+
+    def test_plain_text_only(self):
+        self.feed(['Executing zypper migration', '', 'No migration available.'])
+        assert self.events == [
+            message_event_type(type='text', text='Executing zypper migration'),
+            message_event_type(type='text', text='No migration available.'),
+        ]
+
+    @patch('time.monotonic')
+    def test_plain_text_progress(self, mock_monotonic):
+        mock_monotonic.side_effect = [10.0, 12.0]
+        self.feed(
+            [
+                'Retrieving package a-1.0-1.x86_64 (1/2), 1.5 KiB (4.0 KiB unpacked)',
+                'Retrieving: a-1.0-1.x86_64.rpm ...........[done (1.2 MiB/s)]',
+                'Retrieving package b-1.0-1.noarch (2/2), 512 B (1 KiB unpacked)',
+                'Retrieving: b-1.0-1.noarch.rpm ...........[error]',
+                '(1/2) Installing: a-1.0-1.x86_64 ...........[done]',
+                '(2/2) Installing: b-1.0-1.noarch ...........[done]',
+                '( 1/2) Running post-transaction scripts',
+            ]
+        )
+        assert self.events == [
+            download_event_type(
+                url='a-1.0-1.x86_64', percent=-1, rate=-1, bytes_downloaded=1536, done=False
+            ),
+            download_event_type(
+                url='a-1.0-1.x86_64.rpm', percent=100, rate=-1, bytes_downloaded=1536, done=True
+            ),
+            download_event_type(
+                url='b-1.0-1.noarch', percent=-1, rate=-1, bytes_downloaded=2048, done=False
+            ),
+            download_event_type(
+                url='b-1.0-1.noarch.rpm', percent=-1, rate=-1, bytes_downloaded=2048, done=False
+            ),
+            install_event_type(
+                current=1, total=2, name='Installing: a-1.0-1.x86_64', rate=0.0, eta=None
+            ),
+            install_event_type(
+                current=2, total=2, name='Installing: b-1.0-1.noarch', rate=0.5, eta=0
+            ),
+            message_event_type(type='text', text='( 1/2) Running post-transaction scripts'),
+        ]
+
+    @patch('time.monotonic')
+    def test_download(self, mock_monotonic):
+        mock_monotonic.side_effect = [10.0, 11.0, 12.0]
+        self.feed(
+            [
+                '<stream>',
+                '<download url="http://repo/a.rpm" percent="-1" rate="-1"/>',
+                '<download url="http://repo/a.rpm" percent="50" rate="1000"/>',
+                '<download url="http://repo/a.rpm" rate="1000" done="1"/>',
+            ]
+        )
+        assert self.events == [
+            download_event_type(
+                url='http://repo/a.rpm', percent=-1, rate=-1, bytes_downloaded=0, done=False
+            ),
+            download_event_type(
+                url='http://repo/a.rpm', percent=50, rate=1000, bytes_downloaded=1000, done=False
+            ),
+            download_event_type(
+                url='http://repo/a.rpm', percent=-1, rate=1000, bytes_downloaded=2000, done=True
+            ),
+        ]
+
+    @patch('time.monotonic')
+    def test_install_and_scriptlets(self, mock_monotonic):
+        mock_monotonic.side_effect = [100.0, 110.0]
+        self.feed(
+            [
+                '<stream>',
+                '<progress id="install-resolvable" name="( 1/21) Installing: a" value="0"/>',
+                '<progress id="install-resolvable" name="( 1/21) Installing: a" value="50"/>',
+                '<progress id="install-resolvable" name="( 1/21) Installing: a" done="1"/>',
+                '<progress id="install-resolvable" name="(11/21) Installing: python-scripts"/>',
+                '<progress id="scripts" name="Running post-transaction scripts" value="0"/>',
+                '<progress id="scripts" name="Running post-transaction scripts" value="90"/>',
+                '<progress id="refresh" name="Refreshing service" value="10"/>',
+            ]
+        )
+        assert self.events == [
+            install_event_type(current=1, total=21, name='Installing: a', rate=0.0, eta=None),
+            install_event_type(
+                current=11, total=21, name='Installing: python-scripts', rate=1.0, eta=10
+            ),
+            scriptlet_event_type(name='Running post-transaction scripts'),
+            progress_event_type(id='refresh', name='Refreshing service', percent=10, done=False),
+        ]
+
+    def test_broken_stream(self):
+        self.feed(
+            [
+                '<stream>',
+                '<progress id="a" name="b" value="1"></broken>',
+                '<message type="info">still working</message>',
+            ]
+        )
+        assert self.events == [message_event_type(type='info', text='still working')]
+
+    def test_constant_memory(self):
+        self.progress.feed('<stream>')
+        for _ in range(100):
+            self.progress.feed('<message type="info">text</message>')
+        assert len(self.progress.stream) == 0
+
+
+class TestZypperProgressReport(object):
+    @patch('time.monotonic')
+    def test_report(self, mock_monotonic):
+        mock_monotonic.side_effect = [0.0, 10.0]
+        log = Mock()
+        report = ZypperProgressReport(log)
+        report.report(
+            download_event_type(
+                url='a', percent=100, rate=1048576, bytes_downloaded=10485760, done=True
+            )
+        )
+        report.report(install_event_type(current=1, total=200, name='a', rate=0.0, eta=None))
+        report.report(install_event_type(current=2, total=200, name='b', rate=1.0, eta=198))
+        report.report(install_event_type(current=3, total=200, name='c', rate=1.0, eta=197))
+        report.report(scriptlet_event_type(name='Running post-transaction scripts'))
+        report.report(message_event_type(type='info', text='text'))
+        assert log.info.call_args_list == [
+            call('Download phase: ~10.0 MiB in 0:00:10 at ~1.0 MiB/sec'),
+            call('Installing 1/200 (0%) at 0.0 packages/sec, ETA: unknown'),
+            call('Installing 2/200 (1%) at 1.0 packages/sec, ETA: 0:03:18'),
+            call('Running: Running post-transaction scripts'),
+        ]
@@ -1,13 +1,14 @@
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, ANY
 from pytest import raises
 from collections import namedtuple
 
 from suse_migration_services.zypper import Zypper, ZypperCall
+from suse_migration_services.zypper_progress import message_event_type
 
 from suse_migration_services.exceptions import DistMigrationZypperException
 
 
-@patch('suse_migration_services.command.Command.run')
+@patch('suse_migration_services.command.Command.run_stream')
 class TestCommand(object):
     @patch('suse_migration_services.zypper.Zypper.run')
     def test_zypper_install(self, mock_Zypper_run, mock_Command_run):
@@ -62,60 +63,98 @@ class TestCommand(object):
             chroot='',
         )
 
-    def test_zypper_run(self, mock_Command_run):
+    @patch('builtins.open')
+    def test_zypper_run(self, mock_open, mock_Command_run):
         command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run_result(output='', error='', returncode=0)
-        Zypper.run(['in', 'test', '--root', '/system-root'])
+        Zypper.run(['in', 'test', '', '--root', '/system-root'])
+        mock_open.assert_called_once_with(
+            '/system-root/var/log/distro_migration.log', 'a', buffering=1
+        )
         mock_Command_run.assert_called_once_with(
-            [
-                'bash',
-                '-c',
-                'set -o pipefail; zypper in test --root /system-root '
-                '|& tee -a /system-root/var/log/distro_migration.log',
-            ],
+            ['zypper', 'in', 'test', '--root', '/system-root'],
+            line_callback=ANY,
             raise_on_error=True,
+            merge_stderr=True,
         )
 
-    def test_zypper_run_chroot(self, mock_Command_run):
+    @patch('builtins.open')
+    def test_zypper_run_chroot(self, mock_open, mock_Command_run):
         command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run_result(output='', error='', returncode=0)
         Zypper.run(['in', 'test', '--root', '/system-root'], chroot='root')
+        mock_open.assert_called_once_with('root/var/log/distro_migration.log', 'a', buffering=1)
         mock_Command_run.assert_called_once_with(
-            [
-                'chroot',
-                'root',
-                'bash',
-                '-c',
-                'set -o pipefail; zypper in test --root /system-root '
-                '|& tee -a /var/log/distro_migration.log',
-            ],
+            ['chroot', 'root', 'zypper', 'in', 'test', '--root', '/system-root'],
+            line_callback=ANY,
             raise_on_error=True,
+            merge_stderr=True,
+        )
+
+    @patch('builtins.open')
+    def test_zypper_run_line_callback(self, mock_open, mock_Command_run):
+        log = mock_open.return_value.__enter__.return_value
+        line_callback = Mock()
+
+        def run_stream(command, line_callback, raise_on_error, merge_stderr):
+            line_callback('Retrieving repository data...')
+            command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
+            return command_run_result(output='', error='', returncode=0)
+
+        mock_Command_run.side_effect = run_stream
+        Zypper.run(['migration'], line_callback=line_callback)
+        log.write.assert_called_once_with('Retrieving repository data...\n')
+        line_callback.assert_called_once_with('Retrieving repository data...')
+
+    @patch('builtins.open')
+    def test_zypper_run_event_callback(self, mock_open, mock_Command_run):
+        event_callback = Mock()
+
+        def run_stream(command, line_callback, raise_on_error, merge_stderr):
+            line_callback('<?xml version="1.0"?>')
+            line_callback('<stream>')
+            line_callback('<message type="info">Loading repository data...</message>')
+            line_callback('</stream>')
+            command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
+            return command_run_result(output='', error='', returncode=0)
+
+        mock_Command_run.side_effect = run_stream
+        Zypper.run(['dup'], event_callback=event_callback)
+        assert mock_Command_run.call_args.args[0] == ['zypper', '--xmlout', 'dup']
+        event_callback.assert_called_once_with(
+            message_event_type(type='info', text='Loading repository data...')
         )
 
-    def test_zypper_raises(self, mock_Command_run):
+    @patch('builtins.open')
+    def test_zypper_raises(self, mock_open, mock_Command_run):
         mock_Command_run.side_effect = Exception
         with raises(DistMigrationZypperException):
             Zypper.run([])
 
-    def test_zypper_dont_raise_on_error(self, mock_Command_run):
+    @patch('builtins.open')
+    def test_zypper_raises_on_log_file(self, mock_open, mock_Command_run):
+        mock_open.side_effect = OSError
+        with raises(DistMigrationZypperException):
+            Zypper.run([])
+
+    @patch('builtins.open')
+    def test_zypper_dont_raise_on_error(self, mock_open, mock_Command_run):
         command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run_result(output='', error='', returncode=1)
         zypper_call = Zypper.run(['in', 'test', '--root', '/system-root'], raise_on_error=False)
         mock_Command_run.assert_called_once_with(
-            [
-                'bash',
-                '-c',
-                'set -o pipefail; zypper in test --root /system-root '
-                '|& tee -a /system-root/var/log/distro_migration.log',
-            ],
+            ['zypper', 'in', 'test', '--root', '/system-root'],
+            line_callback=ANY,
             raise_on_error=False,
+            merge_stderr=True,
         )
 
         assert not zypper_call.success
         with raises(DistMigrationZypperException):
             zypper_call.raise_if_failed()
 
-    def test_zypper_log_if_failed(self, mock_Command_run):
+    @patch('builtins.open')
+    def test_zypper_log_if_failed(self, mock_open, mock_Command_run):
         command_run_result = namedtuple('command', ['output', 'error', 'returncode'])
         mock_Command_run.return_value = command_run_result(
             output='some_output', error='', returncode=1
@@ -123,10 +162,7 @@ class TestCommand(object):
         zypper_call = Zypper.run(['args'], raise_on_error=False)
         log = Mock()
         zypper_call.log_if_failed(log)
-        log.error.assert_called_once_with(
-            'set -o pipefail; zypper args |& tee -a /system-root/var/log/distro_migration.log: '
-            'failed with: some_output'
-        )
+        log.error.assert_called_once_with('zypper args: failed with: some_output')
 
     def test_zypper_call_failed(self, mock_Command_run):
         command_run_result = namedtuple('command', ['output', 'error', 'returncode'])